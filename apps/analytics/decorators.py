@@ -0,0 +1,74 @@
+from functools import wraps
+from django.utils.cache import patch_cache_control
+from rest_framework.response import Response
+from rest_framework import status
+from apps.analytics.services.cache_service import AnalyticsCacheService
+from apps.jobs.responses import wants_background
+
+
+def _request_params(request):
+    return {
+        param: values
+        for param, values in request.query_params.lists()
+        if param != "async"
+    }
+
+
+def _etag_matches(request, etag):
+    header = request.headers.get("If-None-Match", "")
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in [
+        value.removeprefix("W/") for value in candidates
+    ]
+
+
+def etag_from_data_version(name):
+    # Responde 304 sin ejecutar la vista si los datos de las compañías no han
+    # cambiado desde la respuesta que ya tiene el cliente
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(self, request, *args, **kwargs):
+            company_ids = self.get_company_ids(request)
+            if not company_ids or wants_background(request):
+                return view_func(self, request, *args, **kwargs)
+
+            etag = AnalyticsCacheService().build_etag(
+                name, company_ids, _request_params(request)
+            )
+            if _etag_matches(request, etag):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = view_func(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+            response["ETag"] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        return _wrapped_view
+
+    return decorator
+
+
+def cache_analytics_response(name):
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(self, request, *args, **kwargs):
+            company_ids = self.get_company_ids(request)
+            if not company_ids or wants_background(request):
+                return view_func(self, request, *args, **kwargs)
+
+            service = AnalyticsCacheService()
+            key = service.build_key(name, company_ids, _request_params(request))
+            data = service.get(key)
+            if data is not None:
+                return Response(data, status=status.HTTP_200_OK)
+
+            response = view_func(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                service.set(key, response.data)
+            return response
+
+        return _wrapped_view
+
+    return decorator
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from apps.analytics.services.rollup_service import RollupService
+
+
+class Command(BaseCommand):
+    help = "Reconstruye las tablas diarias de ventas y compras desde los movimientos"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company",
+            type=int,
+            action="append",
+            help="ID de la compañía a reconstruir (se puede repetir)",
+        )
+
+    def handle(self, *args, **options):
+        result = RollupService().rebuild(company_ids=options["company"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Resúmenes reconstruidos: {result['sales']} de ventas, "
+                f"{result['purchases']} de compras"
+            )
+        )
@@ -0,0 +1,112 @@
+# Generated by Django 4.2.15 on 2026-10-17 16:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("product", "0002_product_company"),
+        ("company", "0004_company_logo"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyPurchaseRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("units", models.BigIntegerField(default=0)),
+                ("transactions", models.IntegerField(default=0)),
+                (
+                    "cost",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "company",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="company.company",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="product.product",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DailySalesRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("units", models.BigIntegerField(default=0)),
+                ("transactions", models.IntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "company",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="company.company",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="product.product",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["company", "day"], name="analytics_d_company_5665d9_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailysalesrollup",
+            constraint=models.UniqueConstraint(
+                fields=("company", "product", "day"), name="unique_daily_sales_rollup"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dailypurchaserollup",
+            index=models.Index(
+                fields=["company", "day"], name="analytics_d_company_9c8c28_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailypurchaserollup",
+            constraint=models.UniqueConstraint(
+                fields=("company", "product", "day"),
+                name="unique_daily_purchase_rollup",
+            ),
+        ),
+    ]
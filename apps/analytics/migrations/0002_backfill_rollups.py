@@ -0,0 +1,49 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    sources = [
+        ("sale", "Sale", "DailySalesRollup", "revenue", "total_price"),
+        ("purchase", "Purchase", "DailyPurchaseRollup", "cost", "total_cost"),
+    ]
+    for app_label, source_name, rollup_name, amount_field, total_field in sources:
+        source = apps.get_model(app_label, source_name)
+        rollup = apps.get_model("analytics", rollup_name)
+        grouped = (
+            source.objects.annotate(day=TruncDate("date"))
+            .order_by()
+            .values("company_id", "product_id", "day")
+            .annotate(
+                total_units=Sum("quantity"),
+                total_amount=Sum(total_field),
+                total_transactions=Count("id"),
+            )
+        )
+        rollup.objects.bulk_create(
+            (
+                rollup(
+                    company_id=row["company_id"],
+                    product_id=row["product_id"],
+                    day=row["day"],
+                    units=row["total_units"],
+                    transactions=row["total_transactions"],
+                    **{amount_field: row["total_amount"]},
+                )
+                for row in grouped.iterator(chunk_size=2000)
+            ),
+            batch_size=2000,
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analytics", "0001_initial"),
+        ("sale", "0002_alter_sale_date"),
+        ("purchase", "0002_purchase_delete_sale"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
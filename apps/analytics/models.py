@@ -0,0 +1,40 @@
+from django.db import models
+from apps.company.models import Company
+from apps.product.models import Product
+
+
+class DailyRollup(models.Model):
+    company = models.ForeignKey(Company, on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    day = models.DateField()
+    units = models.BigIntegerField(default=0)
+    transactions = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class DailySalesRollup(DailyRollup):
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["company", "product", "day"],
+                name="unique_daily_sales_rollup",
+            )
+        ]
+        indexes = [models.Index(fields=["company", "day"])]
+
+
+class DailyPurchaseRollup(DailyRollup):
+    cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["company", "product", "day"],
+                name="unique_daily_purchase_rollup",
+            )
+        ]
+        indexes = [models.Index(fields=["company", "day"])]
@@ -0,0 +1,75 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+class AnalyticsCacheService:
+    GLOBAL_VERSION_KEY = "analytics_version:all"
+
+    def _version_key(self, company_id):
+        return f"analytics_version:{company_id}"
+
+    def _initial_version(self):
+        # Si la caché desaloja el contador no se vuelve a un número ya usado
+        return time.time_ns()
+
+    def _version_timeout(self):
+        # Caduca para que una caché local de otro proceso, que no ve las
+        # escrituras hechas aquí, no mantenga una versión vieja indefinidamente
+        return settings.ANALYTICS_CACHE_TIMEOUT
+
+    def get_versions(self, company_ids):
+        keys = [self.GLOBAL_VERSION_KEY] + [
+            self._version_key(company_id) for company_id in sorted(company_ids)
+        ]
+        versions = cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                cache.add(key, self._initial_version(), self._version_timeout())
+                versions[key] = cache.get(key)
+        return [versions[key] for key in keys]
+
+    def _increment(self, keys):
+        for key in keys:
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, self._initial_version(), self._version_timeout())
+
+    def bump(self, *company_ids):
+        keys = [
+            self._version_key(company_id)
+            for company_id in set(company_ids)
+            if company_id
+        ]
+        if not keys:
+            return
+        self._increment(keys)
+        # Se repite al confirmar para descartar lo que otra petición haya
+        # guardado leyendo los datos anteriores a la transacción
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: self._increment(keys))
+
+    def bump_all(self):
+        self._increment([self.GLOBAL_VERSION_KEY])
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: self._increment([self.GLOBAL_VERSION_KEY]))
+
+    def fingerprint(self, name, company_ids, params):
+        versions = self.get_versions(company_ids)
+        raw = repr((name, sorted(company_ids), versions, sorted(params.items())))
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def build_key(self, name, company_ids, params):
+        return f"analytics:{name}:{self.fingerprint(name, company_ids, params)}"
+
+    def build_etag(self, name, company_ids, params):
+        return f'"{self.fingerprint(name, company_ids, params)}"'
+
+    def get(self, key):
+        return cache.get(key)
+
+    def set(self, key, data):
+        cache.set(key, data, settings.ANALYTICS_CACHE_TIMEOUT)
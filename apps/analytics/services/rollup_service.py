@@ -0,0 +1,169 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractMonth, TruncDate
+from django.utils import timezone
+from apps.analytics.models import DailyPurchaseRollup, DailySalesRollup
+from apps.analytics.services.cache_service import AnalyticsCacheService
+
+
+def rollup_day(value):
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return timezone.localdate(value)
+
+
+class RollupService:
+    BATCH_SIZE = 2000
+
+    @staticmethod
+    def _apply_delta(model, company_id, product_id, day, create=True, **deltas):
+        lookup = {"company_id": company_id, "product_id": product_id, "day": day}
+        increments = {field: F(field) + value for field, value in deltas.items()}
+
+        if model.objects.filter(**lookup).update(**increments) or not create:
+            return
+        try:
+            with transaction.atomic():
+                model.objects.create(**lookup, **deltas)
+        except IntegrityError:
+            # Otra transacción creó la fila entre el UPDATE y el INSERT
+            model.objects.filter(**lookup).update(**increments)
+
+    def record_sale(self, company_id, product_id, date, quantity, total, sign=1):
+        self._apply_delta(
+            DailySalesRollup,
+            company_id,
+            product_id,
+            rollup_day(date),
+            create=sign > 0,
+            units=sign * quantity,
+            revenue=sign * total,
+            transactions=sign,
+        )
+
+    def record_purchase(self, company_id, product_id, date, quantity, total, sign=1):
+        self._apply_delta(
+            DailyPurchaseRollup,
+            company_id,
+            product_id,
+            rollup_day(date),
+            create=sign > 0,
+            units=sign * quantity,
+            cost=sign * total,
+            transactions=sign,
+        )
+
+    def _rebuild_model(self, model, source, amount_field, total_field, company_ids):
+        rollups = model.objects.all()
+        rows = source.objects.all()
+        if company_ids:
+            rollups = rollups.filter(company_id__in=company_ids)
+            rows = rows.filter(company_id__in=company_ids)
+        rollups.delete()
+
+        grouped = (
+            rows.annotate(day=TruncDate("date"))
+            .order_by()
+            .values("company_id", "product_id", "day")
+            .annotate(
+                total_units=Sum("quantity"),
+                total_amount=Sum(total_field),
+                total_transactions=Count("id"),
+            )
+        )
+
+        created = 0
+        batch = []
+        for row in grouped.iterator(chunk_size=self.BATCH_SIZE):
+            batch.append(
+                model(
+                    company_id=row["company_id"],
+                    product_id=row["product_id"],
+                    day=row["day"],
+                    units=row["total_units"],
+                    transactions=row["total_transactions"],
+                    **{amount_field: row["total_amount"]},
+                )
+            )
+            if len(batch) >= self.BATCH_SIZE:
+                model.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch)
+            created += len(batch)
+        return created
+
+    def rebuild(self, company_ids=None):
+        from apps.purchase.models import Purchase
+        from apps.sale.models import Sale
+
+        with transaction.atomic():
+            sales = self._rebuild_model(
+                DailySalesRollup, Sale, "revenue", "total_price", company_ids
+            )
+            purchases = self._rebuild_model(
+                DailyPurchaseRollup, Purchase, "cost", "total_cost", company_ids
+            )
+            cache_service = AnalyticsCacheService()
+            if company_ids:
+                cache_service.bump(*company_ids)
+            else:
+                cache_service.bump_all()
+        return {"sales": sales, "purchases": purchases}
+
+    def get_monthly_totals(self, model, companies, year, field):
+        rows = (
+            model.objects.filter(company__in=companies, day__year=year)
+            .annotate(month=ExtractMonth("day"))
+            .values("month")
+            .annotate(total=Sum(field))
+            .order_by("month")
+        )
+        return {row["month"]: row["total"] or 0 for row in rows}
+
+    def get_monthly_sales(self, companies, year, field="revenue"):
+        return self.get_monthly_totals(DailySalesRollup, companies, year, field)
+
+    def get_monthly_purchases(self, companies, year, field="cost"):
+        return self.get_monthly_totals(DailyPurchaseRollup, companies, year, field)
+
+    def get_top_products(self, companies, since=None, limit=10):
+        rollups = DailySalesRollup.objects.filter(company__in=companies)
+        if since:
+            rollups = rollups.filter(day__gte=rollup_day(since))
+
+        return (
+            rollups.values("product", "product__name", "product__price")
+            .annotate(
+                total_quantity=Sum("units"),
+                total_sales=Sum("revenue"),
+                count=Sum("transactions"),
+            )
+            .order_by("-total_quantity")[:limit]
+        )
+
+    def get_sales_series(self, company, since, trunc_function, product_id=None):
+        rollups = DailySalesRollup.objects.filter(
+            company=company, day__gte=rollup_day(since)
+        )
+        if product_id:
+            rollups = rollups.filter(product_id=product_id)
+
+        return (
+            rollups.annotate(period=trunc_function)
+            .values("period")
+            .annotate(quantity=Sum("units"), total_sales=Sum("revenue"))
+            .order_by("period")
+        )
+
+    def get_sales_series_by_product(self, company, since, trunc_function):
+        # Las series de todos los productos en una sola consulta agrupada
+        return (
+            DailySalesRollup.objects.filter(company=company, day__gte=rollup_day(since))
+            .annotate(period=trunc_function)
+            .values("product", "period")
+            .annotate(quantity=Sum("units"))
+            .order_by()
+            .values_list("product", "period", "quantity")
+        )
@@ -0,0 +1,63 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.analytics.services.cache_service import AnalyticsCacheService
+from apps.analytics.services.rollup_service import RollupService
+from apps.company.models import Company
+from apps.product.models import Product
+from apps.purchase.models import Purchase
+from apps.sale.models import Sale
+from apps.users.models import CustomUser
+
+
+@receiver(post_delete, sender=Sale)
+def remove_sale_from_rollup(sender, instance, **kwargs):
+    RollupService().record_sale(
+        instance.company_id,
+        instance.product_id,
+        instance.date,
+        instance.quantity,
+        instance.total_price,
+        sign=-1,
+    )
+
+
+@receiver(post_delete, sender=Purchase)
+def remove_purchase_from_rollup(sender, instance, **kwargs):
+    RollupService().record_purchase(
+        instance.company_id,
+        instance.product_id,
+        instance.date,
+        instance.quantity,
+        instance.total_cost,
+        sign=-1,
+    )
+
+
+@receiver(post_save, sender=Sale)
+@receiver(post_delete, sender=Sale)
+@receiver(post_save, sender=Purchase)
+@receiver(post_delete, sender=Purchase)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def bump_analytics_version(sender, instance, **kwargs):
+    AnalyticsCacheService().bump(instance.company_id)
+
+
+@receiver(post_save, sender=Company)
+def reset_analytics_version(sender, instance, created, **kwargs):
+    # Una compañía nueva no hereda respuestas de otra que tuvo el mismo id
+    if created:
+        AnalyticsCacheService().bump(instance.pk)
+
+
+@receiver(post_save, sender=CustomUser)
+def bump_seller_companies(sender, instance, created, update_fields=None, **kwargs):
+    # El listado de ventas muestra el nombre del vendedor
+    if created or (update_fields and not {"first_name", "last_name"} & update_fields):
+        return
+    AnalyticsCacheService().bump(
+        *Sale.objects.filter(sold_by=instance)
+        .order_by()
+        .values_list("company_id", flat=True)
+        .distinct()
+    )
@@ -0,0 +1,195 @@
+from decimal import Decimal
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from apps.analytics.models import DailyPurchaseRollup, DailySalesRollup
+from apps.company.testing import create_company, create_owner
+from apps.product.models import Product
+from apps.purchase.models import Purchase
+from apps.sale.models import Sale
+from rest_framework.test import APIClient
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.user = create_owner()
+        self.company = create_company(self.user)
+        self.product = Product.objects.create(
+            company=self.company,
+            name="Producto",
+            description="Descripción",
+            price=Decimal("10.00"),
+            stock=100,
+        )
+
+    def create_sale(self, quantity):
+        return Sale.objects.create(
+            company=self.company,
+            product=self.product,
+            customer="Cliente",
+            quantity=quantity,
+            unit_price=Decimal("10.00"),
+            total_price=Decimal("0"),
+            date=timezone.now(),
+            sold_by=self.user,
+        )
+
+    def rollup_rows(self, model, amount_field):
+        return list(
+            model.objects.order_by("day").values_list(
+                "product_id", "day", "units", amount_field, "transactions"
+            )
+        )
+
+    def test_sales_are_rolled_up_on_save_and_delete(self):
+        first = self.create_sale(2)
+        self.create_sale(3)
+
+        rollup = DailySalesRollup.objects.get()
+        self.assertEqual(rollup.units, 5)
+        self.assertEqual(rollup.revenue, Decimal("50.00"))
+        self.assertEqual(rollup.transactions, 2)
+
+        first.quantity = 4
+        first.save()
+        rollup.refresh_from_db()
+        self.assertEqual(rollup.units, 7)
+        self.assertEqual(rollup.transactions, 2)
+
+        first.delete()
+        rollup.refresh_from_db()
+        self.assertEqual(rollup.units, 3)
+        self.assertEqual(rollup.revenue, Decimal("30.00"))
+        self.assertEqual(rollup.transactions, 1)
+
+    def test_rebuild_matches_incremental_rollups(self):
+        self.create_sale(2)
+        self.create_sale(5)
+        Purchase.objects.create(
+            company=self.company,
+            product=self.product,
+            supplier="Proveedor",
+            quantity=8,
+            unit_cost=Decimal("6.00"),
+            total_cost=Decimal("0"),
+        )
+        sales = self.rollup_rows(DailySalesRollup, "revenue")
+        purchases = self.rollup_rows(DailyPurchaseRollup, "cost")
+
+        call_command("rebuild_rollups", stdout=StringIO())
+
+        self.assertEqual(self.rollup_rows(DailySalesRollup, "revenue"), sales)
+        self.assertEqual(self.rollup_rows(DailyPurchaseRollup, "cost"), purchases)
+        self.assertEqual(purchases[0][2:], (8, Decimal("48.00"), 1))
+
+
+class AnalyticsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_owner(("view_products", Product), ("view_sales", Sale))
+        self.company = create_company(self.user)
+        self.product = Product.objects.create(
+            company=self.company,
+            name="Producto",
+            description="Descripción",
+            price=Decimal("10.00"),
+            stock=100,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def sell(self, quantity):
+        Sale.objects.create(
+            company=self.company,
+            product=self.product,
+            customer="Cliente",
+            quantity=quantity,
+            unit_price=Decimal("10.00"),
+            total_price=Decimal("0"),
+            date=timezone.now(),
+            sold_by=self.user,
+        )
+
+    def test_repeated_requests_are_served_from_cache(self):
+        self.sell(2)
+        url = "/api/products/profitability/"
+        expected = self.client.get(url, {"limit": "5"})
+        self.assertEqual(expected.status_code, 200)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"limit": "5"})
+        self.assertEqual(response.data, expected.data)
+
+        # Otros parámetros se calculan y guardan aparte
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url, {"limit": "1"})
+        self.assertTrue(context.captured_queries)
+
+    def test_writes_invalidate_the_company_responses(self):
+        url = "/api/sales/statistics/"
+        self.sell(2)
+        self.assertEqual(self.client.get(url).data["total_sales"], Decimal("20.00"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sell(3)
+        self.assertEqual(self.client.get(url).data["total_sales"], Decimal("50.00"))
+
+        self.product.stock = 0
+        self.product.save()
+        self.assertEqual(
+            self.client.get("/api/products/statistics/").data["total_stock"], 0
+        )
+
+    def test_rebuild_invalidates_every_company(self):
+        url = "/api/sales/monthly-chart/"
+        params = {"year": timezone.localdate().year}
+        self.sell(2)
+        DailySalesRollup.objects.update(revenue=0)
+        drifted = self.client.get(url, params).data
+        self.assertEqual(sum(month["salidas"] for month in drifted), 0)
+
+        call_command("rebuild_rollups", stdout=StringIO())
+
+        rebuilt = self.client.get(url, params).data
+        self.assertEqual(sum(month["salidas"] for month in rebuilt), 20.0)
+
+    def test_unchanged_lists_answer_not_modified(self):
+        response = self.client.get("/api/products/")
+        etag = response["ETag"]
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        self.product.price = Decimal("12.00")
+        self.product.save()
+        response = self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_sale_list_etag_follows_sales_and_seller_names(self):
+        self.sell(1)
+        etag = self.client.get("/api/sales/")["ETag"]
+        other_page = self.client.get("/api/sales/", {"page_size": "1"})["ETag"]
+        self.assertNotEqual(other_page, etag)
+
+        self.user.first_name = "Ana"
+        self.user.save()
+        response = self.client.get("/api/sales/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"][0]["sold_by_name"], "Ana")
+
+        etag = response["ETag"]
+        self.assertEqual(
+            self.client.get("/api/sales/", HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+        self.sell(1)
+        self.assertEqual(
+            self.client.get("/api/sales/", HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
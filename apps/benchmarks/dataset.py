@@ -0,0 +1,241 @@
+import random
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.analytics.models import DailyPurchaseRollup, DailySalesRollup
+from apps.company.models import Company
+from apps.inventory.models import InventoryMovement
+from apps.product.models import Product
+from apps.purchase.models import Purchase
+from apps.sale.models import Sale
+from apps.sale.services.synthetic_sales_service import SyntheticSalesGenerator
+from apps.users.models import CustomUser
+
+PERMISSIONS = [
+    ("view_products", Product),
+    ("view_sales", Sale),
+    ("view_purchases", Purchase),
+]
+
+
+class BenchmarkDataset:
+    """Datos sintéticos para medir la API con volúmenes de producción.
+
+    Las compras se escriben con bulk_create sin pasar por Purchase.save; las
+    ventas, la reposición que las cubre y los resúmenes diarios los genera
+    SyntheticSalesGenerator, así que `sales` es el promedio por compañía.
+    """
+
+    def __init__(
+        self,
+        companies=1,
+        products=100,
+        sales=10000,
+        purchases=1000,
+        days=365,
+        seed=0,
+        batch_size=5000,
+        log=None,
+    ):
+        self.companies = companies
+        self.products = products
+        self.sales = sales
+        self.purchases = purchases
+        self.days = days
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self.generator = SyntheticSalesGenerator(
+            seed=seed, batch_size=batch_size, log=log
+        )
+        self.log = log or (lambda message: None)
+        self.user = None
+        self.company_ids = []
+
+    def describe(self):
+        return {
+            "companies": self.companies,
+            "products_per_company": self.products,
+            "sales_per_company": self.sales,
+            "purchases_per_company": self.purchases,
+            "days": self.days,
+        }
+
+    def build(self):
+        self.user = CustomUser.objects.create_user(
+            email=f"benchmark-{uuid.uuid4().hex}@example.com"
+        )
+        for codename, model in PERMISSIONS:
+            permission, _ = Permission.objects.get_or_create(
+                codename=codename,
+                content_type=ContentType.objects.get_for_model(model),
+                defaults={"name": codename},
+            )
+            self.user.custom_permissions.add(permission)
+
+        now = timezone.now()
+        for index in range(self.companies):
+            company = Company(
+                user=self.user,
+                name=f"Benchmark {index + 1}",
+                description="Datos temporales de benchmark_endpoints",
+                address="-",
+                phone="-",
+                email=self.user.email,
+            )
+            company.save()
+            self.company_ids.append(company.pk)
+            self.log(f"Compañía {company.pk}: generando datos")
+            with transaction.atomic():
+                self._fill_company(company, now)
+            self.generator.generate(
+                company, self.user, self.days, mean_daily_sales=self.sales / self.days
+            )
+        return self
+
+    def _fill_company(self, company, now):
+        products = Product.objects.bulk_create(
+            [
+                Product(
+                    company=company,
+                    sku=f"BENCH-{index:07d}",
+                    name=f"Producto {index}",
+                    description="-",
+                    price=Decimal(self.random.randint(100, 50000)) / 100,
+                    stock=0,
+                )
+                for index in range(self.products)
+            ],
+            batch_size=self.batch_size,
+        )
+        stock = {product.pk: 0 for product in products}
+
+        self._insert_purchases(company, products, now, stock)
+
+        # Stock inicial variable; el generador repone lo que falte para las ventas
+        adjustments = []
+        for product in products:
+            opening = self.random.randint(0, 200)
+            product.stock = stock[product.pk] + opening
+            if opening:
+                adjustments.append(
+                    self._movement(
+                        product,
+                        InventoryMovement.ADJUSTMENT,
+                        opening,
+                        product.price,
+                        "product",
+                        product.pk,
+                        now - timedelta(days=self.days + 1),
+                    )
+                )
+        Product.objects.bulk_update(products, ["stock"], batch_size=self.batch_size)
+        InventoryMovement.objects.bulk_create(adjustments, batch_size=self.batch_size)
+
+    def _cost(self, product):
+        return (product.price * Decimal("0.6")).quantize(Decimal("0.01"))
+
+    def _insert_purchases(self, company, products, now, stock):
+        written = 0
+        while written < self.purchases:
+            size = min(self.batch_size, self.purchases - written)
+            rows = []
+            for _ in range(size):
+                product = self.random.choice(products)
+                quantity = self.random.randint(1, 5)
+                seconds = self.random.randint(0, self.days * 86400)
+                rows.append(
+                    Purchase(
+                        company=company,
+                        product=product,
+                        supplier="Proveedor",
+                        quantity=quantity,
+                        unit_cost=self._cost(product),
+                        total_cost=quantity * self._cost(product),
+                        date=now - timedelta(seconds=seconds),
+                    )
+                )
+            # Purchase.date usa auto_now_add: bulk_create pone la fecha actual y
+            # la fecha histórica se escribe después de forma explícita
+            dates = [row.date for row in rows]
+            Purchase.objects.bulk_create(rows)
+            for row, date in zip(rows, dates):
+                row.date = date
+            Purchase.objects.bulk_update(rows, ["date"])
+
+            movements = []
+            for row in rows:
+                stock[row.product_id] += row.quantity
+                movements.append(
+                    self._movement(
+                        row.product,
+                        InventoryMovement.PURCHASE,
+                        row.quantity,
+                        row.unit_cost,
+                        "purchase",
+                        row.pk,
+                        row.date,
+                    )
+                )
+            InventoryMovement.objects.bulk_create(movements)
+            written += size
+            self.log(f"  Purchase: {written}/{self.purchases}")
+
+    def _movement(
+        self,
+        product,
+        kind,
+        quantity,
+        unit_value,
+        source_type,
+        source_id,
+        date,
+    ):
+        return InventoryMovement(
+            company_id=product.company_id,
+            product_id=product.pk,
+            kind=kind,
+            quantity=quantity,
+            unit_value=unit_value,
+            source_type=source_type,
+            source_id=source_id,
+            date=date,
+        )
+
+    def sample_ids(self):
+        company_ids = self.company_ids
+        return {
+            "product": Product.objects.filter(company__in=company_ids)
+            .values_list("pk", flat=True)
+            .first(),
+            "sale": Sale.objects.filter(company__in=company_ids)
+            .values_list("pk", flat=True)
+            .first(),
+        }
+
+    def delete(self):
+        # DELETE directos: el borrado en cascada del ORM dispararía las señales
+        # de cada venta y tardaría más que la propia generación
+        models = [
+            InventoryMovement,
+            DailySalesRollup,
+            DailyPurchaseRollup,
+            Sale,
+            Purchase,
+            Product,
+        ]
+        if self.company_ids:
+            placeholders = ", ".join(["%s"] * len(self.company_ids))
+            with transaction.atomic(), connection.cursor() as cursor:
+                for model in models:
+                    cursor.execute(
+                        f"DELETE FROM {connection.ops.quote_name(model._meta.db_table)}"
+                        f" WHERE company_id IN ({placeholders})",
+                        self.company_ids,
+                    )
+                Company.objects.filter(pk__in=self.company_ids).delete()
+        if self.user:
+            self.user.delete()
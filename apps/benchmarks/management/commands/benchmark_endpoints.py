@@ -0,0 +1,129 @@
+import json
+import subprocess
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from apps.benchmarks.dataset import BenchmarkDataset
+from apps.benchmarks.runner import ACTIONS, EndpointBenchmark
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera un conjunto de datos del tamaño indicado y mide la latencia, "
+        "las consultas y la memoria de cada acción de la API"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--companies", type=int, default=1)
+        parser.add_argument(
+            "--products", type=int, default=1000, help="Productos por compañía"
+        )
+        parser.add_argument(
+            "--sales",
+            type=int,
+            default=100000,
+            help="Ventas por compañía (promedio; la demanda varía por día)",
+        )
+        parser.add_argument(
+            "--purchases", type=int, default=20000, help="Compras por compañía"
+        )
+        parser.add_argument(
+            "--days", type=int, default=365, help="Días de historia generados"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--repeat", type=int, default=20, help="Mediciones por acción"
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=2, help="Peticiones previas sin medir"
+        )
+        parser.add_argument(
+            "--warm-cache",
+            action="store_true",
+            help="No vacía la caché entre peticiones",
+        )
+        parser.add_argument(
+            "--action",
+            action="append",
+            choices=[name for name, _ in ACTIONS],
+            help="Acción a medir (se puede repetir; por defecto todas)",
+        )
+        parser.add_argument(
+            "--output", help="Archivo JSON de resultados (por defecto la salida)"
+        )
+        parser.add_argument(
+            "--keep", action="store_true", help="No borra los datos generados"
+        )
+
+    def handle(self, *args, **options):
+        dataset = BenchmarkDataset(
+            companies=options["companies"],
+            products=options["products"],
+            sales=options["sales"],
+            purchases=options["purchases"],
+            days=options["days"],
+            seed=options["seed"],
+            log=lambda message: self.stderr.write(message),
+        )
+        try:
+            dataset.build()
+            benchmark = EndpointBenchmark(
+                dataset.user,
+                repeat=max(options["repeat"], 1),
+                warmup=max(options["warmup"], 0),
+                warm_cache=options["warm_cache"],
+            )
+            results = benchmark.run(
+                dataset.sample_ids(),
+                only=options["action"],
+                log=self.log_result,
+            )
+        finally:
+            if not options["keep"]:
+                dataset.delete()
+
+        report = json.dumps(
+            {
+                "commit": current_commit(),
+                "created_at": timezone.now().isoformat(),
+                "database": connection.vendor,
+                "dataset": dataset.describe(),
+                "options": {
+                    "repeat": options["repeat"],
+                    "warmup": options["warmup"],
+                    "warm_cache": options["warm_cache"],
+                },
+                "results": results,
+            },
+            indent=2,
+        )
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report + "\n")
+            self.stderr.write(self.style.SUCCESS(f"Resultados en {options['output']}"))
+        else:
+            self.stdout.write(report)
+
+    def log_result(self, name, result):
+        if "p50_ms" in result:
+            self.stderr.write(
+                f"{name}: p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms, "
+                f"{result['queries']} consultas"
+            )
+        else:
+            error = result.get("error") or f"estado {result['status']}"
+            self.stderr.write(self.style.ERROR(f"{name}: {error}"))
@@ -0,0 +1,62 @@
+import json
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+class QueryPlanInspector:
+    """Ejecuta EXPLAIN sobre las consultas que lanza cada acción de la API.
+
+    Solo funciona en PostgreSQL: el formato JSON del plan y los tipos de nodo
+    son los de su planificador.
+    """
+
+    def __init__(self, user, models):
+        self.tables = {model._meta.db_table for model in models}
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+    def capture(self, url):
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+        return response, [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].lstrip().upper().startswith("SELECT")
+            and any(table in query["sql"] for table in self.tables)
+        ]
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]
+
+    def sequential_scans(self, sql):
+        return sorted(
+            {
+                node["Relation Name"]
+                for node in plan_nodes(self.explain(sql))
+                if node["Node Type"] == "Seq Scan"
+                and node.get("Relation Name") in self.tables
+            }
+        )
+
+    def inspect(self, url):
+        # Tablas recorridas secuencialmente por cada consulta de la acción
+        response, queries = self.capture(url)
+        found = []
+        for sql in queries:
+            scans = self.sequential_scans(sql)
+            if scans:
+                found.append((sql, scans))
+        return response, found
@@ -0,0 +1,112 @@
+import math
+import time
+import tracemalloc
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+ACTIONS = [
+    ("products.list", "/api/products/"),
+    ("products.retrieve", "/api/products/{product}/"),
+    ("products.stock_history", "/api/products/{product}/stock-history/"),
+    ("products.statistics", "/api/products/statistics/"),
+    ("products.profitability", "/api/products/profitability/"),
+    ("products.inventory_rotation", "/api/products/inventory-rotation/"),
+    ("products.purchase_forecast", "/api/products/purchase-forecast/"),
+    ("products.monthly_flow", "/api/products/monthly-flow/"),
+    ("products.recent_movements", "/api/products/recent-movements/"),
+    ("products.movements", "/api/products/movements/"),
+    ("sales.list", "/api/sales/"),
+    ("sales.retrieve", "/api/sales/{sale}/"),
+    ("sales.statistics", "/api/sales/statistics/"),
+    ("sales.top_products", "/api/sales/top-products/"),
+    ("sales.monthly_chart", "/api/sales/monthly-chart/"),
+    ("purchases.list", "/api/purchases/"),
+    ("purchases.statistics", "/api/purchases/statistics/"),
+]
+
+
+def percentile(values, pct):
+    # Interpolación lineal entre los dos valores más cercanos
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class EndpointBenchmark:
+    def __init__(self, user, repeat=20, warmup=2, warm_cache=False):
+        self.repeat = repeat
+        self.warmup = warmup
+        self.warm_cache = warm_cache
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+    def _request(self, url):
+        # Sin caché se mide el trabajo real de la acción, no la respuesta guardada
+        if not self.warm_cache:
+            cache.clear()
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            response = self.client.get(url)
+            elapsed = time.perf_counter() - started
+        return response, elapsed, counter.count
+
+    def measure(self, url):
+        for _ in range(self.warmup):
+            self._request(url)
+
+        timings = []
+        queries = []
+        for _ in range(self.repeat):
+            response, elapsed, count = self._request(url)
+            if response.status_code != 200:
+                return {"url": url, "status": response.status_code}
+            timings.append(elapsed * 1000)
+            queries.append(count)
+
+        # La memoria se mide en una pasada aparte: tracemalloc ralentiza
+        tracemalloc.start()
+        try:
+            self._request(url)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "url": url,
+            "status": 200,
+            "iterations": self.repeat,
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "p99_ms": round(percentile(timings, 99), 3),
+            "mean_ms": round(sum(timings) / len(timings), 3),
+            "queries": max(queries),
+            "peak_memory_kb": round(peak / 1024, 1),
+        }
+
+    def run(self, ids, only=None, log=None):
+        results = {}
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            for name, template in ACTIONS:
+                if only and name not in only:
+                    continue
+                try:
+                    results[name] = self.measure(template.format(**ids))
+                except Exception as e:
+                    results[name] = {"url": template, "error": str(e)}
+                if log:
+                    log(name, results[name])
+        return results
@@ -0,0 +1,96 @@
+from datetime import timedelta
+from unittest import skipUnless
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from apps.benchmarks.dataset import BenchmarkDataset
+from apps.benchmarks.plans import QueryPlanInspector
+from apps.benchmarks.runner import ACTIONS, EndpointBenchmark, percentile
+from apps.company.models import Company
+from apps.inventory.models import InventoryMovement
+from apps.product.models import Product
+from apps.purchase.models import Purchase
+from apps.sale.models import Sale
+from apps.users.models import CustomUser
+
+
+class BenchmarkTests(TestCase):
+    def test_percentiles_interpolate_between_samples(self):
+        values = [4, 1, 3, 2]
+        self.assertEqual(percentile(values, 50), 2.5)
+        self.assertEqual(percentile(values, 100), 4)
+        self.assertAlmostEqual(percentile(values, 95), 3.85)
+
+    def test_dataset_is_consistent_and_measurable(self):
+        dataset = BenchmarkDataset(
+            companies=2, products=5, sales=40, purchases=10, days=30, batch_size=15
+        ).build()
+
+        # Las ventas siguen la demanda del generador: 40 por compañía en promedio
+        sales = Sale.objects.count()
+        self.assertGreater(sales, 40)
+        self.assertEqual(
+            InventoryMovement.objects.filter(kind=InventoryMovement.SALE).count(),
+            sales,
+        )
+        self.assertEqual(Purchase.objects.count(), 20)
+        # Las compras conservan su fecha histórica pese a auto_now_add
+        for purchase in Purchase.objects.all():
+            movement = InventoryMovement.objects.get(
+                source_type="purchase", source_id=purchase.pk
+            )
+            self.assertEqual(movement.date, purchase.date)
+        self.assertLess(
+            Purchase.objects.order_by("date").first().date,
+            timezone.now() - timedelta(days=1),
+        )
+        for product in Product.objects.all():
+            movements = InventoryMovement.objects.filter(product=product)
+            self.assertEqual(
+                sum(movements.values_list("quantity", flat=True)), product.stock
+            )
+            self.assertGreaterEqual(product.stock, 0)
+
+        results = EndpointBenchmark(dataset.user, repeat=3, warmup=1).run(
+            dataset.sample_ids(),
+            only=["products.retrieve", "sales.top_products"],
+        )
+        self.assertEqual(set(results), {"products.retrieve", "sales.top_products"})
+        for result in results.values():
+            self.assertEqual(result["status"], 200)
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+            self.assertGreater(result["queries"], 0)
+            self.assertGreater(result["peak_memory_kb"], 0)
+
+        dataset.delete()
+        self.assertFalse(Sale.objects.exists())
+        self.assertFalse(InventoryMovement.objects.exists())
+        self.assertFalse(Company.objects.exists())
+        self.assertFalse(CustomUser.objects.exists())
+
+
+@skipUnless(connection.vendor == "postgresql", "Los planes son los de PostgreSQL")
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Varias compañías del tamaño del benchmark; el usuario solo ve una,
+        # como en producción, donde cada consulta filtra una fracción pequeña
+        cls.dataset = BenchmarkDataset(
+            companies=20, products=50, sales=5000, purchases=1000
+        ).build()
+        other = CustomUser.objects.create_user(email="otras@example.com")
+        Company.objects.filter(pk__in=cls.dataset.company_ids[1:]).update(user=other)
+        with connection.cursor() as cursor:
+            for model in (Sale, Purchase, Product):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+    def test_analytics_queries_do_not_scan_sales_or_purchases(self):
+        inspector = QueryPlanInspector(self.dataset.user, [Sale, Purchase])
+        ids = self.dataset.sample_ids()
+        for name, template in ACTIONS:
+            cache.clear()
+            response, scans = inspector.inspect(template.format(**ids))
+            with self.subTest(action=name):
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(scans, [])
@@ -0,0 +1,11 @@
+from apps.company.services.company_service import CompanyService
+
+
+class CompanyMembershipMixin:
+    def get_company_ids(self, request):
+        # Una sola resolución por petición; entre peticiones la cubre la caché
+        company_ids = getattr(request, "_company_ids", None)
+        if company_ids is None:
+            company_ids = CompanyService().get_company_ids(request.user)
+            request._company_ids = company_ids
+        return company_ids
@@ -16,6 +16,19 @@ class CompanyRepository:
             ).distinct()
         return Company.objects.filter(user=user)
 
+    @staticmethod
+    def get_ids_by_user(user):
+        # Sin DISTINCT: los duplicados desaparecen al construir el conjunto
+        return frozenset(
+            Company.objects.filter(
+                models.Q(user=user) | models.Q(id=user.company_id)
+            ).values_list("id", flat=True)
+        )
+
+    @staticmethod
+    def get_by_ids(ids):
+        return Company.objects.filter(id__in=ids).order_by("id")
+
     @staticmethod
     def get_by_id(id):
         return Company.objects.get(id=id)
@@ -1,11 +1,15 @@
+from django.conf import settings
 from django.contrib.auth.models import Permission
+from django.core.cache import cache
 from apps.company.repositories.company_repository import CompanyRepository
 from apps.users.models import CustomUser
+from apps.users.services.permission_service import PermissionService
 
 
 class CompanyService:
     def __init__(self):
         self.repository = CompanyRepository()
+        self.permission_service = PermissionService()
 
     def get_all(self):
         return self.repository.get_all()
@@ -13,6 +17,29 @@ class CompanyService:
     def get_all_by_user(self, user):
         return self.repository.get_by_user(user)
 
+    def _company_ids_key(self, user_id):
+        return f"user_companies:{user_id}"
+
+    def get_company_ids(self, user):
+        key = self._company_ids_key(user.pk)
+        company_ids = cache.get(key)
+        if company_ids is None:
+            company_ids = self.repository.get_ids_by_user(user)
+            cache.set(key, company_ids, settings.COMPANY_CACHE_TIMEOUT)
+        return company_ids
+
+    def get_companies(self, company_ids):
+        return self.repository.get_by_ids(company_ids)
+
+    def get_primary_company(self, company_ids):
+        # La compañía con la que se crean registros nuevos
+        return self.repository.get_by_id(min(company_ids))
+
+    def invalidate_company_ids(self, *user_ids):
+        cache.delete_many(
+            [self._company_ids_key(user_id) for user_id in user_ids if user_id]
+        )
+
     def get_by_id(self, id):
         return self.repository.get_by_id(id)
 
@@ -41,16 +68,11 @@ class CompanyService:
             if employee.company != company:
                 return "El usuario no pertenece a esta compañía"
 
-            # Limpiar permisos anteriores
-            employee.custom_permissions.clear()
-
-            # Asignar nuevos permisos
-            for perm_name in permissions:
-                try:
-                    perm = Permission.objects.get(codename=perm_name)
-                    employee.custom_permissions.add(perm)
-                except Permission.DoesNotExist:
-                    continue
+            # Reemplazar los permisos anteriores; los códigos desconocidos se ignoran
+            employee.custom_permissions.set(
+                Permission.objects.filter(codename__in=permissions)
+            )
+            self.permission_service.invalidate_user(employee)
 
             return True
         except CustomUser.DoesNotExist:
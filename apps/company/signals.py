@@ -0,0 +1,42 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from apps.company.models import Company
+from apps.company.services.company_service import CompanyService
+from apps.users.models import CustomUser
+
+
+@receiver(pre_save, sender=Company)
+def remember_previous_owner(sender, instance, **kwargs):
+    instance._previous_owner_id = None
+    if instance.pk:
+        instance._previous_owner_id = (
+            Company.objects.filter(pk=instance.pk)
+            .values_list("user_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Company)
+def invalidate_owner_companies(sender, instance, **kwargs):
+    CompanyService().invalidate_company_ids(
+        instance.user_id, getattr(instance, "_previous_owner_id", None)
+    )
+
+
+@receiver(pre_delete, sender=Company)
+def remember_employees(sender, instance, **kwargs):
+    # Los empleados quedan sin compañía por SET_NULL, que no emite señales
+    instance._employee_ids = list(instance.employees.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Company)
+def invalidate_deleted_company(sender, instance, **kwargs):
+    CompanyService().invalidate_company_ids(
+        instance.user_id, *getattr(instance, "_employee_ids", [])
+    )
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_user_companies(sender, instance, **kwargs):
+    # Cubre cambios de CustomUser.company y ids reutilizados
+    CompanyService().invalidate_company_ids(instance.pk)
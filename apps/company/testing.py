@@ -0,0 +1,35 @@
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from apps.company.models import Company
+from apps.users.models import CustomUser
+
+
+def grant(user, codename, model):
+    permission, _ = Permission.objects.get_or_create(
+        codename=codename,
+        content_type=ContentType.objects.get_for_model(model),
+        defaults={"name": codename},
+    )
+    user.custom_permissions.add(permission)
+    return permission
+
+
+def create_owner(*permissions, email="owner@example.com", password="secret"):
+    """Usuario de prueba con los permisos dados como pares (codename, modelo)."""
+    user = CustomUser.objects.create_user(email=email, password=password)
+    for codename, model in permissions:
+        grant(user, codename, model)
+    return user
+
+
+def create_company(user, name="Tienda"):
+    company = Company(
+        user=user,
+        name=name,
+        description="Tienda de prueba",
+        address="Calle 1",
+        phone="3000000000",
+        email="tienda@example.com",
+    )
+    company.save()
+    return company
@@ -1,3 +1,81 @@
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from apps.company.services.company_service import CompanyService
+from apps.company.testing import create_company, create_owner, grant
+from apps.product.models import Product
+from apps.users.models import CustomUser
 
-# Create your tests here.
+
+class CompanyMembershipTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = CompanyService()
+        self.owner = create_owner()
+        self.company = create_company(self.owner)
+
+    def test_company_ids_are_cached_across_requests(self):
+        self.assertEqual(self.service.get_company_ids(self.owner), {self.company.pk})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.service.get_company_ids(self.owner), {self.company.pk}
+            )
+
+    def test_ownership_changes_invalidate_both_owners(self):
+        other = CustomUser.objects.create_user(email="other@example.com")
+        self.assertEqual(self.service.get_company_ids(other), set())
+        self.assertEqual(self.service.get_company_ids(self.owner), {self.company.pk})
+
+        self.company.user = other
+        self.company.save()
+
+        self.assertEqual(self.service.get_company_ids(other), {self.company.pk})
+        self.assertEqual(self.service.get_company_ids(self.owner), set())
+
+    def test_employee_assignment_and_company_deletion_invalidate(self):
+        employee = CustomUser.objects.create_user(email="employee@example.com")
+        self.assertEqual(self.service.get_company_ids(employee), set())
+
+        employee.company = self.company
+        employee.save()
+        self.assertEqual(self.service.get_company_ids(employee), {self.company.pk})
+
+        self.company.delete()
+        self.assertEqual(self.service.get_company_ids(employee), set())
+        self.assertEqual(self.service.get_company_ids(self.owner), set())
+
+    def test_membership_is_resolved_once_per_request(self):
+        grant(self.owner, "view_products", Product)
+        product = Product.objects.create(
+            company=self.company,
+            name="Producto",
+            description="Descripción",
+            price=Decimal("10.00"),
+            stock=1,
+        )
+        foreign = Product.objects.create(
+            company=create_company(
+                CustomUser.objects.create_user(email="x@example.com"), "Otra"
+            ),
+            name="Ajeno",
+            description="Descripción",
+            price=Decimal("1.00"),
+            stock=1,
+        )
+        client = APIClient()
+        client.force_authenticate(user=self.owner)
+        client.get(f"/api/products/{product.pk}/")
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f"/api/products/{product.pk}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(
+            [q for q in context.captured_queries if "company_company" in q["sql"]]
+        )
+
+        response = client.get(f"/api/products/{foreign.pk}/")
+        self.assertEqual(response.status_code, 403)
@@ -3,6 +3,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.utils import timezone
+from apps.company.mixins import CompanyMembershipMixin
 from apps.company.services.company_service import CompanyService
 from apps.company.serializers import CompanySerializer
 from apps.users.decorators import custom_permission_required
@@ -11,7 +12,7 @@ from apps.subscription.models import Subscription
 from django.contrib.auth.models import Permission
 
 
-class CompanyViewSet(viewsets.ViewSet):
+class CompanyViewSet(CompanyMembershipMixin, viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
 
     def __init__(self, **kwargs):
@@ -20,7 +21,7 @@ class CompanyViewSet(viewsets.ViewSet):
 
     def list(self, request):
         try:
-            companies = self.service.get_all_by_user(request.user)
+            companies = self.service.get_companies(self.get_company_ids(request))
             serializer = CompanySerializer(
                 companies, many=True, context={"request": request}
             )
@@ -86,8 +87,7 @@ class CompanyViewSet(viewsets.ViewSet):
 
             request.user.save()
 
-            existing_company = self.service.get_all_by_user(request.user).first()
-            if existing_company:
+            if self.get_company_ids(request):
                 return Response(
                     {
                         "error": "Ya tienes una compañía registrada. "
@@ -0,0 +1,128 @@
+import csv
+import json
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from openpyxl import Workbook
+from apps.product.models import Product
+from apps.purchase.models import Purchase
+from apps.sale.models import Sale
+from apps.supplier.models import Supplier
+
+
+EXPORTS = {
+    "sales": (
+        Sale,
+        [
+            ("id", "id"),
+            ("fecha", "date"),
+            ("producto_id", "product_id"),
+            ("producto", "product__name"),
+            ("cliente", "customer"),
+            ("cantidad", "quantity"),
+            ("precio_unitario", "unit_price"),
+            ("total", "total_price"),
+            ("vendedor", "sold_by__email"),
+        ],
+    ),
+    "purchases": (
+        Purchase,
+        [
+            ("id", "id"),
+            ("fecha", "date"),
+            ("producto_id", "product_id"),
+            ("producto", "product__name"),
+            ("proveedor", "supplier"),
+            ("cantidad", "quantity"),
+            ("costo_unitario", "unit_cost"),
+            ("total", "total_cost"),
+        ],
+    ),
+    "products": (
+        Product,
+        [
+            ("id", "id"),
+            ("nombre", "name"),
+            ("descripcion", "description"),
+            ("precio", "price"),
+            ("stock", "stock"),
+            ("creado", "created_at"),
+            ("actualizado", "updated_at"),
+        ],
+    ),
+    "suppliers": (
+        Supplier,
+        [
+            ("id", "id"),
+            ("nombre", "name"),
+            ("email", "email"),
+            ("telefono", "phone"),
+            ("direccion", "address"),
+        ],
+    ),
+}
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class ExportService:
+    CHUNK_SIZE = 2000
+    FORMATS = {
+        "csv": "text/csv; charset=utf-8",
+        "ndjson": "application/x-ndjson",
+        "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    }
+
+    def get_headers(self, resource):
+        return [header for header, _ in EXPORTS[resource][1]]
+
+    def get_rows(self, resource, companies):
+        model, columns = EXPORTS[resource]
+        # Cursor del lado del servidor: la memoria no depende del número de filas
+        return (
+            model.objects.filter(company__in=companies)
+            .order_by("id")
+            .values_list(*[lookup for _, lookup in columns])
+            .iterator(chunk_size=self.CHUNK_SIZE)
+        )
+
+    def stream_csv(self, resource, companies):
+        writer = csv.writer(_Echo())
+        yield "\ufeff" + writer.writerow(self.get_headers(resource))
+        for row in self.get_rows(resource, companies):
+            yield writer.writerow([_plain(value) for value in row])
+
+    def stream_ndjson(self, resource, companies):
+        headers = self.get_headers(resource)
+        for row in self.get_rows(resource, companies):
+            item = dict(zip(headers, (_plain(value) for value in row)))
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    def write_xlsx(self, resource, companies):
+        # El libro en modo write_only vuelca las filas a disco a medida que llegan
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(title=resource)
+        sheet.append(self.get_headers(resource))
+        for row in self.get_rows(resource, companies):
+            sheet.append(
+                [
+                    value.replace(tzinfo=None) if isinstance(value, datetime) else value
+                    for value in row
+                ]
+            )
+
+        output = tempfile.TemporaryFile()
+        workbook.save(output)
+        output.seek(0)
+        return output
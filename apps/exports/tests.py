@@ -0,0 +1,81 @@
+import io
+import json
+from decimal import Decimal
+from django.test import TestCase
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+from apps.company.testing import create_company, create_owner
+from apps.product.models import Product
+from apps.sale.models import Sale
+from apps.users.models import CustomUser
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = create_owner(("view_sales", Sale), ("view_products", Product))
+        self.company = create_company(self.user)
+        self.product = Product.objects.create(
+            company=self.company,
+            name="Café",
+            description="Descripción",
+            price=Decimal("10.00"),
+            stock=100,
+        )
+        Sale.objects.create(
+            company=self.company,
+            product=self.product,
+            customer="Cliente",
+            quantity=2,
+            unit_price=Decimal("10.00"),
+            total_price=Decimal("0"),
+            date=timezone.now(),
+            sold_by=self.user,
+        )
+        other = CustomUser.objects.create_user(email="other@example.com")
+        Product.objects.create(
+            company=create_company(other, "Otra"),
+            name="Ajeno",
+            description="Descripción",
+            price=Decimal("1.00"),
+            stock=1,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def download(self, url, params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content)
+
+    def test_csv_export_streams_only_company_rows(self):
+        content = self.download("/api/exports/products/", {"file_format": "csv"})
+
+        lines = content.decode("utf-8-sig").splitlines()
+        self.assertEqual(
+            lines[0], "id,nombre,descripcion,precio,stock,creado,actualizado"
+        )
+        self.assertEqual(len(lines), 2)
+        self.assertIn("Café", lines[1])
+
+    def test_ndjson_export_has_one_object_per_line(self):
+        content = self.download("/api/exports/sales/", {"file_format": "ndjson"})
+
+        rows = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["producto"], "Café")
+        self.assertEqual(rows[0]["total"], "20.00")
+        self.assertEqual(rows[0]["vendedor"], "owner@example.com")
+
+    def test_xlsx_export_is_a_valid_workbook(self):
+        content = self.download("/api/exports/sales/", {"file_format": "xlsx"})
+
+        sheet = load_workbook(io.BytesIO(content), read_only=True)["sales"]
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(rows[0][3], "producto")
+        self.assertEqual(rows[1][3], "Café")
+
+    def test_supplier_export_requires_export_permission(self):
+        response = self.client.get("/api/exports/suppliers/")
+
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import ExportViewSet
+
+router = DefaultRouter()
+router.register(r"", ExportViewSet, basename="exports")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
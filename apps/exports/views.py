@@ -0,0 +1,78 @@
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from apps.company.mixins import CompanyMembershipMixin
+from apps.exports.services.export_service import ExportService
+from apps.users.decorators import custom_permission_required
+
+
+class ExportViewSet(CompanyMembershipMixin, viewsets.ViewSet):
+    permission_classes = [IsAuthenticated]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = ExportService()
+
+    def _export(self, request, resource):
+        try:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
+                return Response(
+                    {"error": "El usuario no tiene compañías asignadas"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            file_format = request.query_params.get("file_format", "csv").lower()
+            if file_format not in self.service.FORMATS:
+                return Response(
+                    {
+                        "error": "Formato no soportado. Use csv, ndjson o xlsx",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            filename = f"{resource}_{timezone.now():%Y%m%d}.{file_format}"
+            content_type = self.service.FORMATS[file_format]
+
+            if file_format == "xlsx":
+                return FileResponse(
+                    self.service.write_xlsx(resource, company_ids),
+                    as_attachment=True,
+                    filename=filename,
+                    content_type=content_type,
+                )
+
+            if file_format == "csv":
+                rows = self.service.stream_csv(resource, company_ids)
+            else:
+                rows = self.service.stream_ndjson(resource, company_ids)
+            response = StreamingHttpResponse(rows, content_type=content_type)
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return response
+        except Exception as e:
+            return Response(
+                {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    @action(detail=False, methods=["get"], url_path="sales")
+    @custom_permission_required("view_sales")
+    def sales(self, request):
+        return self._export(request, "sales")
+
+    @action(detail=False, methods=["get"], url_path="purchases")
+    @custom_permission_required("view_purchases")
+    def purchases(self, request):
+        return self._export(request, "purchases")
+
+    @action(detail=False, methods=["get"], url_path="products")
+    @custom_permission_required("view_products")
+    def products(self, request):
+        return self._export(request, "products")
+
+    @action(detail=False, methods=["get"], url_path="suppliers")
+    @custom_permission_required("export_supplier")
+    def suppliers(self, request):
+        return self._export(request, "suppliers")
@@ -0,0 +1,96 @@
+# Generated by Django 4.2.15 on 2026-10-17 16:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("product", "0002_product_company"),
+        ("company", "0004_company_logo"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InventoryMovement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("sale", "Venta"),
+                            ("purchase", "Compra"),
+                            ("adjustment", "Ajuste"),
+                            ("reversal", "Reversión"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "quantity",
+                    models.IntegerField(help_text="Cambio de stock con signo."),
+                ),
+                (
+                    "unit_value",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=10),
+                ),
+                ("source_type", models.CharField(blank=True, max_length=20)),
+                ("source_id", models.BigIntegerField(blank=True, null=True)),
+                ("date", models.DateTimeField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "company",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="company.company",
+                    ),
+                ),
+                (
+                    "performed_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="product.product",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["product", "date"],
+                        name="inventory_i_product_be96c8_idx",
+                    ),
+                    models.Index(
+                        fields=["company", "-date", "-id"],
+                        name="inventory_i_company_68972e_idx",
+                    ),
+                    models.Index(
+                        fields=["source_type", "source_id"],
+                        name="inventory_i_source__3135ed_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,80 @@
+from django.db import migrations
+from django.db.models import Sum
+
+
+def backfill_movements(apps, schema_editor):
+    Product = apps.get_model("product", "Product")
+    Sale = apps.get_model("sale", "Sale")
+    Purchase = apps.get_model("purchase", "Purchase")
+    InventoryMovement = apps.get_model("inventory", "InventoryMovement")
+
+    def sale_movements():
+        for sale in Sale.objects.order_by("id").iterator(chunk_size=2000):
+            yield InventoryMovement(
+                company_id=sale.company_id,
+                product_id=sale.product_id,
+                kind="sale",
+                quantity=-sale.quantity,
+                unit_value=sale.unit_price,
+                source_type="sale",
+                source_id=sale.id,
+                performed_by_id=sale.sold_by_id,
+                date=sale.date,
+            )
+
+    def purchase_movements():
+        for purchase in Purchase.objects.order_by("id").iterator(chunk_size=2000):
+            yield InventoryMovement(
+                company_id=purchase.company_id,
+                product_id=purchase.product_id,
+                kind="purchase",
+                quantity=purchase.quantity,
+                unit_value=purchase.unit_cost,
+                source_type="purchase",
+                source_id=purchase.id,
+                date=purchase.date,
+            )
+
+    def opening_movements():
+        # Ajuste de apertura para que la suma del libro coincida con el stock actual
+        sold = dict(
+            Sale.objects.values("product_id")
+            .annotate(total=Sum("quantity"))
+            .values_list("product_id", "total")
+        )
+        purchased = dict(
+            Purchase.objects.values("product_id")
+            .annotate(total=Sum("quantity"))
+            .values_list("product_id", "total")
+        )
+        for product in Product.objects.order_by("id").iterator(chunk_size=2000):
+            opening = (
+                product.stock
+                - purchased.get(product.id, 0)
+                + sold.get(product.id, 0)
+            )
+            yield InventoryMovement(
+                company_id=product.company_id,
+                product_id=product.id,
+                kind="adjustment",
+                quantity=opening,
+                unit_value=product.price,
+                source_type="product",
+                source_id=product.id,
+                date=product.created_at,
+            )
+
+    for movements in (opening_movements(), sale_movements(), purchase_movements()):
+        InventoryMovement.objects.bulk_create(movements, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0001_initial"),
+        ("sale", "0002_alter_sale_date"),
+        ("purchase", "0002_purchase_delete_sale"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_movements, migrations.RunPython.noop),
+    ]
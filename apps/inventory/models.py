@@ -0,0 +1,46 @@
+from django.db import models
+from apps.company.models import Company
+from apps.product.models import Product
+from apps.users.models import CustomUser
+
+
+class InventoryMovement(models.Model):
+    SALE = "sale"
+    PURCHASE = "purchase"
+    ADJUSTMENT = "adjustment"
+    REVERSAL = "reversal"
+
+    KIND_CHOICES = [
+        (SALE, "Venta"),
+        (PURCHASE, "Compra"),
+        (ADJUSTMENT, "Ajuste"),
+        (REVERSAL, "Reversión"),
+    ]
+
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, null=True)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    quantity = models.IntegerField(help_text="Cambio de stock con signo.")
+    unit_value = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    source_type = models.CharField(max_length=20, blank=True)
+    source_id = models.BigIntegerField(null=True, blank=True)
+    performed_by = models.ForeignKey(
+        CustomUser, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    date = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["product", "date"]),
+            models.Index(fields=["company", "-date", "-id"]),
+            models.Index(fields=["source_type", "source_id"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValueError("Los movimientos de inventario no se pueden modificar")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.quantity:+d} ({self.product_id})"
@@ -0,0 +1,144 @@
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from apps.inventory.models import InventoryMovement
+from apps.product.models import Product
+
+
+class InsufficientStockError(Exception):
+    pass
+
+
+class InventoryService:
+    def record(
+        self,
+        company_id,
+        product_id,
+        kind,
+        quantity,
+        date=None,
+        unit_value=0,
+        source_type="",
+        source_id=None,
+        performed_by_id=None,
+        apply_to_stock=True,
+    ):
+        # Debe ejecutarse dentro de la transacción del cambio que lo origina
+        movement = InventoryMovement.objects.create(
+            company_id=company_id,
+            product_id=product_id,
+            kind=kind,
+            quantity=quantity,
+            unit_value=unit_value,
+            source_type=source_type,
+            source_id=source_id,
+            performed_by_id=performed_by_id,
+            date=date or timezone.now(),
+        )
+        if apply_to_stock and quantity:
+            Product.objects.filter(pk=product_id).update(stock=F("stock") + quantity)
+        return movement
+
+    def record_adjustments(self, products, previous_stock=None, batch_size=1000):
+        # Equivalente al ajuste de post_save para escrituras con bulk_create
+        previous_stock = previous_stock or {}
+        now = timezone.now()
+        InventoryMovement.objects.bulk_create(
+            [
+                InventoryMovement(
+                    company_id=product.company_id,
+                    product_id=product.pk,
+                    kind=InventoryMovement.ADJUSTMENT,
+                    quantity=product.stock - previous_stock.get(product.pk, 0),
+                    unit_value=product.price,
+                    source_type="product",
+                    source_id=product.pk,
+                    date=now,
+                )
+                for product in products
+                if product.stock != previous_stock.get(product.pk, 0)
+            ],
+            batch_size=batch_size,
+        )
+
+    def take_stock(self, product_id, quantity):
+        # Un único UPDATE condicional: valida y descuenta sin leer antes la fila
+        # ni bloquearla con SELECT ... FOR UPDATE
+        taken = Product.objects.filter(pk=product_id, stock__gte=quantity).update(
+            stock=F("stock") - quantity
+        )
+        if not taken:
+            raise InsufficientStockError(
+                f"Stock insuficiente para vender {quantity} unidades del producto"
+            )
+
+    def record_source(
+        self, source_type, kind, sign, source, unit_value, apply_to_stock=True
+    ):
+        return self.record(
+            source.company_id,
+            source.product_id,
+            kind,
+            sign * source.quantity,
+            date=source.date,
+            unit_value=unit_value,
+            source_type=source_type,
+            source_id=source.pk,
+            performed_by_id=getattr(source, "sold_by_id", None),
+            apply_to_stock=apply_to_stock,
+        )
+
+    def record_sale(self, sale):
+        self.take_stock(sale.product_id, sale.quantity)
+        return self.record_source(
+            "sale",
+            InventoryMovement.SALE,
+            -1,
+            sale,
+            sale.unit_price,
+            apply_to_stock=False,
+        )
+
+    def reverse_sale(self, sale):
+        return self.record_source(
+            "sale", InventoryMovement.REVERSAL, 1, sale, sale.unit_price
+        )
+
+    def record_purchase(self, purchase):
+        return self.record_source(
+            "purchase", InventoryMovement.PURCHASE, 1, purchase, purchase.unit_cost
+        )
+
+    def reverse_purchase(self, purchase):
+        return self.record_source(
+            "purchase", InventoryMovement.REVERSAL, -1, purchase, purchase.unit_cost
+        )
+
+    def get_stock(self, product_id, at=None):
+        movements = InventoryMovement.objects.filter(product_id=product_id)
+        if at:
+            movements = movements.filter(date__lte=at)
+        return movements.aggregate(stock=Sum("quantity"))["stock"] or 0
+
+    def get_stock_history(self, product_id, since):
+        opening = self.get_stock(product_id, at=since)
+        daily_changes = (
+            InventoryMovement.objects.filter(product_id=product_id, date__gt=since)
+            .annotate(day=TruncDate("date"))
+            .values("day")
+            .annotate(change=Sum("quantity"))
+            .order_by("day")
+        )
+
+        history = []
+        stock = opening
+        for row in daily_changes:
+            stock += row["change"]
+            history.append(
+                {
+                    "date": row["day"].strftime("%Y-%m-%d"),
+                    "change": row["change"],
+                    "stock": stock,
+                }
+            )
+        return {"opening_stock": opening, "history": history}
@@ -0,0 +1,118 @@
+import base64
+import json
+from django.db.models import CharField, F, IntegerField, Q, Value
+from django.utils.dateparse import parse_datetime
+from apps.purchase.models import Purchase
+from apps.sale.models import Sale
+
+
+SALE = "Venta"
+PURCHASE = "Compra"
+
+FEED_FIELDS = [
+    "movement_type",
+    "id",
+    "product_id",
+    "product_name",
+    "quantity",
+    "date",
+    "amount",
+    "unit_value",
+    "person",
+    "seller_id",
+    "seller_first_name",
+    "seller_last_name",
+]
+
+
+def encode_cursor(row):
+    payload = [row["date"].isoformat(), row["movement_type"], row["id"]]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        date, movement_type, movement_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode())
+        )
+        date = parse_datetime(date)
+        movement_id = int(movement_id)
+    except (ValueError, TypeError):
+        raise ValueError("Cursor inválido")
+    if date is None or movement_type not in (SALE, PURCHASE):
+        raise ValueError("Cursor inválido")
+    return date, movement_type, movement_id
+
+
+class MovementFeedService:
+    def _sales(self, companies):
+        return Sale.objects.filter(company__in=companies).annotate(
+            movement_type=Value(SALE, output_field=CharField()),
+            product_name=F("product__name"),
+            amount=F("total_price"),
+            unit_value=F("unit_price"),
+            person=F("customer"),
+            seller_id=F("sold_by_id"),
+            seller_first_name=F("sold_by__first_name"),
+            seller_last_name=F("sold_by__last_name"),
+        )
+
+    def _purchases(self, companies):
+        return Purchase.objects.filter(company__in=companies).annotate(
+            movement_type=Value(PURCHASE, output_field=CharField()),
+            product_name=F("product__name"),
+            amount=F("total_cost"),
+            unit_value=F("unit_cost"),
+            person=F("supplier"),
+            seller_id=Value(None, output_field=IntegerField()),
+            seller_first_name=Value(None, output_field=CharField()),
+            seller_last_name=Value(None, output_field=CharField()),
+        )
+
+    def _after_cursor(self, movement_type, cursor):
+        # Equivale a (date, movement_type, id) < cursor con el tipo fijo de la rama
+        date, cursor_type, cursor_id = cursor
+        if movement_type == cursor_type:
+            return Q(date__lt=date) | Q(date=date, id__lt=cursor_id)
+        if movement_type < cursor_type:
+            return Q(date__lte=date)
+        return Q(date__lt=date)
+
+    def get_page(self, companies, limit=20, cursor=None):
+        branches = []
+        for movement_type, queryset in (
+            (SALE, self._sales(companies)),
+            (PURCHASE, self._purchases(companies)),
+        ):
+            if cursor:
+                queryset = queryset.filter(self._after_cursor(movement_type, cursor))
+            branches.append(
+                queryset.values(*FEED_FIELDS).order_by("-date", "-id")[: limit + 1]
+            )
+
+        rows = list(
+            branches[0]
+            .union(branches[1], all=True)
+            .order_by("-date", "-movement_type", "-id")[: limit + 1]
+        )
+        next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return [self.serialize(row) for row in rows[:limit]], next_cursor
+
+    def serialize(self, row):
+        is_sale = row["movement_type"] == SALE
+        item = {
+            "id": row["id"],
+            "type": row["movement_type"],
+            "product_id": row["product_id"],
+            "product_name": row["product_name"],
+            "quantity": row["quantity"],
+            "date": row["date"].strftime("%Y-%m-%d %H:%M:%S"),
+            "amount": float(row["amount"]),
+            "unit_value": float(row["unit_value"]),
+            "person": row["person"],
+            "stock_change": -row["quantity"] if is_sale else row["quantity"],
+        }
+        if is_sale:
+            full_name = f"{row['seller_first_name']} {row['seller_last_name']}".strip()
+            item["sold_by"] = full_name if row["seller_id"] else "Usuario eliminado"
+        return item
@@ -0,0 +1,54 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from apps.inventory.models import InventoryMovement
+from apps.inventory.services.inventory_service import InventoryService
+from apps.product.models import Product
+from apps.purchase.models import Purchase
+from apps.sale.models import Sale
+
+
+def _deleted_directly(model, origin):
+    # Al borrar un producto o una compañía sus movimientos se eliminan en cascada
+    return isinstance(origin, model) or getattr(origin, "model", None) is model
+
+
+@receiver(post_delete, sender=Sale)
+def reverse_deleted_sale(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(Sale, origin):
+        InventoryService().reverse_sale(instance)
+
+
+@receiver(post_delete, sender=Purchase)
+def reverse_deleted_purchase(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(Purchase, origin):
+        InventoryService().reverse_purchase(instance)
+
+
+@receiver(pre_save, sender=Product)
+def remember_previous_stock(sender, instance, **kwargs):
+    instance._previous_stock = None
+    if instance.pk:
+        instance._previous_stock = (
+            Product.objects.filter(pk=instance.pk)
+            .values_list("stock", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Product)
+def record_stock_adjustment(sender, instance, created, **kwargs):
+    if not isinstance(instance.stock, int):
+        return
+    previous = 0 if created else instance._previous_stock
+    if previous is None or instance.stock == previous:
+        return
+    InventoryService().record(
+        instance.company_id,
+        instance.pk,
+        InventoryMovement.ADJUSTMENT,
+        instance.stock - previous,
+        unit_value=instance.price,
+        source_type="product",
+        source_id=instance.pk,
+        apply_to_stock=False,
+    )
@@ -0,0 +1,96 @@
+from decimal import Decimal
+from django.db.models import Sum
+from django.test import TestCase
+from django.utils import timezone
+from apps.company.testing import create_company, create_owner
+from apps.inventory.models import InventoryMovement
+from apps.product.models import Product
+from apps.purchase.models import Purchase
+from apps.sale.models import Sale
+
+
+class InventoryLedgerTests(TestCase):
+    def setUp(self):
+        self.user = create_owner()
+        self.company = create_company(self.user)
+        self.product = Product.objects.create(
+            company=self.company,
+            name="Producto",
+            description="Descripción",
+            price=Decimal("10.00"),
+            stock=20,
+        )
+
+    def create_sale(self, quantity):
+        return Sale.objects.create(
+            company=self.company,
+            product=self.product,
+            customer="Cliente",
+            quantity=quantity,
+            unit_price=Decimal("10.00"),
+            total_price=Decimal("0"),
+            date=timezone.now(),
+            sold_by=self.user,
+        )
+
+    def assertStockMatchesLedger(self, expected):
+        self.product.refresh_from_db()
+        ledger = InventoryMovement.objects.filter(product=self.product).aggregate(
+            stock=Sum("quantity")
+        )["stock"]
+        self.assertEqual(self.product.stock, expected)
+        self.assertEqual(ledger, expected)
+
+    def test_updating_a_sale_writes_a_compensating_movement(self):
+        sale = self.create_sale(5)
+        self.assertStockMatchesLedger(15)
+
+        sale.quantity = 3
+        sale.save()
+
+        self.assertStockMatchesLedger(17)
+        kinds = list(
+            InventoryMovement.objects.filter(source_type="sale")
+            .order_by("id")
+            .values_list("kind", "quantity")
+        )
+        self.assertEqual(kinds, [("sale", -5), ("reversal", 5), ("sale", -3)])
+
+    def test_deleting_movements_restores_stock(self):
+        sale = self.create_sale(4)
+        purchase = Purchase.objects.create(
+            company=self.company,
+            product=self.product,
+            supplier="Proveedor",
+            quantity=10,
+            unit_cost=Decimal("6.00"),
+            total_cost=Decimal("0"),
+        )
+        self.assertStockMatchesLedger(26)
+
+        sale.delete()
+        purchase.delete()
+
+        self.assertStockMatchesLedger(20)
+
+    def test_manual_stock_changes_are_recorded_as_adjustments(self):
+        self.product.stock = 12
+        self.product.save()
+
+        self.assertStockMatchesLedger(12)
+        adjustment = InventoryMovement.objects.filter(kind="adjustment").last()
+        self.assertEqual(adjustment.quantity, -8)
+
+    def test_movements_are_append_only(self):
+        movement = InventoryMovement.objects.get()
+        movement.quantity = 100
+
+        with self.assertRaises(ValueError):
+            movement.save()
+
+    def test_deleting_a_product_removes_its_movements(self):
+        self.create_sale(2)
+
+        self.product.delete()
+
+        self.assertFalse(InventoryMovement.objects.exists())
@@ -0,0 +1,77 @@
+from django.core.files.storage import default_storage
+from apps.company.models import Company
+from apps.jobs.models import Job
+from apps.product.services.analytics_service import ProductAnalyticsService
+from apps.product.services.import_service import ImportFileError, ProductImportService
+from apps.sale.prediction.batch_trainer import SalesBatchTrainer
+from apps.sale.prediction.sales_predictor import SalesPredictor
+
+
+class JobError(Exception):
+    pass
+
+
+def import_products(job, progress):
+    payload = job.payload
+    service = ProductImportService()
+    try:
+        with default_storage.open(payload["path"], "rb") as uploaded_file:
+            return service.import_file(
+                uploaded_file,
+                payload["extension"],
+                job.company,
+                mode=payload["mode"],
+                on_progress=lambda done, total: progress(done * 100 // total),
+            )
+    except ImportFileError as e:
+        raise JobError(str(e))
+    finally:
+        default_storage.delete(payload["path"])
+
+
+def train_sales_model(job, progress):
+    payload = job.payload
+    predictor = SalesPredictor(job.company)
+    success = predictor.train_model(
+        product_id=payload["product_id"],
+        days_back=payload["days_history"],
+        time_unit=payload["time_unit"],
+    )
+    if not success:
+        raise JobError("No hay suficientes datos históricos para entrenar el modelo")
+    progress(90)
+    predictor.save_model(payload["product_id"], payload["time_unit"])
+    return {"message": "Modelo entrenado y guardado exitosamente"}
+
+
+def train_all_sales_models(job, progress):
+    payload = job.payload
+    trainer = SalesBatchTrainer(processes=payload.get("processes"))
+    return trainer.train(
+        job.company,
+        days_back=payload["days_history"],
+        time_unit=payload["time_unit"],
+        on_progress=lambda done, total: progress(done * 90 // total),
+    )
+
+
+ANALYTICS_REPORTS = {
+    "profitability": "get_profitability",
+    "inventory_rotation": "get_inventory_rotation",
+    "purchase_forecast": "get_purchase_forecast",
+}
+
+
+def product_analytics(job, progress):
+    payload = job.payload
+    companies = Company.objects.filter(id__in=payload["company_ids"])
+    report = getattr(ProductAnalyticsService(), ANALYTICS_REPORTS[payload["report"]])
+    return report(companies, **payload["options"])
+
+
+HANDLERS = {
+    Job.IMPORT_PRODUCTS: import_products,
+    Job.TRAIN_SALES_MODEL: train_sales_model,
+    Job.TRAIN_ALL_SALES_MODELS: train_all_sales_models,
+    Job.PRODUCT_ANALYTICS: product_analytics,
+}
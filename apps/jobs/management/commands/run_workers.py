@@ -0,0 +1,86 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.jobs import worker
+from apps.jobs.services.job_service import JobService
+
+
+class Command(BaseCommand):
+    help = "Ejecuta los trabajos en segundo plano en un grupo de procesos"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Número de procesos que ejecutan trabajos en paralelo",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Segundos de espera cuando la cola está vacía",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Termina cuando no quedan trabajos pendientes",
+        )
+
+    def handle(self, *args, **options):
+        processes = max(options["processes"], 1)
+        service = JobService()
+        name = service.worker_name()
+        self.stdout.write(f"Worker {name} iniciado con {processes} procesos")
+
+        # "spawn" evita que los hijos hereden la conexión a la base de datos
+        pool = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=worker.setup,
+        )
+        running = {}
+        # Late varias veces por plazo para que un retraso puntual no lo venza
+        heartbeat_every = settings.JOB_LEASE_TIMEOUT / 3
+        last_heartbeat = time.monotonic()
+        try:
+            while True:
+                free = processes - len(running)
+                if free:
+                    for job_id in service.claim(free, worker=name):
+                        running[pool.submit(worker.run_job, job_id)] = job_id
+
+                if not running:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                done, _ = wait(
+                    running,
+                    timeout=options["poll_interval"],
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    job_id = running.pop(future)
+                    try:
+                        self.stdout.write(f"Trabajo {job_id}: {future.result()}")
+                    except Exception as e:
+                        # El proceso hijo murió sin poder cerrar el trabajo
+                        service.mark_failed(job_id, str(e) or type(e).__name__)
+                        self.stderr.write(f"Trabajo {job_id} interrumpido: {e}")
+
+                if running and time.monotonic() - last_heartbeat >= heartbeat_every:
+                    service.heartbeat(list(running.values()))
+                    last_heartbeat = time.monotonic()
+        except KeyboardInterrupt:
+            self.stdout.write("Deteniendo worker, esperando trabajos en curso")
+        finally:
+            # Los trabajos que no llegaron a empezar vuelven a la cola
+            service.requeue(
+                [job_id for future, job_id in running.items() if future.cancel()]
+            )
+            pool.shutdown(wait=True)
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.15 on 2026-10-17 17:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="job",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("import_products", "Importación de productos"),
+                    ("train_sales_model", "Entrenamiento del modelo de ventas"),
+                    (
+                        "train_all_sales_models",
+                        "Entrenamiento de los modelos de todos los productos",
+                    ),
+                    ("product_analytics", "Reporte de productos"),
+                ],
+                max_length=30,
+            ),
+        ),
+    ]
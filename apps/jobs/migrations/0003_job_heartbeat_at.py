@@ -0,0 +1,19 @@
+# Generated by Django 4.2.15 on 2026-10-17 17:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0002_job_train_all_sales_models"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="heartbeat_at",
+            field=models.DateTimeField(
+                blank=True, help_text="Última señal de vida del worker.", null=True
+            ),
+        ),
+    ]
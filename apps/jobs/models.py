@@ -0,0 +1,64 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from apps.company.models import Company
+from apps.users.models import CustomUser
+
+
+class Job(models.Model):
+    IMPORT_PRODUCTS = "import_products"
+    TRAIN_SALES_MODEL = "train_sales_model"
+    TRAIN_ALL_SALES_MODELS = "train_all_sales_models"
+    PRODUCT_ANALYTICS = "product_analytics"
+
+    KIND_CHOICES = [
+        (IMPORT_PRODUCTS, "Importación de productos"),
+        (TRAIN_SALES_MODEL, "Entrenamiento del modelo de ventas"),
+        (TRAIN_ALL_SALES_MODELS, "Entrenamiento de los modelos de todos los productos"),
+        (PRODUCT_ANALYTICS, "Reporte de productos"),
+    ]
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (PENDING, "Pendiente"),
+        (RUNNING, "En ejecución"),
+        (SUCCEEDED, "Completado"),
+        (FAILED, "Fallido"),
+    ]
+
+    company = models.ForeignKey(Company, on_delete=models.CASCADE)
+    created_by = models.ForeignKey(
+        CustomUser, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    progress = models.PositiveSmallIntegerField(
+        default=0, help_text="Porcentaje de avance."
+    )
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True, help_text="Última señal de vida del worker."
+    )
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Sólo los trabajos pendientes participan en la cola
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(status="pending"),
+                name="job_pending_queue_idx",
+            ),
+            models.Index(fields=["created_by", "-created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.status})"
@@ -0,0 +1,20 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.response import Response
+from apps.jobs.serializers import JobSerializer
+
+
+def wants_background(request):
+    return request.query_params.get("async", "false").lower() == "true"
+
+
+def job_accepted(request, job):
+    return Response(
+        {
+            "job": JobSerializer(job).data,
+            "status_url": request.build_absolute_uri(
+                reverse("jobs-detail", args=[job.pk])
+            ),
+        },
+        status=status.HTTP_202_ACCEPTED,
+    )
@@ -0,0 +1,147 @@
+import logging
+import os
+import socket
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    DatabaseError,
+    connection,
+    connections,
+    transaction,
+)
+from django.db.models import Q
+from django.utils import timezone
+from apps.jobs.handlers import HANDLERS, JobError
+from apps.jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+
+class JobService:
+    UPLOAD_DIR = "jobs/uploads"
+
+    def __init__(self):
+        self._progress_connection = None
+
+    def enqueue(self, kind, company, user, payload):
+        return Job.objects.create(
+            kind=kind, company=company, created_by=user, payload=payload
+        )
+
+    def store_upload(self, uploaded_file):
+        # El worker corre en otro proceso: el archivo debe sobrevivir a la petición
+        extension = os.path.splitext(uploaded_file.name)[1].lower()
+        return default_storage.save(
+            f"{self.UPLOAD_DIR}/{uuid.uuid4().hex}{extension}", uploaded_file
+        )
+
+    def get_by_user(self, user):
+        return Job.objects.filter(created_by=user).order_by("-created_at", "-id")
+
+    def get_for_user(self, pk, user):
+        return self.get_by_user(user).filter(pk=pk).first()
+
+    def worker_name(self):
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def claim(self, limit, worker=""):
+        self.requeue_stale()
+        # SKIP LOCKED deja que varios workers consuman la cola sin bloquearse
+        with transaction.atomic():
+            ids = list(
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(status=Job.PENDING)
+                .order_by("created_at", "id")
+                .values_list("id", flat=True)[:limit]
+            )
+            if ids:
+                now = timezone.now()
+                Job.objects.filter(id__in=ids).update(
+                    status=Job.RUNNING, worker=worker, started_at=now, heartbeat_at=now
+                )
+        return ids
+
+    def heartbeat(self, job_ids):
+        Job.objects.filter(pk__in=job_ids, status=Job.RUNNING).update(
+            heartbeat_at=timezone.now()
+        )
+
+    def requeue_stale(self, lease=None):
+        """Devuelve a la cola los trabajos de workers que dejaron de latir.
+
+        Si el host del worker muere (OOM, SIGKILL, despliegue) sus trabajos se
+        quedarían en ejecución para siempre; pasado el plazo sin latido otro
+        worker los vuelve a tomar.
+        """
+        lease = settings.JOB_LEASE_TIMEOUT if lease is None else lease
+        expired = timezone.now() - timedelta(seconds=lease)
+        # Los trabajos tomados antes de existir el latido se miden por su inicio
+        stale = Q(heartbeat_at__lt=expired) | Q(
+            heartbeat_at__isnull=True, started_at__lt=expired
+        )
+        return Job.objects.filter(stale, status=Job.RUNNING).update(
+            status=Job.PENDING, worker="", started_at=None, heartbeat_at=None
+        )
+
+    def execute(self, job_id):
+        job = Job.objects.select_related("company").get(pk=job_id)
+        try:
+            result = HANDLERS[job.kind](
+                job, lambda progress: self.report_progress(job, progress)
+            )
+        except JobError as e:
+            self._finish(job, Job.FAILED, error=str(e))
+        except Exception as e:
+            logger.exception("Error ejecutando el trabajo %s", job.pk)
+            self._finish(job, Job.FAILED, error=str(e))
+        else:
+            self._finish(job, Job.SUCCEEDED, result=result)
+        finally:
+            if self._progress_connection is not None:
+                self._progress_connection.close()
+                self._progress_connection = None
+        return job
+
+    def requeue(self, job_ids):
+        Job.objects.filter(pk__in=job_ids, status=Job.RUNNING).update(
+            status=Job.PENDING, worker="", started_at=None, heartbeat_at=None
+        )
+
+    def mark_failed(self, job_id, error):
+        Job.objects.filter(pk=job_id, status=Job.RUNNING).update(
+            status=Job.FAILED, error=error, finished_at=timezone.now()
+        )
+
+    def report_progress(self, job, progress):
+        progress = max(0, min(int(progress), 100))
+        if progress == job.progress:
+            return
+        job.progress = progress
+        if not connection.in_atomic_block:
+            Job.objects.filter(pk=job.pk).update(progress=progress)
+            return
+
+        # Dentro de la transacción del trabajo el avance no sería visible hasta
+        # el commit, así que se escribe por una conexión propia en autocommit
+        if self._progress_connection is None:
+            self._progress_connection = connections.create_connection(DEFAULT_DB_ALIAS)
+        try:
+            with self._progress_connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {Job._meta.db_table} SET progress = %s WHERE id = %s",
+                    [progress, job.pk],
+                )
+        except DatabaseError:
+            logger.warning("No se pudo registrar el avance del trabajo %s", job.pk)
+
+    def _finish(self, job, status, result=None, error=""):
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = timezone.now()
+        if status == Job.SUCCEEDED:
+            job.progress = 100
+        job.save(update_fields=["status", "result", "error", "finished_at", "progress"])
@@ -0,0 +1,162 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.company.testing import create_company, create_owner
+from apps.jobs.models import Job
+from apps.jobs.services.job_service import JobService
+from apps.product.models import Product
+from apps.sale.models import Sale
+from apps.users.models import CustomUser
+
+
+class JobTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = create_owner(
+            ("create_product", Product),
+            ("view_products", Product),
+            ("view_sales", Sale),
+        )
+        self.company = create_company(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.service = JobService()
+
+    def enqueue(self, **payload):
+        return self.service.enqueue(
+            Job.PRODUCT_ANALYTICS, self.company, self.user, payload
+        )
+
+    def test_background_import_runs_in_the_worker(self):
+        content = b"name,description,price,stock\nCafe,Molido,12.5,10\nTe,Verde,-1,3\n"
+
+        response = self.client.post(
+            "/api/products/import-file/?async=true",
+            {"file": SimpleUploadedFile("productos.csv", content)},
+            format="multipart",
+        )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["job"]["status"], Job.PENDING)
+        self.assertTrue(
+            response.data["status_url"].endswith(
+                f"/api/jobs/{response.data['job']['id']}/"
+            )
+        )
+        self.assertFalse(Product.objects.exists())
+        job = Job.objects.get()
+        self.assertTrue(default_storage.exists(job.payload["path"]))
+
+        self.assertEqual(self.service.claim(5, worker="test"), [job.pk])
+        self.service.execute(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.progress, 100)
+        self.assertEqual((job.result["created"], job.result["errors"]), (1, 1))
+        self.assertTrue(Product.objects.filter(name="Cafe").exists())
+        self.assertFalse(default_storage.exists(job.payload["path"]))
+
+        response = self.client.get(f"/api/jobs/{job.pk}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["result"]["created"], 1)
+        self.assertNotIn("payload", response.data)
+
+    def test_claim_takes_the_oldest_pending_jobs_once(self):
+        first = self.enqueue()
+        second = self.enqueue()
+        third = self.enqueue()
+        Job.objects.filter(pk=first.pk).update(status=Job.SUCCEEDED)
+
+        self.assertEqual(self.service.claim(1, worker="a"), [second.pk])
+        self.assertEqual(self.service.claim(5, worker="b"), [third.pk])
+        self.assertEqual(self.service.claim(5, worker="c"), [])
+
+        second.refresh_from_db()
+        self.assertEqual((second.status, second.worker), (Job.RUNNING, "a"))
+        self.assertIsNotNone(second.started_at)
+
+        self.service.requeue([second.pk])
+        self.assertEqual(self.service.claim(5, worker="d"), [second.pk])
+
+    @override_settings(JOB_LEASE_TIMEOUT=60)
+    def test_claim_reclaims_jobs_of_workers_that_stopped_beating(self):
+        alive = self.enqueue()
+        dead = self.enqueue()
+        self.assertEqual(self.service.claim(5, worker="a"), [alive.pk, dead.pk])
+
+        expired = timezone.now() - timedelta(seconds=120)
+        Job.objects.update(heartbeat_at=expired)
+        self.service.heartbeat([alive.pk])
+
+        self.assertEqual(self.service.claim(5, worker="b"), [dead.pk])
+        alive.refresh_from_db()
+        dead.refresh_from_db()
+        self.assertEqual((alive.status, alive.worker), (Job.RUNNING, "a"))
+        self.assertEqual((dead.status, dead.worker), (Job.RUNNING, "b"))
+
+    def test_failed_training_is_reported_on_the_job(self):
+        response = self.client.post(
+            "/api/sales/train-model/?async=true", {"days_history": 30}, format="json"
+        )
+        self.assertEqual(response.status_code, 202)
+
+        job = self.service.execute(response.data["job"]["id"])
+
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(
+            job.error, "No hay suficientes datos históricos para entrenar el modelo"
+        )
+        self.assertIsNotNone(job.finished_at)
+
+    def test_background_report_matches_the_synchronous_one(self):
+        product = Product.objects.create(
+            company=self.company,
+            name="Producto",
+            description="Descripción",
+            price=Decimal("10.00"),
+            stock=3,
+        )
+        Sale.objects.create(
+            company=self.company,
+            product=product,
+            customer="Cliente",
+            quantity=2,
+            unit_price=Decimal("10.00"),
+            total_price=Decimal("0"),
+            date=timezone.now(),
+            sold_by=self.user,
+        )
+        url = "/api/products/purchase-forecast/"
+
+        expected = self.client.get(url, {"show_all": "true"})
+        response = self.client.get(url, {"show_all": "true", "async": "true"})
+
+        self.assertEqual(response.status_code, 202)
+        job = self.service.execute(response.data["job"]["id"])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result["summary"], expected.data["summary"])
+
+    def test_jobs_are_only_visible_to_their_creator(self):
+        job = self.enqueue()
+        other = CustomUser.objects.create_user(email="other@example.com")
+        self.client.force_authenticate(user=other)
+
+        self.assertEqual(self.client.get(f"/api/jobs/{job.pk}/").status_code, 404)
+        self.assertEqual(self.client.get("/api/jobs/").data["count"], 0)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get("/api/jobs/", {"status": Job.PENDING})
+        self.assertEqual([item["id"] for item in response.data["results"]], [job.pk])
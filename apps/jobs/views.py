@@ -0,0 +1,45 @@
+from rest_framework import status, viewsets
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from apps.jobs.serializers import JobSerializer
+from apps.jobs.services.job_service import JobService
+
+
+class JobViewSet(viewsets.ViewSet):
+    permission_classes = [IsAuthenticated]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = JobService()
+
+    def list(self, request):
+        try:
+            jobs = self.service.get_by_user(request.user)
+            kind = request.query_params.get("kind")
+            if kind:
+                jobs = jobs.filter(kind=kind)
+            job_status = request.query_params.get("status")
+            if job_status:
+                jobs = jobs.filter(status=job_status)
+            paginator = PageNumberPagination()
+            page = paginator.paginate_queryset(jobs, request, view=self)
+            return paginator.get_paginated_response(JobSerializer(page, many=True).data)
+        except Exception as e:
+            return Response(
+                {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    def retrieve(self, request, pk=None):
+        try:
+            job = self.service.get_for_user(pk, request.user)
+            if not job:
+                return Response(
+                    {"error": "Trabajo no encontrado"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            return Response(JobSerializer(job).data)
+        except Exception as e:
+            return Response(
+                {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
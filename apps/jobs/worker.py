@@ -0,0 +1,19 @@
+# Este módulo se importa en los procesos hijos antes de configurar Django, por
+# eso las importaciones de la aplicación se hacen dentro de las funciones.
+
+
+def setup():
+    import django
+
+    django.setup()
+
+
+def run_job(job_id):
+    from django.db import close_old_connections
+    from apps.jobs.services.job_service import JobService
+
+    close_old_connections()
+    try:
+        return JobService().execute(job_id).status
+    finally:
+        close_old_connections()
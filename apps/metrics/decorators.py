@@ -0,0 +1,11 @@
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(max_queries):
+    # Se declara en la acción; RequestMetricsMiddleware la hace cumplir
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+
+    return decorator
@@ -0,0 +1,90 @@
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import connections
+from apps.metrics import registry
+from apps.metrics.decorators import QueryBudgetExceeded
+
+current_request_stats = ContextVar("current_request_stats", default=None)
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+
+    def track_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+def _view_action(view_func, method):
+    actions = getattr(view_func, "actions", None) or {}
+    return actions.get(method.lower(), method.lower())
+
+
+def view_label(view_func, method):
+    # Los ViewSet se identifican por clase y acción: ProductViewSet.list
+    view_class = getattr(view_func, "cls", None) or getattr(
+        view_func, "view_class", None
+    )
+    if view_class is None:
+        return f"{view_func.__module__}.{view_func.__name__}"
+    return f"{view_class.__name__}.{_view_action(view_func, method)}"
+
+
+def view_query_budget(view_func, method):
+    view_class = getattr(view_func, "cls", None)
+    if view_class is not None:
+        view_func = getattr(view_class, _view_action(view_func, method), None)
+    return getattr(view_func, "query_budget", None)
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats.track_query))
+                response = self.get_response(request)
+        finally:
+            current_request_stats.reset(token)
+        duration = time.perf_counter() - started
+
+        view = getattr(request, "_metrics_view", "unresolved")
+        labels = (view, request.method)
+        registry.REQUESTS.inc(*labels, str(response.status_code))
+        registry.REQUEST_DURATION.observe(duration, *labels)
+        registry.DB_QUERIES.observe(stats.queries, *labels)
+        registry.DB_DURATION.observe(stats.db_time, *labels)
+        registry.SERIALIZER_DURATION.observe(stats.serializer_time, *labels)
+        # Las exportaciones en streaming no se leen para medirlas
+        if not response.streaming:
+            registry.RESPONSE_SIZE.observe(len(response.content), *labels)
+
+        budget = getattr(request, "_query_budget", None)
+        if budget is not None and stats.queries > budget:
+            registry.QUERY_BUDGET_EXCEEDED.inc(view)
+            if settings.QUERY_BUDGETS_ENFORCED:
+                raise QueryBudgetExceeded(
+                    f"{view} ejecutó {stats.queries} consultas SQL; "
+                    f"su presupuesto es {budget}"
+                )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics_view = view_label(view_func, request.method)
+        request._query_budget = view_query_budget(view_func, request.method)
@@ -0,0 +1,155 @@
+import threading
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels:
+        value = (
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labelvalues, value in sorted(values.items()):
+            labels = list(zip(self.labelnames, labelvalues))
+            yield f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        with self._lock:
+            counts, total = self._values.get(labelvalues, ([0] * len(self.buckets), 0))
+            counts[bisect_left(self.buckets, value)] += 1
+            self._values[labelvalues] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            values = {key: (list(c), t) for key, (c, t) in self._values.items()}
+        for labelvalues, (counts, total) in sorted(values.items()):
+            labels = list(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                bucket_labels = _format_labels(labels + [("le", _format_value(bound))])
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(labels)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Métricas del proceso actual: con varios procesos cada uno expone las suyas
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.register(
+    Counter(
+        "aiventory_http_requests_total",
+        "Peticiones atendidas por vista y código de estado",
+        ["view", "method", "status"],
+    )
+)
+REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "aiventory_http_request_duration_seconds",
+        "Latencia de la petición completa",
+        ["view", "method"],
+        LATENCY_BUCKETS,
+    )
+)
+DB_QUERIES = REGISTRY.register(
+    Histogram(
+        "aiventory_db_queries_per_request",
+        "Consultas SQL ejecutadas por petición",
+        ["view", "method"],
+        QUERY_BUCKETS,
+    )
+)
+DB_DURATION = REGISTRY.register(
+    Histogram(
+        "aiventory_db_duration_seconds",
+        "Tiempo en la base de datos por petición",
+        ["view", "method"],
+        LATENCY_BUCKETS,
+    )
+)
+SERIALIZER_DURATION = REGISTRY.register(
+    Histogram(
+        "aiventory_serializer_duration_seconds",
+        "Tiempo serializando la respuesta por petición",
+        ["view", "method"],
+        LATENCY_BUCKETS,
+    )
+)
+RESPONSE_SIZE = REGISTRY.register(
+    Histogram(
+        "aiventory_http_response_size_bytes",
+        "Tamaño del cuerpo de la respuesta",
+        ["view", "method"],
+        SIZE_BUCKETS,
+    )
+)
+QUERY_BUDGET_EXCEEDED = REGISTRY.register(
+    Counter(
+        "aiventory_query_budget_exceeded_total",
+        "Peticiones que superaron el presupuesto de consultas de su acción",
+        ["view"],
+    )
+)
@@ -0,0 +1,19 @@
+import time
+from apps.metrics.middleware import current_request_stats
+
+
+class TimedSerializerMixin:
+    """Suma a la petición en curso el tiempo de convertir instancias en datos."""
+
+    def to_representation(self, instance):
+        stats = current_request_stats.get()
+        # Solo se mide el serializador exterior; los anidados ya están dentro
+        if stats is None or stats.serializing:
+            return super().to_representation(instance)
+        stats.serializing = True
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            stats.serializer_time += time.perf_counter() - started
+            stats.serializing = False
@@ -0,0 +1,205 @@
+import re
+from decimal import Decimal
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.company.testing import create_company, create_owner
+from apps.metrics.decorators import QueryBudgetExceeded
+from apps.metrics.registry import Counter, Histogram, Registry
+from apps.product.models import Product
+from apps.product.views import ProductViewSet
+from apps.purchase.models import Purchase
+from apps.sale.models import Sale
+
+
+class RegistryTests(TestCase):
+    def test_histograms_render_cumulative_buckets(self):
+        registry = Registry()
+        histogram = registry.register(
+            Histogram("latency_seconds", "Latencia", ["view"], (0.1, 1))
+        )
+        counter = registry.register(Counter("hits_total", "Hits", ["view"]))
+        histogram.observe(0.05, 'a"b')
+        histogram.observe(0.5, 'a"b')
+        histogram.observe(3, 'a"b')
+        counter.inc("x", amount=2)
+
+        self.assertEqual(
+            registry.render().splitlines(),
+            [
+                "# HELP latency_seconds Latencia",
+                "# TYPE latency_seconds histogram",
+                'latency_seconds_bucket{view="a\\"b",le="0.1"} 1',
+                'latency_seconds_bucket{view="a\\"b",le="1"} 2',
+                'latency_seconds_bucket{view="a\\"b",le="+Inf"} 3',
+                'latency_seconds_sum{view="a\\"b"} 3.55',
+                'latency_seconds_count{view="a\\"b"} 3',
+                "# HELP hits_total Hits",
+                "# TYPE hits_total counter",
+                'hits_total{view="x"} 2',
+            ],
+        )
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_owner(("view_products", Product))
+        company = create_company(self.user)
+        Product.objects.create(
+            company=company,
+            name="Producto",
+            description="Descripción",
+            price=Decimal("10.00"),
+            stock=1,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def sample(self, text, name, **labels):
+        label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+        match = re.search(
+            rf"^{name}{{{re.escape(label_text)}}} (\S+)$", text, re.MULTILINE
+        )
+        return float(match.group(1)) if match else 0.0
+
+    def scrape(self):
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secreto")
+        return response.content.decode()
+
+    @override_settings(METRICS_TOKEN="secreto")
+    def test_actions_are_measured_per_viewset_action(self):
+        labels = {"view": "ProductViewSet.list", "method": "GET"}
+        before = self.scrape()
+
+        response = self.client.get("/api/products/")
+        self.assertEqual(response.status_code, 200)
+        text = self.scrape()
+
+        def delta(name, **extra):
+            return self.sample(text, name, **labels, **extra) - self.sample(
+                before, name, **labels, **extra
+            )
+
+        self.assertEqual(delta("aiventory_http_requests_total", status="200"), 1)
+        self.assertEqual(delta("aiventory_db_queries_per_request_count"), 1)
+        self.assertGreater(delta("aiventory_db_queries_per_request_sum"), 0)
+        self.assertGreater(delta("aiventory_db_duration_seconds_sum"), 0)
+        self.assertGreater(delta("aiventory_serializer_duration_seconds_sum"), 0)
+        self.assertEqual(
+            delta("aiventory_http_response_size_bytes_sum"), len(response.content)
+        )
+
+    @override_settings(METRICS_TOKEN="secreto")
+    def test_token_protects_the_endpoint(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secreto")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_endpoint_is_hidden_without_token_outside_debug(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+
+@override_settings(QUERY_BUDGETS_ENFORCED=True)
+class QueryBudgetTests(TestCase):
+    # Acciones de lectura que no deben crecer con el catálogo ni con el número
+    # de compañías; el middleware hace cumplir además el @query_budget declarado
+    ACTIONS = [
+        "/api/products/",
+        "/api/products/{product}/",
+        "/api/products/{product}/stock-history/",
+        "/api/products/statistics/",
+        "/api/products/profitability/",
+        "/api/products/inventory-rotation/",
+        "/api/products/purchase-forecast/",
+        "/api/products/monthly-flow/",
+        "/api/sales/",
+        "/api/sales/{sale}/",
+        "/api/sales/statistics/",
+        "/api/sales/top-products/",
+        "/api/sales/monthly-chart/",
+    ]
+
+    def setUp(self):
+        self.user = create_owner(("view_products", Product), ("view_sales", Sale))
+        self.companies = [create_company(self.user, name) for name in ("Norte", "Sur")]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def seed(self, company, count):
+        for index in range(count):
+            product = Product.objects.create(
+                company=company,
+                name=f"Producto {index}",
+                description="Descripción",
+                price=Decimal("10.00"),
+                stock=100,
+            )
+            Purchase.objects.create(
+                company=company,
+                product=product,
+                supplier="Proveedor",
+                quantity=10,
+                unit_cost=Decimal("6.00"),
+                total_cost=Decimal("0"),
+            )
+            Sale.objects.create(
+                company=company,
+                product=product,
+                customer="Cliente",
+                quantity=index + 1,
+                unit_price=Decimal("10.00"),
+                total_price=Decimal("0"),
+                date=timezone.now(),
+                sold_by=self.user,
+            )
+
+    def action_urls(self):
+        ids = {"product": Product.objects.first().pk, "sale": Sale.objects.first().pk}
+        urls = [url.format(**ids) for url in self.ACTIONS]
+        # SQLite no admite LIMIT dentro de un UNION
+        if connection.features.supports_slicing_ordering_in_compound:
+            urls += ["/api/products/recent-movements/", "/api/products/movements/"]
+        return urls
+
+    def count_queries(self, urls):
+        counts = {}
+        for url in urls:
+            # Sin caché: se mide el peor caso de cada acción
+            cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            counts[url] = len(context.captured_queries)
+        return counts
+
+    def test_query_counts_do_not_grow_with_the_data(self):
+        self.seed(self.companies[0], 2)
+        urls = self.action_urls()
+        small = self.count_queries(urls)
+
+        self.seed(self.companies[0], 15)
+        self.seed(self.companies[1], 10)
+        self.seed(create_company(self.user, "Centro"), 5)
+
+        self.assertEqual(self.count_queries(urls), small)
+
+    def test_exceeding_the_budget_raises(self):
+        self.seed(self.companies[0], 1)
+        cache.clear()
+        with mock.patch.object(ProductViewSet.list, "query_budget", 1):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get("/api/products/")
+
+        with override_settings(QUERY_BUDGETS_ENFORCED=False):
+            cache.clear()
+            with mock.patch.object(ProductViewSet.list, "query_budget", 1):
+                self.assertEqual(self.client.get("/api/products/").status_code, 200)
@@ -0,0 +1,6 @@
+from django.urls import path
+from apps.metrics import views
+
+urlpatterns = [
+    path("", views.metrics, name="metrics"),
+]
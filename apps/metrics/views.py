@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from apps.metrics.registry import REGISTRY
+
+
+@require_GET
+def metrics(request):
+    token = settings.METRICS_TOKEN
+    if not token:
+        # Sin token solo se publica en desarrollo: en producción las métricas
+        # revelan rutas, volumen de tráfico y tiempos de la base de datos
+        if not settings.DEBUG:
+            return HttpResponse(status=404)
+    elif request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponse(status=401)
+    return HttpResponse(
+        REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -4,6 +4,7 @@ from apps.company.models import Company
 
 class Product(models.Model):
     company = models.ForeignKey(Company, on_delete=models.CASCADE, null=True)
+    sku = models.CharField(max_length=64, null=True, blank=True)
     name = models.CharField(max_length=100)
     description = models.TextField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
@@ -11,5 +12,13 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            # Clave natural para las sincronizaciones de catálogo
+            models.UniqueConstraint(
+                fields=["company", "sku"], name="unique_product_sku_per_company"
+            ),
+        ]
+
     def __str__(self):
         return self.name
@@ -1,3 +1,4 @@
+from django.db.models import Count, DecimalField, F, Q, Sum
 from apps.product.models import Product
 
 
@@ -27,3 +28,24 @@ class ProductRepository:
     @staticmethod
     def get_all_by_company(company):
         return Product.objects.filter(company=company)
+
+    @staticmethod
+    def get_all_by_companies(company_ids):
+        return Product.objects.filter(company__in=company_ids).order_by(
+            "company_id", "pk"
+        )
+
+    @staticmethod
+    def get_stock_summary(company_ids, low_stock_threshold):
+        return Product.objects.filter(company__in=company_ids).aggregate(
+            total_products=Count("id"),
+            total_stock=Sum("stock"),
+            inventory_value=Sum(
+                F("price") * F("stock"),
+                output_field=DecimalField(max_digits=20, decimal_places=2),
+            ),
+            low_stock=Sum(
+                "stock", filter=Q(stock__gt=0, stock__lt=low_stock_threshold)
+            ),
+            out_of_stock=Count("id", filter=Q(stock=0)),
+        )
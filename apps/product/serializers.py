@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from apps.metrics.serializers import TimedSerializerMixin
 from apps.product.models import Product
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = "__all__"
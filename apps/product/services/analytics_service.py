@@ -0,0 +1,335 @@
+from datetime import timedelta
+from decimal import Decimal
+import numpy as np
+from django.db.models import Case, Count, DecimalField, F, Max, OuterRef, Q, Subquery
+from django.db.models import IntegerField, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from apps.product.models import Product
+from apps.purchase.models import Purchase
+from apps.sale.models import Sale
+
+
+MONEY_FIELD = DecimalField(max_digits=20, decimal_places=4)
+ZERO = Value(Decimal("0"), output_field=MONEY_FIELD)
+
+
+def _aggregate_subquery(queryset, aggregate, output_field):
+    # Subconsulta correlacionada que agrega por producto sin multiplicar filas
+    subquery = (
+        queryset.filter(product=OuterRef("pk"))
+        .order_by()
+        .values("product")
+        .annotate(value=aggregate)
+        .values("value")
+    )
+    default = ZERO if isinstance(output_field, DecimalField) else Value(0)
+    return Coalesce(
+        Subquery(subquery, output_field=output_field),
+        default,
+        output_field=output_field,
+    )
+
+
+class ProductAnalyticsService:
+    ROTATION_THRESHOLDS = {
+        "critical": 120,
+        "low": 60,
+        "normal": 30,
+    }
+    NEVER_SOLD_DAYS = 999
+    MAX_STOCKOUT_DAYS = 3650
+    REORDER_SAFETY_DAYS = 5
+
+    def get_profitability_queryset(self, companies):
+        sales = Sale.objects.filter(company__in=companies)
+        purchases = Purchase.objects.filter(company__in=companies)
+
+        return (
+            Product.objects.filter(company__in=companies)
+            .annotate(
+                sales_value=_aggregate_subquery(sales, Sum("total_price"), MONEY_FIELD),
+                sales_volume=_aggregate_subquery(
+                    sales, Sum("quantity"), IntegerField()
+                ),
+                transactions=_aggregate_subquery(sales, Count("id"), IntegerField()),
+                purchases_value=_aggregate_subquery(
+                    purchases, Sum("total_cost"), MONEY_FIELD
+                ),
+                purchases_volume=_aggregate_subquery(
+                    purchases, Sum("quantity"), IntegerField()
+                ),
+            )
+            .annotate(
+                avg_sale_price=Case(
+                    When(
+                        sales_volume__gt=0,
+                        then=F("sales_value") / F("sales_volume"),
+                    ),
+                    default=F("price"),
+                    output_field=MONEY_FIELD,
+                ),
+                avg_purchase_price=Case(
+                    When(
+                        purchases_volume__gt=0,
+                        then=F("purchases_value") / F("purchases_volume"),
+                    ),
+                    default=ZERO,
+                    output_field=MONEY_FIELD,
+                ),
+            )
+            .annotate(
+                margin_value=F("avg_sale_price") - F("avg_purchase_price"),
+            )
+            .annotate(
+                margin_percent=Case(
+                    When(
+                        avg_sale_price__gt=0,
+                        then=F("margin_value") * 100 / F("avg_sale_price"),
+                    ),
+                    default=ZERO,
+                    output_field=MONEY_FIELD,
+                ),
+            )
+        )
+
+    def get_profitability(self, companies, sort_by="margin_percent", limit=None):
+        products = self.get_profitability_queryset(companies).order_by(
+            f"-{sort_by}", "id"
+        )
+        if limit:
+            products = products[:limit]
+
+        return [
+            {
+                "id": product.id,
+                "name": product.name,
+                "current_price": float(product.price),
+                "current_stock": product.stock,
+                "avg_purchase_price": float(product.avg_purchase_price),
+                "avg_sale_price": float(product.avg_sale_price),
+                "margin_value": float(product.margin_value),
+                "margin_percent": float(product.margin_percent),
+                "sales_volume": product.sales_volume,
+                "sales_value": float(product.sales_value),
+                "transactions": product.transactions,
+            }
+            for product in products
+        ]
+
+    def get_sales_summary_by_product(self, companies, since):
+        rows = (
+            Sale.objects.filter(company__in=companies)
+            .order_by()
+            .values("product")
+            .annotate(
+                last_date=Max("date"),
+                period_quantity=Sum("quantity", filter=Q(date__gte=since)),
+            )
+        )
+        return {row["product"]: row for row in rows}
+
+    def get_inventory_rotation(self, companies, include_zero_stock=False, limit=None):
+        today = timezone.now()
+        products = Product.objects.filter(company__in=companies).order_by("id")
+        if not include_zero_stock:
+            products = products.filter(stock__gt=0)
+        products = list(products.values("id", "name", "price", "stock"))
+
+        sales = self.get_sales_summary_by_product(
+            companies, today - timedelta(days=365)
+        )
+        empty = {"last_date": None, "period_quantity": None}
+        summaries = [sales.get(product["id"], empty) for product in products]
+
+        stock = np.array([p["stock"] for p in products], dtype=np.int64)
+        price = np.array([float(p["price"]) for p in products], dtype=np.float64)
+        yearly_quantity = np.array(
+            [s["period_quantity"] or 0 for s in summaries], dtype=np.int64
+        )
+        seconds_since_sale = np.array(
+            [
+                (today - s["last_date"]).total_seconds() if s["last_date"] else np.nan
+                for s in summaries
+            ],
+            dtype=np.float64,
+        )
+
+        never_sold = np.isnan(seconds_since_sale)
+        days_since_last_sale = np.where(
+            never_sold,
+            self.NEVER_SOLD_DAYS,
+            np.maximum(0, np.floor(np.nan_to_num(seconds_since_sale) / 86400)),
+        ).astype(np.int64)
+
+        thresholds = self.ROTATION_THRESHOLDS
+        categories = np.select(
+            [
+                days_since_last_sale >= thresholds["critical"],
+                days_since_last_sale >= thresholds["low"],
+                days_since_last_sale >= thresholds["normal"],
+            ],
+            ["Crítica", "Baja", "Normal"],
+            default="Alta",
+        )
+        inventory_value = price * stock
+        rotation_index = np.divide(
+            yearly_quantity,
+            stock,
+            out=np.zeros(len(products), dtype=np.float64),
+            where=stock > 0,
+        )
+
+        order = np.argsort(-days_since_last_sale, kind="stable")
+        if limit:
+            order = order[:limit]
+
+        critical = categories[order] == "Crítica"
+
+        rotation_data = []
+        for i in order:
+            last_sale_date = summaries[i]["last_date"]
+            rotation_data.append(
+                {
+                    "id": products[i]["id"],
+                    "name": products[i]["name"],
+                    "current_stock": int(stock[i]),
+                    "days_since_last_sale": int(days_since_last_sale[i]),
+                    "last_sale_date": (
+                        last_sale_date.strftime("%Y-%m-%d")
+                        if last_sale_date
+                        else "Nunca vendido"
+                    ),
+                    "rotation_category": str(categories[i]),
+                    "inventory_value": float(inventory_value[i]),
+                    "rotation_index": float(rotation_index[i]),
+                    "total_sales_last_year": int(yearly_quantity[i]),
+                }
+            )
+
+        return {
+            "summary": {
+                "total_products": len(rotation_data),
+                "critical_rotation_products": int(critical.sum()),
+                "critical_inventory_value": float(
+                    inventory_value[order][critical].sum()
+                ),
+                "rotation_thresholds": thresholds,
+            },
+            "products": rotation_data,
+        }
+
+    def get_period_quantity_by_product(self, companies, since):
+        rows = (
+            Sale.objects.filter(company__in=companies, date__gte=since)
+            .order_by()
+            .values("product")
+            .annotate(total_quantity=Sum("quantity"))
+        )
+        return {row["product"]: row["total_quantity"] or 0 for row in rows}
+
+    def get_purchase_forecast(
+        self,
+        companies,
+        analysis_period_days=30,
+        lead_time_days=7,
+        min_stock_threshold=10,
+        show_all=False,
+        limit=None,
+    ):
+        now = timezone.now()
+        start_date = now - timedelta(days=analysis_period_days)
+        products = list(
+            Product.objects.filter(company__in=companies)
+            .order_by("id")
+            .values("id", "name", "price", "stock")
+        )
+        sold = self.get_period_quantity_by_product(companies, start_date)
+
+        stock = np.array([p["stock"] for p in products], dtype=np.int64)
+        price = np.array([float(p["price"]) for p in products], dtype=np.float64)
+        total_sold = np.array([sold.get(p["id"], 0) for p in products], dtype=np.int64)
+
+        daily_sales_rate = total_sold / analysis_period_days
+        has_sales = daily_sales_rate > 0
+        days_until_stockout = np.minimum(
+            self.MAX_STOCKOUT_DAYS,
+            np.ceil(
+                np.divide(
+                    stock,
+                    daily_sales_rate,
+                    out=np.zeros(len(products), dtype=np.float64),
+                    where=has_sales,
+                )
+            ),
+        ).astype(np.int64)
+
+        reorder_window = lead_time_days + self.REORDER_SAFETY_DAYS
+        reorder_needed = has_sales & (days_until_stockout <= reorder_window)
+        suggested_quantity = np.ceil(
+            daily_sales_rate * (lead_time_days + analysis_period_days)
+        ).astype(np.int64)
+        estimated_reorder_cost = price * suggested_quantity
+
+        high = has_sales & (days_until_stockout <= lead_time_days)
+        medium = has_sales & ~high & (days_until_stockout <= lead_time_days * 2)
+        priority = np.select([high, medium], ["Alta", "Media"], default="Baja")
+        days_to_reorder = np.select(
+            [~has_sales, high, medium],
+            [-1, 0, np.maximum(0, days_until_stockout - lead_time_days)],
+            default=np.maximum(0, days_until_stockout - reorder_window),
+        )
+
+        selected = np.ones(len(products), dtype=bool)
+        if not show_all:
+            selected = (stock <= min_stock_threshold) | reorder_needed
+        candidates = np.flatnonzero(selected)
+        sort_key = np.where(has_sales, days_to_reorder, 9999)[candidates]
+        order = candidates[np.argsort(sort_key, kind="stable")]
+        if limit:
+            order = order[:limit]
+
+        forecast_data = []
+        for i in order:
+            if has_sales[i]:
+                stockout_date = now + timedelta(days=int(days_until_stockout[i]))
+                days_until = int(days_until_stockout[i])
+                stockout = stockout_date.strftime("%Y-%m-%d")
+                days_reorder = int(days_to_reorder[i])
+            else:
+                days_until = "N/A"
+                stockout = "N/A"
+                days_reorder = None
+
+            forecast_data.append(
+                {
+                    "id": products[i]["id"],
+                    "name": products[i]["name"],
+                    "current_stock": int(stock[i]),
+                    "daily_sales_rate": round(float(daily_sales_rate[i]), 2),
+                    "total_sold_in_period": int(total_sold[i]),
+                    "days_until_stockout": days_until,
+                    "stockout_date": stockout,
+                    "reorder_needed": bool(reorder_needed[i]),
+                    "days_to_reorder": days_reorder,
+                    "suggested_quantity": int(suggested_quantity[i]),
+                    "priority": str(priority[i]),
+                    "unit_price": float(price[i]),
+                    "estimated_reorder_cost": float(estimated_reorder_cost[i]),
+                }
+            )
+
+        reorder_selected = reorder_needed[order]
+        return {
+            "summary": {
+                "analysis_period_days": analysis_period_days,
+                "lead_time_days": lead_time_days,
+                "total_products": len(forecast_data),
+                "products_to_reorder_soon": int(reorder_selected.sum()),
+                "high_priority_count": int((priority[order] == "Alta").sum()),
+                "total_estimated_reorder_cost": float(
+                    estimated_reorder_cost[order][reorder_selected].sum()
+                ),
+            },
+            "products": forecast_data,
+        }
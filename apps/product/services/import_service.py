@@ -0,0 +1,373 @@
+import numpy as np
+import pandas as pd
+from django.db import connection, transaction
+from openpyxl import load_workbook
+from pandas.api.types import is_numeric_dtype
+from pandas.io.parsers import TextParser
+from apps.analytics.services.cache_service import AnalyticsCacheService
+from apps.inventory.services.inventory_service import InventoryService
+from apps.product.models import Product
+
+
+class ImportFileError(Exception):
+    pass
+
+
+class ProductImportService:
+    CHUNK_SIZE = 5000
+    BATCH_SIZE = 1000
+    MODES = ["create", "upsert"]
+    REQUIRED_COLUMNS = ["name", "description", "price", "stock"]
+    UPSERT_FIELDS = ["description", "price", "stock", "updated_at"]
+    INTEGER_PATTERN = r"\s*[+-]?\d+\s*"
+    # Por encima de estos límites la fila se valida una a una
+    MAX_FAST_PRICE = 10**7
+    MAX_FAST_STOCK = 2**31 - 1
+
+    def __init__(self):
+        self.inventory_service = InventoryService()
+        self.cache_service = AnalyticsCacheService()
+        self.price_field = Product._meta.get_field("price")
+        self.sku_length = Product._meta.get_field("sku").max_length
+        self.name_length = Product._meta.get_field("name").max_length
+        self.total_rows = 0
+
+    def import_file(
+        self, uploaded_file, extension, company, mode="create", on_progress=None
+    ):
+        required_columns = self.REQUIRED_COLUMNS
+        if mode == "upsert":
+            required_columns = required_columns + ["sku"]
+
+        if extension == "csv":
+            chunks = self._read_csv(uploaded_file, required_columns)
+        elif extension == "xlsx":
+            chunks = self._read_xlsx(uploaded_file, required_columns)
+        else:
+            chunks = self._read_xls(uploaded_file, required_columns)
+
+        stats = {
+            "total": 0,
+            "created": 0,
+            "updated": 0,
+            "duplicates": 0,
+            "errors": 0,
+            "error_details": [],
+        }
+        with transaction.atomic():
+            for chunk in chunks:
+                stats["total"] += len(chunk)
+                entries, errors = self._build_products(chunk, company)
+                for start in range(0, len(entries), self.BATCH_SIZE):
+                    batch = entries[start : start + self.BATCH_SIZE]
+                    if mode == "upsert":
+                        created, updated, duplicates, batch_errors = self._upsert(
+                            batch, company
+                        )
+                    else:
+                        created, updated, duplicates, batch_errors = self._create(
+                            batch, company
+                        )
+                    stats["created"] += created
+                    stats["updated"] += updated
+                    stats["duplicates"] += duplicates
+                    errors.extend(batch_errors)
+                errors.sort(key=lambda error: error["row"])
+                stats["errors"] += len(errors)
+                stats["error_details"].extend(errors)
+                if on_progress:
+                    on_progress(stats["total"], self.total_rows)
+            # bulk_create no emite señales: se invalida a mano
+            self.cache_service.bump(company.pk)
+        return stats
+
+    def _check_columns(self, columns, rows, required_columns):
+        if not rows:
+            raise ImportFileError("El archivo no contiene datos")
+        missing_columns = [col for col in required_columns if col not in columns]
+        if missing_columns:
+            raise ImportFileError(
+                f"Faltan columnas requeridas: {', '.join(missing_columns)}"
+            )
+        self.total_rows = rows
+
+    def _merge_dtype(self, current, dtype, numeric_bools):
+        if current == dtype:
+            return current
+        if object in (current, dtype):
+            return np.dtype(object)
+        # En CSV "True" y "1" sólo comparten columna como texto
+        if not numeric_bools and np.dtype(bool) in (current, dtype):
+            return np.dtype(object)
+        return np.result_type(current, dtype)
+
+    def _scan(self, chunks, numeric_bools=False):
+        # Primera pasada: cuenta filas y calcula el tipo que pandas daría a cada
+        # columna si cargara el archivo completo, sin tenerlo en memoria
+        dtypes = {}
+        rows = 0
+        for chunk in chunks:
+            rows += len(chunk)
+            for column, dtype in chunk.dtypes.items():
+                dtypes[column] = self._merge_dtype(
+                    dtypes.get(column, dtype), dtype, numeric_bools
+                )
+        return dtypes, rows
+
+    def _csv_chunks(self, uploaded_file, encoding, dtype=None):
+        uploaded_file.seek(0)
+        return pd.read_csv(
+            uploaded_file, encoding=encoding, dtype=dtype, chunksize=self.CHUNK_SIZE
+        )
+
+    def _read_csv(self, uploaded_file, required_columns):
+        # pandas trata el UploadedFile de Django como texto e ignora la
+        # codificación; el archivo subyacente sí se abre en modo binario
+        uploaded_file = getattr(uploaded_file, "file", uploaded_file)
+        encoding = "utf-8"
+        try:
+            dtypes, rows = self._scan(self._csv_chunks(uploaded_file, encoding))
+        except UnicodeDecodeError:
+            encoding = "latin-1"
+            dtypes, rows = self._scan(self._csv_chunks(uploaded_file, encoding))
+        self._check_columns(dtypes, rows, required_columns)
+
+        # Las columnas de texto se releen como str para conservar el valor original
+        dtypes = {
+            column: str if dtype.kind == "O" or column == "sku" else dtype
+            for column, dtype in dtypes.items()
+        }
+        yield from self._csv_chunks(uploaded_file, encoding, dtypes)
+
+    def _xlsx_cell(self, value):
+        # Misma conversión que aplica pandas al leer con openpyxl
+        if value is None:
+            return ""
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+
+    def _xlsx_chunks(self, uploaded_file, dtype=None):
+        uploaded_file.seek(0)
+        workbook = load_workbook(
+            uploaded_file, read_only=True, data_only=True, keep_links=False
+        )
+        try:
+            sheet = workbook.worksheets[0]
+            sheet.reset_dimensions()
+            rows = sheet.iter_rows(values_only=True)
+            header = self._xlsx_row(next(rows, ()))
+            start = 0
+            blank = 0
+            buffer = []
+            for row in rows:
+                values = self._xlsx_row(row)
+                if not values:
+                    # pandas descarta sólo las filas vacías del final
+                    blank += 1
+                    continue
+                buffer.extend([[]] * blank + [values])
+                blank = 0
+                if len(buffer) >= self.CHUNK_SIZE:
+                    yield self._frame(header, buffer, start, dtype)
+                    start += len(buffer)
+                    buffer = []
+            if buffer or start == 0:
+                yield self._frame(header, buffer, start, dtype)
+        finally:
+            workbook.close()
+
+    def _xlsx_row(self, row):
+        values = [self._xlsx_cell(value) for value in row]
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    def _frame(self, header, rows, start, dtype):
+        if not header:
+            return pd.DataFrame()
+        width = len(header)
+        data = [header] + [row[:width] + [""] * (width - len(row)) for row in rows]
+        chunk = TextParser(data, header=0, dtype=dtype, skip_blank_lines=False).read()
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        return chunk
+
+    def _read_xlsx(self, uploaded_file, required_columns):
+        dtypes, rows = self._scan(self._xlsx_chunks(uploaded_file), numeric_bools=True)
+        self._check_columns(dtypes, rows, required_columns)
+        if "sku" in dtypes:
+            dtypes["sku"] = object
+        yield from self._xlsx_chunks(uploaded_file, dtypes)
+
+    def _read_xls(self, uploaded_file, required_columns):
+        # El formato binario antiguo no admite lectura por partes
+        df = pd.read_excel(uploaded_file, dtype={"sku": object})
+        self._check_columns(df.columns, len(df), required_columns)
+        for start in range(0, len(df), self.CHUNK_SIZE):
+            yield df.iloc[start : start + self.CHUNK_SIZE]
+
+    def _parse_price(self, values):
+        if is_numeric_dtype(values):
+            parsed = values.astype("float64")
+        else:
+            parsed = pd.to_numeric(values, errors="coerce")
+        return parsed, np.isfinite(parsed)
+
+    def _parse_stock(self, values):
+        if is_numeric_dtype(values):
+            parsed = values.astype("float64")
+            valid = np.isfinite(parsed)
+            return np.trunc(parsed), valid
+        # int() sobre texto sólo acepta enteros literales
+        text = values.where(values.map(type).eq(str))
+        valid = text.str.fullmatch(self.INTEGER_PATTERN, na=False)
+        parsed = pd.to_numeric(values.where(valid), errors="coerce")
+        return parsed, valid & parsed.notna()
+
+    def _parse_sku(self, chunk):
+        if "sku" not in chunk:
+            return np.full(len(chunk), None, dtype=object)
+        values = chunk["sku"]
+        skus = values.where(values.isna(), values.astype(str).str.strip())
+        return skus.where(skus.notna() & skus.ne(""), None).to_numpy(dtype=object)
+
+    def _build_products(self, chunk, company):
+        price, price_valid = self._parse_price(chunk["price"])
+        stock, stock_valid = self._parse_stock(chunk["stock"])
+        fast = (
+            price_valid
+            & stock_valid
+            & price.between(0, self.MAX_FAST_PRICE)
+            & stock.between(0, self.MAX_FAST_STOCK)
+        ).to_numpy()
+        skus = self._parse_sku(chunk)
+        fast &= np.array([sku is None or len(sku) <= self.sku_length for sku in skus])
+
+        # iterrows convierte cada fila al tipo común del DataFrame
+        row_dtype = chunk[:0].values.dtype
+        names = chunk["name"].astype(row_dtype).astype(str)
+        fast &= (names.str.len() <= self.name_length).to_numpy()
+        names = names.to_numpy()
+        descriptions = chunk["description"].astype(row_dtype).astype(str).to_numpy()
+        prices = price.to_numpy()
+        stocks = stock.to_numpy()
+        rows = chunk.index.to_numpy() + 1
+
+        entries = []
+        errors = []
+        for position, is_valid in enumerate(fast):
+            row_number = int(rows[position])
+            if is_valid:
+                entries.append(
+                    (
+                        row_number,
+                        Product(
+                            sku=skus[position],
+                            name=names[position],
+                            description=descriptions[position],
+                            price=float(prices[position]),
+                            stock=int(stocks[position]),
+                            company=company,
+                        ),
+                    )
+                )
+                continue
+            # Las filas dudosas siguen la validación fila a fila de siempre para
+            # que los mensajes de error no cambien
+            try:
+                product = self._build_row(chunk.iloc[position], row_number, company)
+                product.sku = skus[position]
+                if product.sku and len(product.sku) > self.sku_length:
+                    raise ValueError(f"SKU demasiado largo en fila {row_number}")
+                if len(product.name) > self.name_length:
+                    raise ValueError(f"Nombre demasiado largo en fila {row_number}")
+                entries.append((row_number, product))
+            except Exception as e:
+                errors.append({"row": row_number, "error": str(e)})
+        return entries, errors
+
+    def _build_row(self, row, row_number, company):
+        product_data = {
+            "name": str(row["name"]),
+            "description": str(row["description"]),
+            "price": float(row["price"]),
+            "stock": int(row["stock"]),
+            "company": company,
+        }
+
+        if product_data["price"] < 0:
+            raise ValueError(f"Precio negativo en fila {row_number}")
+
+        if product_data["stock"] < 0:
+            raise ValueError(f"Stock negativo en fila {row_number}")
+
+        self.price_field.get_db_prep_save(product_data["price"], connection)
+        return Product(**product_data)
+
+    def _create(self, batch, company):
+        skus = [product.sku for _, product in batch if product.sku]
+        taken = set(
+            Product.objects.filter(company=company, sku__in=skus).values_list(
+                "sku", flat=True
+            )
+            if skus
+            else []
+        )
+        products = []
+        errors = []
+        for row_number, product in batch:
+            if product.sku in taken:
+                errors.append(
+                    {"row": row_number, "error": f"SKU duplicado en fila {row_number}"}
+                )
+                continue
+            if product.sku:
+                taken.add(product.sku)
+            products.append(product)
+
+        Product.objects.bulk_create(products)
+        self.inventory_service.record_adjustments(products, batch_size=self.BATCH_SIZE)
+        return len(products), 0, 0, errors
+
+    def _upsert(self, batch, company):
+        latest = {}
+        errors = []
+        duplicates = 0
+        for row_number, product in batch:
+            if not product.sku:
+                errors.append(
+                    {"row": row_number, "error": f"SKU vacío en fila {row_number}"}
+                )
+                continue
+            # Si un SKU se repite en el archivo prevalece la última fila
+            if product.sku in latest:
+                duplicates += 1
+            latest[product.sku] = product
+
+        # Bloquea las filas existentes para calcular el ajuste de stock exacto
+        previous = dict(
+            Product.objects.select_for_update()
+            .filter(company=company, sku__in=latest)
+            .values_list("sku", "stock")
+        )
+        products = list(latest.values())
+        Product.objects.bulk_create(
+            products,
+            update_conflicts=True,
+            unique_fields=["company", "sku"],
+            update_fields=self.UPSERT_FIELDS,
+        )
+        ids = dict(
+            Product.objects.filter(company=company, sku__in=latest).values_list(
+                "sku", "id"
+            )
+        )
+        for product in products:
+            product.pk = ids[product.sku]
+        self.inventory_service.record_adjustments(
+            products,
+            {ids[sku]: stock for sku, stock in previous.items()},
+            self.BATCH_SIZE,
+        )
+
+        return len(products) - len(previous), len(previous), duplicates, errors
@@ -8,6 +8,13 @@ class ProductService:
     def get_all_by_company(self, company):
         return self.repository.get_all_by_company(company)
 
+    def get_all_by_companies(self, company_ids):
+        return self.repository.get_all_by_companies(company_ids)
+
+    def get_stock_summary(self, company_ids, low_stock_threshold):
+        summary = self.repository.get_stock_summary(company_ids, low_stock_threshold)
+        return {name: value or 0 for name, value in summary.items()}
+
     def get_all(self):
         return self.repository.get_all()
 
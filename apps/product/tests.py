@@ -1,3 +1,339 @@
+import base64
+import io
+import json
+from decimal import Decimal
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from openpyxl import Workbook
+from rest_framework.test import APIClient
+from apps.company.testing import create_company, create_owner, grant
+from apps.inventory.models import InventoryMovement
+from apps.product.models import Product
+from apps.product.services.import_service import ProductImportService
+from apps.purchase.models import Purchase
+from apps.sale.models import Sale
 
-# Create your tests here.
+
+class ProductAnalyticsTestCase(TestCase):
+    def setUp(self):
+        self.user = create_owner(("view_products", Product))
+        self.company = create_company(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_products(self, count):
+        for index in range(count):
+            product = Product.objects.create(
+                company=self.company,
+                name=f"Producto {index}",
+                description="Descripción",
+                price=Decimal("10.00"),
+                stock=100,
+            )
+            Purchase.objects.create(
+                company=self.company,
+                product=product,
+                supplier="Proveedor",
+                quantity=10,
+                unit_cost=Decimal("6.00"),
+                total_cost=Decimal("60.00"),
+            )
+            Sale.objects.create(
+                company=self.company,
+                product=product,
+                customer="Cliente",
+                quantity=index + 1,
+                unit_price=Decimal("10.00"),
+                total_price=Decimal("0"),
+                date=timezone.now(),
+                sold_by=self.user,
+            )
+
+    def count_queries(self, url):
+        # Cada medición parte sin los permisos del usuario en caché
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+
+class ProfitabilityTests(ProductAnalyticsTestCase):
+    url = "/api/products/profitability/"
+
+    def test_query_count_is_independent_of_catalog_size(self):
+        self.create_products(2)
+        small_catalog = self.count_queries(self.url)
+
+        self.create_products(20)
+        large_catalog = self.count_queries(self.url)
+
+        self.assertEqual(small_catalog, large_catalog)
+
+    def test_margins_are_computed_and_sorted_in_database(self):
+        self.create_products(3)
+
+        response = self.client.get(self.url, {"sort_by": "sales_volume", "limit": 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["sales_volume"] for item in response.data], [3, 2])
+        first = response.data[0]
+        self.assertEqual(first["avg_sale_price"], 10.0)
+        self.assertEqual(first["avg_purchase_price"], 6.0)
+        self.assertEqual(first["margin_value"], 4.0)
+        self.assertEqual(first["margin_percent"], 40.0)
+        self.assertEqual(first["sales_value"], 30.0)
+        self.assertEqual(first["transactions"], 1)
+
+
+class InventoryRotationTests(ProductAnalyticsTestCase):
+    url = "/api/products/inventory-rotation/"
+
+    def test_query_count_is_independent_of_catalog_size(self):
+        self.create_products(2)
+        small_catalog = self.count_queries(self.url)
+
+        self.create_products(20)
+        large_catalog = self.count_queries(self.url)
+
+        self.assertEqual(small_catalog, large_catalog)
+
+    def test_unsold_products_are_critical(self):
+        self.create_products(1)
+        Product.objects.create(
+            company=self.company,
+            name="Sin ventas",
+            description="Descripción",
+            price=Decimal("5.00"),
+            stock=4,
+        )
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        unsold = response.data["products"][0]
+        self.assertEqual(unsold["name"], "Sin ventas")
+        self.assertEqual(unsold["days_since_last_sale"], 999)
+        self.assertEqual(unsold["rotation_category"], "Crítica")
+        self.assertEqual(unsold["last_sale_date"], "Nunca vendido")
+        self.assertEqual(response.data["products"][1]["rotation_category"], "Alta")
+        self.assertEqual(response.data["products"][1]["total_sales_last_year"], 1)
+        self.assertEqual(response.data["summary"]["critical_rotation_products"], 1)
+        self.assertEqual(response.data["summary"]["critical_inventory_value"], 20.0)
+
+
+class PurchaseForecastTests(ProductAnalyticsTestCase):
+    url = "/api/products/purchase-forecast/"
+
+    def test_query_count_is_independent_of_catalog_size(self):
+        self.create_products(2)
+        small_catalog = self.count_queries(self.url)
+
+        self.create_products(20)
+        large_catalog = self.count_queries(self.url)
+
+        self.assertEqual(small_catalog, large_catalog)
+
+    def test_fast_sellers_are_prioritized(self):
+        self.create_products(2)
+        Product.objects.filter(name="Producto 1").update(stock=2)
+
+        response = self.client.get(self.url, {"period": 1, "lead_time": 1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["products"]), 1)
+        forecast = response.data["products"][0]
+        self.assertEqual(forecast["name"], "Producto 1")
+        self.assertEqual(forecast["daily_sales_rate"], 2.0)
+        self.assertEqual(forecast["days_until_stockout"], 1)
+        self.assertEqual(forecast["priority"], "Alta")
+        self.assertEqual(forecast["days_to_reorder"], 0)
+        self.assertEqual(forecast["suggested_quantity"], 4)
+        self.assertEqual(response.data["summary"]["total_estimated_reorder_cost"], 40.0)
+
+
+class MovementFeedTests(ProductAnalyticsTestCase):
+    def test_cursor_pages_through_sales_and_purchases_once(self):
+        self.create_products(4)
+        same_instant = timezone.now()
+        Sale.objects.update(date=same_instant)
+        Purchase.objects.update(date=same_instant)
+
+        seen = []
+        params = {"limit": 3}
+        while True:
+            response = self.client.get("/api/products/movements/", params)
+            self.assertEqual(response.status_code, 200)
+            seen.extend((m["type"], m["id"]) for m in response.data["results"])
+            if not response.data["next_cursor"]:
+                break
+            params["cursor"] = response.data["next_cursor"]
+
+        self.assertEqual(len(seen), 8)
+        self.assertEqual(len(set(seen)), 8)
+        self.assertEqual([t for t, _ in seen], ["Venta"] * 4 + ["Compra"] * 4)
+
+    def test_recent_movements_keeps_its_response_format(self):
+        self.create_products(1)
+
+        response = self.client.get("/api/products/recent-movements/")
+
+        self.assertEqual(response.status_code, 200)
+        sale = next(m for m in response.data if m["type"] == "Venta")
+        purchase = next(m for m in response.data if m["type"] == "Compra")
+        self.assertEqual(sale["stock_change"], -1)
+        self.assertEqual(sale["person"], "Cliente")
+        self.assertIn("sold_by", sale)
+        self.assertEqual(purchase["stock_change"], 10)
+        self.assertNotIn("sold_by", purchase)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get("/api/products/movements/", {"cursor": "nope"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_with_a_malformed_id_is_rejected(self):
+        date = timezone.now().isoformat()
+        for movement_id in ([1], {"id": 1}, "uno", None):
+            payload = json.dumps([date, "Venta", movement_id]).encode()
+            cursor = base64.urlsafe_b64encode(payload).decode()
+            response = self.client.get("/api/products/movements/", {"cursor": cursor})
+            with self.subTest(movement_id=movement_id):
+                self.assertEqual(response.status_code, 400)
+
+
+class ProductImportTests(ProductAnalyticsTestCase):
+    url = "/api/products/import-file/"
+
+    def setUp(self):
+        super().setUp()
+        grant(self.user, "create_product", Product)
+
+    def upload(self, name, content, **data):
+        return self.client.post(
+            self.url,
+            {"file": SimpleUploadedFile(name, content), **data},
+            format="multipart",
+        )
+
+    @mock.patch.object(ProductImportService, "CHUNK_SIZE", 2)
+    def test_csv_rows_are_created_in_bulk_with_row_errors(self):
+        content = (
+            "name,description,price,stock\n"
+            "Café,Molido,12.5,10\n"
+            "Té,Verde,-1,3\n"
+            "Azúcar,Blanca,2,x\n"
+            "Sal,Marina,1,-4\n"
+            "Arroz,Blanco,3.2,0\n"
+            f"{'Harina' * 20},Integral,4,1\n"
+        ).encode("latin-1")
+
+        response = self.upload("productos.csv", content)
+
+        self.assertEqual(response.status_code, 207)
+        stats = response.data["stats"]
+        self.assertEqual((stats["total"], stats["created"], stats["errors"]), (6, 2, 4))
+        self.assertEqual(
+            stats["error_details"],
+            [
+                {"row": 2, "error": "Precio negativo en fila 2"},
+                {
+                    "row": 3,
+                    "error": "invalid literal for int() with base 10: 'x'",
+                },
+                {"row": 4, "error": "Stock negativo en fila 4"},
+                {"row": 6, "error": "Nombre demasiado largo en fila 6"},
+            ],
+        )
+        coffee = Product.objects.get(company=self.company, name="Café")
+        self.assertEqual(coffee.price, Decimal("12.50"))
+        movement = InventoryMovement.objects.get(product=coffee)
+        self.assertEqual(movement.kind, InventoryMovement.ADJUSTMENT)
+        self.assertEqual(movement.quantity, 10)
+        self.assertFalse(
+            InventoryMovement.objects.filter(product__name="Arroz").exists()
+        )
+
+    def test_xlsx_is_read_in_read_only_mode(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(["name", "description", "price", "stock"])
+        sheet.append(["Café", "Molido", 12.5, 10])
+        sheet.append(["Té", "Verde", 4, 3])
+        output = io.BytesIO()
+        workbook.save(output)
+
+        response = self.upload("productos.xlsx", output.getvalue())
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["stats"]["created"], 2)
+        self.assertEqual(Product.objects.get(name="Té").stock, 3)
+
+    def test_missing_columns_are_rejected(self):
+        response = self.upload("productos.csv", b"name,price\nCaf,1\n")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["error"], "Faltan columnas requeridas: description, stock"
+        )
+
+    def test_upsert_updates_existing_skus_and_records_the_stock_change(self):
+        existing = Product.objects.create(
+            company=self.company,
+            sku="CAF-1",
+            name="Café",
+            description="Molido",
+            price=Decimal("10.00"),
+            stock=10,
+        )
+        content = (
+            "sku,name,description,price,stock\n"
+            "CAF-1,Café,Grano,12,25\n"
+            "TE-1,Té,Verde,4,3\n"
+            ",Sal,Marina,1,1\n"
+            "TE-1,Té,Negro,5,8\n"
+        ).encode()
+
+        response = self.upload("productos.csv", content, mode="upsert")
+
+        self.assertEqual(response.status_code, 207)
+        stats = response.data["stats"]
+        self.assertEqual(
+            (stats["created"], stats["updated"], stats["errors"]), (1, 1, 1)
+        )
+        self.assertEqual(stats["duplicates"], 1)
+        self.assertEqual(
+            stats["error_details"], [{"row": 3, "error": "SKU vacío en fila 3"}]
+        )
+        existing.refresh_from_db()
+        self.assertEqual((existing.description, existing.stock), ("Grano", 25))
+        self.assertEqual(existing.price, Decimal("12.00"))
+        tea = Product.objects.get(company=self.company, sku="TE-1")
+        self.assertEqual((tea.description, tea.stock), ("Negro", 8))
+        adjustments = InventoryMovement.objects.filter(
+            product=existing, kind=InventoryMovement.ADJUSTMENT
+        ).order_by("id")
+        self.assertEqual([m.quantity for m in adjustments], [10, 15])
+
+        response = self.upload("productos.csv", content, mode="upsert")
+
+        self.assertEqual(response.data["stats"]["created"], 0)
+        self.assertEqual(Product.objects.filter(company=self.company).count(), 2)
+
+    def test_create_mode_rejects_known_skus(self):
+        content = (
+            b"sku,name,description,price,stock\nA1,Uno,Desc,1,1\nA1,Dos,Desc,1,1\n"
+        )
+
+        response = self.upload("productos.csv", content)
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(
+            response.data["stats"]["error_details"],
+            [{"row": 2, "error": "SKU duplicado en fila 2"}],
+        )
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.15 on 2026-10-17 17:34
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+PURCHASE_DATE_BRIN = django.contrib.postgres.indexes.BrinIndex(
+    fields=["date"], name="purchase_date_brin"
+)
+
+
+# BRIN solo existe en PostgreSQL; en otros motores el índice queda solo en el estado
+def add_date_brin(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.add_index(
+            apps.get_model("purchase", "Purchase"), PURCHASE_DATE_BRIN
+        )
+
+
+def remove_date_brin(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.remove_index(
+            apps.get_model("purchase", "Purchase"), PURCHASE_DATE_BRIN
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("purchase", "0002_purchase_delete_sale"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="purchase",
+            index=models.Index(
+                fields=["company", "-date", "-id"], name="purchase_company_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="purchase",
+            index=models.Index(
+                fields=["company", "product", "-date"],
+                name="purchase_company_product_idx",
+            ),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name="purchase", index=PURCHASE_DATE_BRIN),
+            ],
+            database_operations=[
+                migrations.RunPython(add_date_brin, remove_date_brin),
+            ],
+        ),
+    ]
@@ -1,5 +1,8 @@
-from django.db import models
+from django.contrib.postgres.indexes import BrinIndex
+from django.db import models, transaction
+from apps.analytics.services.rollup_service import RollupService
 from apps.company.models import Company
+from apps.inventory.services.inventory_service import InventoryService
 from apps.product.models import Product
 
 
@@ -12,8 +15,45 @@ class Purchase(models.Model):
     total_cost = models.DecimalField(max_digits=12, decimal_places=2)
     date = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["company", "-date", "-id"], name="purchase_company_date_idx"
+            ),
+            models.Index(
+                fields=["company", "product", "-date"],
+                name="purchase_company_product_idx",
+            ),
+            BrinIndex(fields=["date"], name="purchase_date_brin"),
+        ]
+
     def save(self, *args, **kwargs):
         self.total_cost = self.quantity * self.unit_cost
-        super().save(*args, **kwargs)
-        self.product.stock = models.F("stock") + self.quantity
-        self.product.save(update_fields=["stock"])
+        rollups = RollupService()
+        inventory = InventoryService()
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = (
+                    Purchase.objects.select_for_update().filter(pk=self.pk).first()
+                )
+            super().save(*args, **kwargs)
+
+            if previous:
+                inventory.reverse_purchase(previous)
+                rollups.record_purchase(
+                    previous.company_id,
+                    previous.product_id,
+                    previous.date,
+                    previous.quantity,
+                    previous.total_cost,
+                    sign=-1,
+                )
+            inventory.record_purchase(self)
+            rollups.record_purchase(
+                self.company_id,
+                self.product_id,
+                self.date,
+                self.quantity,
+                self.total_cost,
+            )
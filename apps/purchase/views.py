@@ -1,6 +1,11 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from apps.purchase.services.purchase_service import PurchaseService
+from apps.company.mixins import CompanyMembershipMixin
+from apps.analytics.decorators import (
+    cache_analytics_response,
+    etag_from_data_version,
+)
 from apps.company.services.company_service import CompanyService
 from apps.users.decorators import custom_permission_required
 from rest_framework.response import Response
@@ -12,7 +17,7 @@ from apps.product.models import Product
 from apps.purchase.models import Purchase
 
 
-class PurchasesViewSet(viewsets.ViewSet):
+class PurchasesViewSet(CompanyMembershipMixin, viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
 
     def __init__(self, **kwargs):
@@ -23,13 +28,13 @@ class PurchasesViewSet(viewsets.ViewSet):
     @custom_permission_required("view_purchases")
     def list(self, request):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
-            purchases = self.service.get_all_by_company(companies)
+            purchases = self.service.get_all_by_company(company_ids)
             return Response(
                 PurchaseSerializer(purchases, many=True).data,
                 status=status.HTTP_200_OK,
@@ -43,8 +48,8 @@ class PurchasesViewSet(viewsets.ViewSet):
     @custom_permission_required("view_purchases")
     def retrieve(self, request, pk=None):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_404_NOT_FOUND,
@@ -55,7 +60,7 @@ class PurchasesViewSet(viewsets.ViewSet):
                     {"error": "Compra no encontrada"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
-            if purchase.company not in companies:
+            if purchase.company_id not in company_ids:
                 return Response(
                     {"error": "No tienes permiso para ver esta compra"},
                     status=status.HTTP_403_FORBIDDEN,
@@ -71,13 +76,13 @@ class PurchasesViewSet(viewsets.ViewSet):
     @custom_permission_required("create_purchase")
     def create(self, request):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
-            company = companies[0]
+            company = self.company_service.get_primary_company(company_ids)
 
             product_id = request.data.get("product")
             product = Product.objects.filter(id=product_id, company=company).first()
@@ -101,8 +106,8 @@ class PurchasesViewSet(viewsets.ViewSet):
     @custom_permission_required("edit_purchase")
     def update(self, request, pk=None):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_404_NOT_FOUND,
@@ -113,7 +118,7 @@ class PurchasesViewSet(viewsets.ViewSet):
                     {"error": "Compra no encontrada"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
-            if purchase.company not in companies:
+            if purchase.company_id not in company_ids:
                 return Response(
                     {"error": "No tienes permiso para actualizar esta compra"},
                     status=status.HTTP_403_FORBIDDEN,
@@ -132,8 +137,8 @@ class PurchasesViewSet(viewsets.ViewSet):
     @custom_permission_required("delete_purchase")
     def destroy(self, request, pk=None):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_404_NOT_FOUND,
@@ -144,7 +149,7 @@ class PurchasesViewSet(viewsets.ViewSet):
                     {"error": "Compra no encontrada"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
-            if purchase.company not in companies:
+            if purchase.company_id not in company_ids:
                 return Response(
                     {"error": "No tienes permiso para eliminar esta compra"},
                     status=status.HTTP_403_FORBIDDEN,
@@ -159,17 +164,19 @@ class PurchasesViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=["get"])
     @custom_permission_required("view_purchases")
+    @etag_from_data_version("purchase-statistics")
+    @cache_analytics_response("purchase-statistics")
     def statistics(self, request):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
 
             # Filtramos las compras por la(s) compañía(s) del usuario
-            purchases = Purchase.objects.filter(company__in=companies)
+            purchases = Purchase.objects.filter(company__in=company_ids)
 
             # Calculamos el total de compras en dinero
             total_purchases = purchases.aggregate(total=Sum("total_cost"))
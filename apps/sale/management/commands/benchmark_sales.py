@@ -0,0 +1,203 @@
+import threading
+import time
+import uuid
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.analytics.services.rollup_service import RollupService
+from apps.company.models import Company
+from apps.inventory.models import InventoryMovement
+from apps.inventory.services.inventory_service import (
+    InsufficientStockError,
+    InventoryService,
+)
+from apps.product.models import Product
+from apps.sale.models import Sale
+from apps.users.models import CustomUser
+
+
+def sell_unchecked(sale):
+    # Camino anterior, solo para comparar: INSERT de la venta y un UPDATE
+    # F("stock") - n aparte que no comprueba el stock disponible
+    sale.total_price = sale.quantity * sale.unit_price
+    with transaction.atomic():
+        Sale.objects.bulk_create([sale])
+        InventoryService().record_source(
+            "sale", InventoryMovement.SALE, -1, sale, sale.unit_price
+        )
+        RollupService().record_sale(
+            sale.company_id, sale.product_id, sale.date, sale.quantity, sale.total_price
+        )
+
+
+def sell_checked(sale):
+    sale.save()
+
+
+STRATEGIES = {
+    "conditional": sell_checked,
+    "unchecked": sell_unchecked,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide ventas por segundo con varios hilos vendiendo el mismo producto. "
+        "Las dos estrategias registran el movimiento y actualizan la fila de "
+        "DailySalesRollup del producto y el día, que sigue serializando las "
+        "ventas concurrentes del mismo producto"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads", type=int, default=8, help="Terminales vendiendo a la vez"
+        )
+        parser.add_argument(
+            "--sales", type=int, default=100, help="Ventas que intenta cada hilo"
+        )
+        parser.add_argument(
+            "--quantity", type=int, default=1, help="Unidades por venta"
+        )
+        parser.add_argument(
+            "--stock",
+            type=int,
+            help="Stock inicial del producto (por defecto alcanza para todas)",
+        )
+        parser.add_argument(
+            "--strategy",
+            choices=list(STRATEGIES),
+            default="conditional",
+            help=(
+                "conditional: UPDATE ... WHERE stock >= n de Sale.save; "
+                "unchecked: INSERT y UPDATE sin comprobar, como antes"
+            ),
+        )
+        parser.add_argument(
+            "--compare",
+            action="store_true",
+            help="Mide las dos estrategias, una detrás de otra",
+        )
+
+    def handle(self, *args, **options):
+        names = list(STRATEGIES) if options["compare"] else [options["strategy"]]
+        rates = {}
+        for name in names:
+            self.stdout.write(f"\n=== {name} ===")
+            rates[name] = self._measure(STRATEGIES[name], options)
+
+        if options["compare"] and all(rates.values()):
+            baseline, current = rates[names[1]], rates[names[0]]
+            self.stdout.write(
+                f"\n{names[0]}: {current:.1f} ventas/s | {names[1]}: "
+                f"{baseline:.1f} ventas/s ({current / baseline:.2f}x)"
+            )
+
+    def _measure(self, sell, options):
+        threads = options["threads"]
+        quantity = options["quantity"]
+        attempts = threads * options["sales"]
+        stock = options["stock"]
+        if stock is None:
+            stock = attempts * quantity
+
+        user = CustomUser.objects.create_user(
+            email=f"benchmark-{uuid.uuid4().hex}@example.com"
+        )
+        company = Company(
+            user=user,
+            name="Benchmark",
+            description="Datos temporales de benchmark_sales",
+            address="-",
+            phone="-",
+            email=user.email,
+        )
+        company.save()
+        product = Product.objects.create(
+            company=company,
+            name="Producto caliente",
+            description="-",
+            price=Decimal("1.00"),
+            stock=stock,
+        )
+
+        try:
+            results = []
+            barrier = threading.Barrier(threads + 1)
+            workers = [
+                threading.Thread(
+                    target=self._sell,
+                    args=(
+                        sell,
+                        product,
+                        user,
+                        options["sales"],
+                        quantity,
+                        barrier,
+                        results,
+                    ),
+                )
+                for _ in range(threads)
+            ]
+            for worker in workers:
+                worker.start()
+            barrier.wait()
+            started = time.perf_counter()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - started
+
+            sold = sum(result[0] for result in results)
+            rejected = sum(result[1] for result in results)
+            product.refresh_from_db()
+            expected_stock = stock - sold * quantity
+
+            self.stdout.write(
+                f"{threads} hilos, {attempts} intentos en {elapsed:.2f}s: "
+                f"{sold / elapsed:.1f} ventas/s"
+            )
+            self.stdout.write(f"Vendidas: {sold} | Rechazadas sin stock: {rejected}")
+            if product.stock < 0:
+                self.stdout.write(
+                    self.style.ERROR(f"Stock final negativo: {product.stock}")
+                )
+            elif product.stock == expected_stock:
+                self.stdout.write(
+                    self.style.SUCCESS(f"Stock final consistente: {product.stock}")
+                )
+            else:
+                self.stdout.write(
+                    self.style.ERROR(
+                        f"Stock final {product.stock}, se esperaba {expected_stock}"
+                    )
+                )
+            return sold / elapsed
+        finally:
+            company.delete()
+            user.delete()
+
+    def _sell(self, sell, product, user, count, quantity, barrier, results):
+        sold = rejected = 0
+        try:
+            barrier.wait()
+            for index in range(count):
+                try:
+                    sell(
+                        Sale(
+                            company_id=product.company_id,
+                            product=product,
+                            customer=f"Terminal {threading.get_ident()} #{index}",
+                            quantity=quantity,
+                            unit_price=product.price,
+                            total_price=Decimal("0"),
+                            date=timezone.now(),
+                            sold_by=user,
+                        )
+                    )
+                    sold += 1
+                except InsufficientStockError:
+                    rejected += 1
+        finally:
+            # Cada hilo abre su propia conexión
+            connection.close()
+            results.append((sold, rejected))
@@ -1,11 +1,9 @@
 from django.core.management.base import BaseCommand, CommandError
 from apps.company.models import Company
 from apps.product.models import Product
-from apps.sale.models import Sale
+from apps.sale.services.synthetic_sales_service import SyntheticSalesGenerator
 from apps.users.models import CustomUser
-from decimal import Decimal
-from datetime import datetime, timedelta
-import random
+import time
 
 
 class Command(BaseCommand):
@@ -23,11 +21,25 @@ class Command(BaseCommand):
             help="Número de días hacia atrás para generar datos",
         )
         parser.add_argument(
-            "--min", type=int, default=1, help="Mínimo de ventas por día"
+            "--min",
+            type=int,
+            default=1,
+            help="Mínimo de ventas por día (la demanda media es el promedio con --max)",
         )
         parser.add_argument(
             "--max", type=int, default=5, help="Máximo de ventas por día"
         )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Semilla para repetir los mismos datos"
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            help="Procesos que escriben en paralelo (por defecto uno por CPU)",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, help="Filas por escritura en bloque"
+        )
         parser.add_argument(
             "--list",
             action="store_true",
@@ -56,7 +68,9 @@ class Command(BaseCommand):
         min_sales = options["min"]
         max_sales = options["max"]
 
-        self.generate_sales_data(company_id, user_id, days, min_sales, max_sales)
+        self.generate_sales_data(
+            company_id, user_id, days, min_sales, max_sales, options
+        )
 
     def list_companies_and_users(self):
         self.stdout.write(self.style.SUCCESS("\n=== COMPAÑÍAS DISPONIBLES ==="))
@@ -85,7 +99,7 @@ class Command(BaseCommand):
                 )
 
     def generate_sales_data(
-        self, company_id, user_id, days, min_sales_per_day, max_sales_per_day
+        self, company_id, user_id, days, min_sales_per_day, max_sales_per_day, options
     ):
         self.stdout.write(self.style.SUCCESS("\n=== GENERANDO DATOS DE PRUEBA ==="))
         self.stdout.write(f"Compañía ID: {company_id} | Usuario ID: {user_id}")
@@ -94,75 +108,59 @@ class Command(BaseCommand):
         )
 
         try:
-            try:
-                company = Company.objects.get(id=company_id)
-                self.stdout.write(
-                    self.style.SUCCESS(f"Compañía encontrada: {company.name}")
-                )
-            except Company.DoesNotExist:
-                raise CommandError(f"No existe una compañía con ID {company_id}")
-
-            try:
-                user = CustomUser.objects.get(id=user_id)
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f"Usuario encontrado: {user.first_name} {user.last_name}"
-                    )
-                )
-            except CustomUser.DoesNotExist:
-                raise CommandError(f"No existe un usuario con ID {user_id}")
-
-            products = Product.objects.filter(company=company)
-            if not products:
-                raise CommandError(f"No hay productos para la compañía {company.name}")
-            else:
-                self.stdout.write(
-                    self.style.SUCCESS(f"Productos disponibles: {products.count()}")
-                )
-
-            current_date = datetime.now()
-            sales_count = 0
-
-            for day in range(days):
-                sale_date = current_date - timedelta(days=day)
-
-                num_sales = random.randint(min_sales_per_day, max_sales_per_day)
-
-                for _ in range(num_sales):
-                    product = random.choice(products)
-                    quantity = random.randint(1, 10)
-                    Sale.objects.create(
-                        company=company,
-                        product=product,
-                        customer=f"Cliente de prueba {random.randint(1, 100)}",
-                        quantity=quantity,
-                        unit_price=product.price,
-                        total_price=Decimal(quantity) * product.price,
-                        date=sale_date,
-                        sold_by=user,
-                    )
-
-                    sales_count += 1
-
-                if day % 5 == 0 or day == days - 1:
-                    self.stdout.write(f"Progreso: {day + 1}/{days} días procesados...")
-
-            self.stdout.write(self.style.SUCCESS("\n=== RESULTADOS ==="))
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f"Se generaron {sales_count} ventas de prueba para los últimos {days} días"
-                )
-            )
+            company = Company.objects.get(id=company_id)
             self.stdout.write(
-                self.style.SUCCESS(
-                    "Las ventas han sido creadas exitosamente en la base de datos."
-                )
+                self.style.SUCCESS(f"Compañía encontrada: {company.name}")
             )
+        except Company.DoesNotExist:
+            raise CommandError(f"No existe una compañía con ID {company_id}")
+
+        try:
+            user = CustomUser.objects.get(id=user_id)
             self.stdout.write(
                 self.style.SUCCESS(
-                    "Ahora puedes usar el endpoint de predicción de ventas."
+                    f"Usuario encontrado: {user.first_name} {user.last_name}"
                 )
             )
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"No existe un usuario con ID {user_id}")
+
+        products_count = Product.objects.filter(company=company).count()
+        if not products_count:
+            raise CommandError(f"No hay productos para la compañía {company.name}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Productos disponibles: {products_count}")
+        )
 
+        generator = SyntheticSalesGenerator(
+            seed=options["seed"],
+            processes=options["processes"],
+            batch_size=options["batch_size"],
+            log=self.stdout.write,
+        )
+        started = time.perf_counter()
+        try:
+            result = generator.generate(
+                company,
+                user,
+                days,
+                mean_daily_sales=(min_sales_per_day + max_sales_per_day) / 2,
+            )
         except Exception as e:
             raise CommandError(f"Error al generar datos de prueba: {str(e)}")
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS("\n=== RESULTADOS ==="))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Se generaron {result['sales']} ventas de prueba para los últimos "
+                f"{days} días en {elapsed:.1f}s"
+            )
+        )
+        if result["restocked"]:
+            self.stdout.write(
+                f"Se repuso el stock inicial de {result['restocked']} productos"
+            )
+        self.stdout.write(
+            self.style.SUCCESS("Ahora puedes usar el endpoint de predicción de ventas.")
+        )
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.sale.services.partition_service import SalePartitionService
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea por adelantado las particiones mensuales de la tabla de ventas "
+        "(PostgreSQL). Con --convert particiona antes la tabla existente"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help="Convierte la tabla actual en particionada, copiando sus datos",
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=SalePartitionService.MONTHS_AHEAD,
+            help="Meses futuros con partición propia",
+        )
+
+    def handle(self, *args, **options):
+        service = SalePartitionService()
+        if not service.is_supported():
+            raise CommandError("El particionado de ventas requiere PostgreSQL")
+
+        if options["convert"]:
+            if service.convert(months_ahead=options["months_ahead"]):
+                self.stdout.write(self.style.SUCCESS("Tabla de ventas particionada"))
+            else:
+                self.stdout.write("La tabla de ventas ya estaba particionada")
+        elif not service.is_partitioned():
+            raise CommandError(
+                "La tabla de ventas no está particionada; usa --convert primero"
+            )
+
+        created = service.ensure_partitions(months_ahead=options["months_ahead"])
+        for name in created:
+            self.stdout.write(f"Partición creada: {name}")
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(service.get_partitions())} particiones en total")
+        )
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.company.models import Company
+from apps.sale.prediction.batch_trainer import SalesBatchTrainer
+
+
+class Command(BaseCommand):
+    help = (
+        "Entrena en paralelo los modelos de predicción de todos los productos "
+        "de cada compañía a partir de sus ventas diarias"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company",
+            type=int,
+            action="append",
+            help="ID de la compañía a entrenar (se puede repetir; por defecto todas)",
+        )
+        parser.add_argument(
+            "--days-history",
+            type=int,
+            default=90,
+            help="Días de historia usados para entrenar",
+        )
+        parser.add_argument(
+            "--time-unit", choices=["day", "week", "month"], default="day"
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            help="Procesos que ajustan modelos en paralelo (por defecto, uno por CPU)",
+        )
+
+    def handle(self, *args, **options):
+        companies = Company.objects.order_by("pk")
+        if options["company"]:
+            companies = companies.filter(pk__in=options["company"])
+            if not companies:
+                raise CommandError("No existe ninguna de las compañías indicadas")
+
+        trainer = SalesBatchTrainer(
+            processes=options["processes"],
+            log=lambda message: self.stderr.write(message),
+        )
+        for company in companies:
+            result = trainer.train(
+                company,
+                days_back=options["days_history"],
+                time_unit=options["time_unit"],
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Compañía {company.pk}: {result['trained']} modelos "
+                    f"({result['skipped']} productos sin datos suficientes) en "
+                    f"{result['seconds']} s, {result['models_per_second']} modelos/s"
+                )
+            )
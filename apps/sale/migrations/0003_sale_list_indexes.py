@@ -0,0 +1,39 @@
+# Generated by Django 4.2.15 on 2026-10-17 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sale", "0002_alter_sale_date"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="sale",
+            index=models.Index(
+                fields=["company", "-date", "-id"], name="sale_company_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sale",
+            index=models.Index(
+                fields=["company", "product", "-date"],
+                name="sale_company_product_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sale",
+            index=models.Index(
+                fields=["company", "customer", "-date"],
+                name="sale_company_customer_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sale",
+            index=models.Index(
+                fields=["company", "sold_by", "-date"],
+                name="sale_company_seller_date_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.15 on 2026-10-17 17:34
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+SALE_DATE_BRIN = django.contrib.postgres.indexes.BrinIndex(
+    fields=["date"], name="sale_date_brin"
+)
+
+
+# BRIN solo existe en PostgreSQL; en otros motores el índice queda solo en el estado
+def add_date_brin(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.add_index(apps.get_model("sale", "Sale"), SALE_DATE_BRIN)
+
+
+def remove_date_brin(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.remove_index(apps.get_model("sale", "Sale"), SALE_DATE_BRIN)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sale", "0003_sale_list_indexes"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name="sale", index=SALE_DATE_BRIN),
+            ],
+            database_operations=[
+                migrations.RunPython(add_date_brin, remove_date_brin),
+            ],
+        ),
+    ]
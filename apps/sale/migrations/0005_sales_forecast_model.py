@@ -0,0 +1,71 @@
+# Generated by Django 4.2.15 on 2026-10-17 17:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("company", "0004_company_logo"),
+        ("product", "0003_product_sku"),
+        ("sale", "0004_sale_date_brin"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SalesForecastModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("time_unit", models.CharField(max_length=10)),
+                ("version", models.PositiveIntegerField(default=1)),
+                ("features", models.JSONField()),
+                ("coefficients", models.JSONField()),
+                ("intercept", models.FloatField()),
+                ("scaler_mean", models.JSONField()),
+                ("scaler_scale", models.JSONField()),
+                ("metrics", models.JSONField(default=dict)),
+                ("samples", models.PositiveIntegerField()),
+                ("trained_at", models.DateTimeField()),
+                (
+                    "company",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="company.company",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="product.product",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="salesforecastmodel",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("product__isnull", False)),
+                fields=("company", "product", "time_unit"),
+                name="unique_product_forecast_model",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="salesforecastmodel",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("product__isnull", True)),
+                fields=("company", "time_unit"),
+                name="unique_company_forecast_model",
+            ),
+        ),
+    ]
@@ -1,5 +1,8 @@
-from django.db import models
+from django.contrib.postgres.indexes import BrinIndex
+from django.db import models, transaction
+from apps.analytics.services.rollup_service import RollupService
 from apps.company.models import Company
+from apps.inventory.services.inventory_service import InventoryService
 from apps.product.models import Product
 from apps.users.models import CustomUser
 
@@ -14,8 +17,90 @@ class Sale(models.Model):
     date = models.DateTimeField()
     sold_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["company", "-date", "-id"], name="sale_company_date_idx"
+            ),
+            models.Index(
+                fields=["company", "product", "-date"],
+                name="sale_company_product_date_idx",
+            ),
+            models.Index(
+                fields=["company", "customer", "-date"],
+                name="sale_company_customer_idx",
+            ),
+            models.Index(
+                fields=["company", "sold_by", "-date"],
+                name="sale_company_seller_date_idx",
+            ),
+            # Las ventas se insertan en orden de fecha: un BRIN ocupa unas pocas
+            # páginas y acota los rangos de fechas sin filtrar por compañía
+            BrinIndex(fields=["date"], name="sale_date_brin"),
+        ]
+
     def save(self, *args, **kwargs):
         self.total_price = self.quantity * self.unit_price
-        super().save(*args, **kwargs)
-        self.product.stock = models.F("stock") - self.quantity
-        self.product.save(update_fields=["stock"])
+        rollups = RollupService()
+        inventory = InventoryService()
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = Sale.objects.select_for_update().filter(pk=self.pk).first()
+            super().save(*args, **kwargs)
+
+            if previous:
+                inventory.reverse_sale(previous)
+                rollups.record_sale(
+                    previous.company_id,
+                    previous.product_id,
+                    previous.date,
+                    previous.quantity,
+                    previous.total_price,
+                    sign=-1,
+                )
+            inventory.record_sale(self)
+            rollups.record_sale(
+                self.company_id,
+                self.product_id,
+                self.date,
+                self.quantity,
+                self.total_price,
+            )
+
+
+class SalesForecastModel(models.Model):
+    """Parámetros de un modelo de predicción de ventas ya entrenado.
+
+    Guarda solo coeficientes y parámetros del escalado, así que cualquier nodo
+    puede predecir sin acceso a los archivos del que entrenó.
+    """
+
+    company = models.ForeignKey(Company, on_delete=models.CASCADE)
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, null=True, blank=True
+    )
+    time_unit = models.CharField(max_length=10)
+    version = models.PositiveIntegerField(default=1)
+    features = models.JSONField()
+    coefficients = models.JSONField()
+    intercept = models.FloatField()
+    scaler_mean = models.JSONField()
+    scaler_scale = models.JSONField()
+    metrics = models.JSONField(default=dict)
+    samples = models.PositiveIntegerField()
+    trained_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["company", "product", "time_unit"],
+                condition=models.Q(product__isnull=False),
+                name="unique_product_forecast_model",
+            ),
+            models.UniqueConstraint(
+                fields=["company", "time_unit"],
+                condition=models.Q(product__isnull=True),
+                name="unique_company_forecast_model",
+            ),
+        ]
@@ -0,0 +1,71 @@
+import base64
+import json
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class DateKeysetPagination(BasePagination):
+    # Paginación por llave (date, id) descendente: cada página cuesta lo mismo
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE", 10)
+        try:
+            requested = int(request.query_params.get(self.page_size_query_param, 0))
+        except ValueError:
+            requested = 0
+        if requested > 0:
+            page_size = min(requested, self.max_page_size)
+        return page_size
+
+    def encode_cursor(self, item):
+        payload = [item.date.isoformat(), item.pk]
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            date, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            date = parse_datetime(date)
+            pk = int(pk)
+        except (ValueError, TypeError):
+            raise ValueError("Cursor inválido")
+        if date is None:
+            raise ValueError("Cursor inválido")
+        return date, pk
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            date, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(Q(date__lt=date) | Q(date=date, pk__lt=pk))
+
+        page = list(queryset.order_by("-date", "-pk")[: page_size + 1])
+        self.next_cursor = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_cursor = self.encode_cursor(page[-1])
+        return page
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "next_cursor": self.next_cursor,
+                "results": data,
+            }
+        )
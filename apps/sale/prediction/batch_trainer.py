@@ -0,0 +1,144 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from django.utils import timezone
+from apps.analytics.services.rollup_service import RollupService
+from apps.jobs import worker
+from apps.sale.prediction.model_registry import ForecastModel, ModelRegistry
+from apps.sale.prediction.sales_predictor import (
+    FEATURES,
+    build_features,
+    period_function,
+)
+
+# Mismo mínimo de periodos con ventas que SalesPredictor.train_model
+MIN_PERIODS = 3
+
+
+def fit_series(features, quantities):
+    """StandardScaler + LinearRegression de una serie, resueltos con NumPy.
+
+    Da los mismos coeficientes que scikit-learn sin crear sus objetos, que
+    pesan más que el propio ajuste cuando se entrenan miles de modelos.
+    """
+    mean = features.mean(axis=0)
+    scale = features.std(axis=0)
+    scale[scale < 10 * np.finfo(np.float64).eps] = 1.0
+    scaled = (features - mean) / scale
+
+    scaled_mean = scaled.mean(axis=0)
+    target_mean = quantities.mean()
+    coefficients = np.linalg.lstsq(
+        scaled - scaled_mean, quantities - target_mean, rcond=None
+    )[0]
+    intercept = target_mean - scaled_mean @ coefficients
+
+    residuals = quantities - (scaled @ coefficients + intercept)
+    total = ((quantities - target_mean) ** 2).sum()
+    if total:
+        r2 = 1 - (residuals**2).sum() / total
+    else:
+        r2 = 0.0 if residuals.any() else 1.0
+    metrics = {"r2": float(r2), "mae": float(np.abs(residuals).mean())}
+    return coefficients, intercept, mean, scale, metrics
+
+
+def fit_chunk(task):
+    # Cada fila de la matriz es un producto; NaN marca periodos sin ventas
+    features = task["features"]
+    results = []
+    for product_id, row in zip(task["product_ids"], task["quantities"]):
+        observed = ~np.isnan(row)
+        samples = int(observed.sum())
+        if samples < MIN_PERIODS:
+            continue
+        fitted = fit_series(features[observed], row[observed])
+        results.append((product_id, samples, fitted))
+    return results
+
+
+class SalesBatchTrainer:
+    """Entrena los modelos de todos los productos de una compañía de una vez."""
+
+    CHUNK_PRODUCTS = 500
+
+    def __init__(self, processes=None, log=None):
+        self.processes = processes or os.cpu_count() or 1
+        self.log = log or (lambda message: None)
+        self.registry = ModelRegistry()
+
+    def get_matrix(self, company, days_back, time_unit):
+        start_date = datetime.now() - timedelta(days=days_back)
+        rows = list(
+            RollupService().get_sales_series_by_product(
+                company, start_date, period_function(time_unit)
+            )
+        )
+        if not rows:
+            return [], None, None
+
+        product_column, period_column, quantity_column = zip(*rows)
+        product_ids, product_index = np.unique(product_column, return_inverse=True)
+        periods, period_index = np.unique(
+            pd.to_datetime(list(period_column)).to_numpy(), return_inverse=True
+        )
+        quantities = np.full((len(product_ids), len(periods)), np.nan)
+        quantities[product_index, period_index] = quantity_column
+        return product_ids.tolist(), build_features(periods), quantities
+
+    def _tasks(self, product_ids, features, quantities):
+        for offset in range(0, len(product_ids), self.CHUNK_PRODUCTS):
+            block = slice(offset, offset + self.CHUNK_PRODUCTS)
+            yield {
+                "product_ids": product_ids[block],
+                "features": features,
+                "quantities": quantities[block],
+            }
+
+    def _run(self, tasks):
+        if self.processes == 1 or len(tasks) == 1:
+            yield from map(fit_chunk, tasks)
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=worker.setup,
+        ) as pool:
+            yield from pool.map(fit_chunk, tasks)
+
+    def train(self, company, days_back=90, time_unit="day", on_progress=None):
+        started = time.perf_counter()
+        product_ids, features, quantities = self.get_matrix(
+            company, days_back, time_unit
+        )
+        tasks = list(self._tasks(product_ids, features, quantities))
+
+        trained_at = timezone.now()
+        models = {}
+        for index, results in enumerate(self._run(tasks), start=1):
+            for product_id, samples, fitted in results:
+                coefficients, intercept, mean, scale, metrics = fitted
+                model = ForecastModel(
+                    FEATURES, coefficients, intercept, mean, scale, trained_at
+                )
+                models[product_id] = (model, metrics, samples)
+            self.log(f"Bloque {index}/{len(tasks)}: {len(models)} modelos")
+            if on_progress:
+                on_progress(index, len(tasks))
+
+        saved = self.registry.save_many(company, time_unit, models)
+        seconds = time.perf_counter() - started
+        return {
+            "products": len(product_ids),
+            "trained": len(models),
+            "skipped": len(product_ids) - len(models),
+            "created": saved["created"],
+            "updated": saved["updated"],
+            "seconds": round(seconds, 3),
+            "models_per_second": round(len(models) / seconds, 1) if seconds else 0,
+        }
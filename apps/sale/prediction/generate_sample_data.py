@@ -1,15 +1,12 @@
 import os
 import django
-import random
-from datetime import datetime, timedelta
-from decimal import Decimal
 import sys
 
 # Configurar entorno Django
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 django.setup()
 
-from apps.sale.models import Sale
+from apps.sale.services.synthetic_sales_service import SyntheticSalesGenerator
 from apps.product.models import Product
 from apps.company.models import Company
 from apps.users.models import CustomUser
@@ -67,42 +64,25 @@ def generate_sample_sales(
             return False
 
         # Verificar productos
-        products = Product.objects.filter(company=company)
-        if not products:
+        products_count = Product.objects.filter(company=company).count()
+        if not products_count:
             print(f"ERROR: No hay productos para la compañía {company.name}")
             return False
         else:
-            print(f"Productos disponibles: {products.count()}")
-
-        current_date = datetime.now()
-
-        sales_count = 0
-        for day in range(days):
-            sale_date = current_date - timedelta(days=day)
-
-            num_sales = random.randint(min_sales_per_day, max_sales_per_day)
-
-            for _ in range(num_sales):
-                product = random.choice(products)
-
-                quantity = random.randint(1, 10)
-
-                Sale.objects.create(
-                    company=company,
-                    product=product,
-                    customer=f"Cliente de prueba {random.randint(1, 100)}",
-                    quantity=quantity,
-                    unit_price=product.price,
-                    total_price=Decimal(quantity) * product.price,
-                    date=sale_date,
-                    sold_by=user,
-                )
-
-                sales_count += 1
+            print(f"Productos disponibles: {products_count}")
+
+        # Demanda estacional por producto escrita en bloque; el stock se
+        # concilia al final en lugar de descontarse venta a venta
+        result = SyntheticSalesGenerator(log=print).generate(
+            company,
+            user,
+            days,
+            mean_daily_sales=(min_sales_per_day + max_sales_per_day) / 2,
+        )
 
         print("\n=== RESULTADOS ===")
         print(
-            f"Se generaron {sales_count} ventas de prueba para los últimos {days} días"
+            f"Se generaron {result['sales']} ventas de prueba para los últimos {days} días"
         )
         print("Las ventas han sido creadas exitosamente en la base de datos.")
         print("Ahora puedes usar el endpoint de predicción de ventas.")
@@ -0,0 +1,197 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from apps.sale.models import SalesForecastModel
+
+
+class ForecastModel:
+    """Regresión lineal sobre características estandarizadas.
+
+    Equivale a StandardScaler + LinearRegression de scikit-learn, pero con
+    solo los arreglos necesarios para predecir.
+    """
+
+    def __init__(self, features, coefficients, intercept, mean, scale, trained_at):
+        self.features = list(features)
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.trained_at = trained_at
+
+    @classmethod
+    def from_estimators(cls, features, model, scaler):
+        return cls(
+            features,
+            model.coef_,
+            model.intercept_,
+            scaler.mean_,
+            scaler.scale_,
+            timezone.now(),
+        )
+
+    @classmethod
+    def from_record(cls, record):
+        return cls(
+            record.features,
+            record.coefficients,
+            record.intercept,
+            record.scaler_mean,
+            record.scaler_scale,
+            record.trained_at,
+        )
+
+    def predict(self, features):
+        scaled = (features - self.mean) / self.scale
+        return scaled @ self.coefficients + self.intercept
+
+
+class ModelCache:
+    """LRU acotada por proceso con los modelos ya reconstruidos."""
+
+    def __init__(self, size):
+        self.size = size
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+            return model
+
+    def put(self, key, model):
+        with self._lock:
+            self._models[key] = model
+            self._models.move_to_end(key)
+            while len(self._models) > self.size:
+                self._models.popitem(last=False)
+
+    def evict(self, *record_ids):
+        # Quita todas las versiones de los registros, no solo la última
+        record_ids = set(record_ids)
+        with self._lock:
+            for key in [key for key in self._models if key[0] in record_ids]:
+                del self._models[key]
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+
+cache = ModelCache(settings.SALES_MODEL_CACHE_SIZE)
+
+
+class ModelRegistry:
+    """Modelos de predicción guardados en la base de datos.
+
+    Cada nodo consulta solo la versión vigente; los parámetros se leen una vez
+    por versión y se quedan en la LRU del proceso.
+    """
+
+    BATCH_SIZE = 1000
+    FIELDS = [
+        "version",
+        "features",
+        "coefficients",
+        "intercept",
+        "scaler_mean",
+        "scaler_scale",
+        "metrics",
+        "samples",
+        "trained_at",
+    ]
+
+    def _records(self, company, product_id, time_unit):
+        return SalesForecastModel.objects.filter(
+            company=company, product_id=product_id, time_unit=time_unit
+        )
+
+    def get(self, company, product_id=None, time_unit="day"):
+        current = (
+            self._records(company, product_id, time_unit)
+            .values_list("pk", "version", "trained_at")
+            .first()
+        )
+        if current is None:
+            return None
+
+        model = cache.get(current)
+        if model is None:
+            model = ForecastModel.from_record(
+                SalesForecastModel.objects.get(pk=current[0])
+            )
+            cache.put(current, model)
+        return model
+
+    def _fill(self, record, model, metrics, samples):
+        record.version += 1
+        record.features = model.features
+        record.coefficients = model.coefficients.tolist()
+        record.intercept = model.intercept
+        record.scaler_mean = model.mean.tolist()
+        record.scaler_scale = model.scale.tolist()
+        record.metrics = metrics
+        record.samples = samples
+        record.trained_at = model.trained_at
+
+    def save(self, company, product_id, time_unit, model, metrics, samples):
+        with transaction.atomic():
+            record = (
+                self._records(company, product_id, time_unit)
+                .select_for_update()
+                .first()
+            )
+            if record is None:
+                record = SalesForecastModel(
+                    company=company,
+                    product_id=product_id,
+                    time_unit=time_unit,
+                    version=0,
+                )
+            self._fill(record, model, metrics, samples)
+            record.save()
+
+        cache.evict(record.pk)
+        cache.put((record.pk, record.version, record.trained_at), model)
+        return record
+
+    def save_many(self, company, time_unit, models):
+        """Guarda los modelos por producto de un entrenamiento masivo.
+
+        `models` asocia cada product_id con (modelo, métricas, muestras). No se
+        precargan en la LRU: cada nodo los leerá cuando se pidan.
+        """
+        with transaction.atomic():
+            existing = {
+                record.product_id: record
+                for record in SalesForecastModel.objects.select_for_update().filter(
+                    company=company, time_unit=time_unit, product__isnull=False
+                )
+            }
+            created, updated = [], []
+            for product_id, (model, metrics, samples) in models.items():
+                record = existing.get(product_id)
+                if record is None:
+                    record = SalesForecastModel(
+                        company=company,
+                        product_id=product_id,
+                        time_unit=time_unit,
+                        version=0,
+                    )
+                    created.append(record)
+                else:
+                    updated.append(record)
+                self._fill(record, model, metrics, samples)
+
+            SalesForecastModel.objects.bulk_update(
+                updated, self.FIELDS, batch_size=self.BATCH_SIZE
+            )
+            SalesForecastModel.objects.bulk_create(created, batch_size=self.BATCH_SIZE)
+
+        cache.evict(*(record.pk for record in updated))
+        return {"created": len(created), "updated": len(updated)}
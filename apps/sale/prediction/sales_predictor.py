@@ -1,61 +1,69 @@
 import pandas as pd
 import numpy as np
-import os
-import pickle
 import logging
 from datetime import datetime, timedelta
 from apps.sale.models import Sale
 from apps.product.models import Product
-from django.db.models import Sum, Count
+from apps.analytics.services.rollup_service import RollupService
+from apps.sale.prediction.model_registry import ForecastModel, ModelRegistry
 from django.db.models.functions import TruncDay, TruncWeek, TruncMonth
 from django.conf import settings
+from django.utils import timezone
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LinearRegression
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
+FEATURES = ["day_of_week", "day_of_month", "month", "is_weekend"]
+
+
+def period_function(time_unit):
+    if time_unit == "day":
+        return TruncDay("day")
+    if time_unit == "week":
+        return TruncWeek("day")
+    return TruncMonth("day")
+
+
+def build_features(dates):
+    """Matriz de características a partir de fechas, sin recorrer fila a fila."""
+    dates = pd.DatetimeIndex(dates)
+    day_of_week = dates.dayofweek.to_numpy()
+    return np.column_stack(
+        [
+            day_of_week,
+            dates.day.to_numpy(),
+            dates.month.to_numpy(),
+            (day_of_week >= 5).astype(np.int64),
+        ]
+    )
+
 
 class SalesPredictor:
-    MODELS_DIR = os.path.join(settings.BASE_DIR, "models", "sales_prediction")
+    # Antigüedad a partir de la cual un modelo guardado se vuelve a entrenar
+    MAX_MODEL_AGE = timedelta(days=1)
 
-    def __init__(self, company):
+    def __init__(self, company, diagnostics=None):
         self.company = company
+        if diagnostics is None:
+            diagnostics = settings.SALES_PREDICTOR_DIAGNOSTICS
+        self.diagnostics = diagnostics
         self.model = LinearRegression()
         self.scaler = StandardScaler()
-
-        if not os.path.exists(self.MODELS_DIR):
-            os.makedirs(self.MODELS_DIR, exist_ok=True)
+        self.registry = ModelRegistry()
+        self.forecast = None
+        self.metrics = {}
+        self.samples = 0
 
     def _prepare_historical_data(self, product_id=None, days_back=90, time_unit="day"):
         start_date = datetime.now() - timedelta(days=days_back)
 
-        total_company_sales = Sale.objects.filter(company=self.company).count()
-        logger.info(
-            f"Total de ventas para la compañía {self.company.id}: {total_company_sales}"
-        )
-
-        sales_query = Sale.objects.filter(company=self.company, date__gte=start_date)
-        recent_sales_count = sales_query.count()
-        logger.info(f"Ventas en los últimos {days_back} días: {recent_sales_count}")
-
-        if product_id:
-            sales_query = sales_query.filter(product_id=product_id)
-            product_sales_count = sales_query.count()
-            logger.info(f"Ventas para el producto {product_id}: {product_sales_count}")
+        if self.diagnostics:
+            self._log_sales_counts(product_id, start_date, days_back)
 
-        if time_unit == "day":
-            trunc_function = TruncDay("date")
-        elif time_unit == "week":
-            trunc_function = TruncWeek("date")
-        else:
-            trunc_function = TruncMonth("date")
-
-        sales_data = (
-            sales_query.annotate(period=trunc_function)
-            .values("period")
-            .annotate(quantity=Sum("quantity"), total_sales=Sum("total_price"))
-            .order_by("period")
+        sales_data = RollupService().get_sales_series(
+            self.company, start_date, period_function(time_unit), product_id=product_id
         )
 
         periods_count = len(sales_data)
@@ -66,14 +74,27 @@ class SalesPredictor:
             return None
 
         df = pd.DataFrame(list(sales_data))
-        df["day_of_week"] = df["period"].apply(lambda x: x.weekday())
-        df["day_of_month"] = df["period"].apply(lambda x: x.day)
-        df["month"] = df["period"].apply(lambda x: x.month)
-        df["is_weekend"] = df["day_of_week"].apply(lambda x: 1 if x >= 5 else 0)
+        df["period"] = pd.to_datetime(df["period"])
+        df[FEATURES] = build_features(df["period"])
 
         logger.info(f"DataFrame creado con éxito, tamaño: {df.shape}")
         return df
 
+    def _log_sales_counts(self, product_id, start_date, days_back):
+        total_company_sales = Sale.objects.filter(company=self.company).count()
+        logger.info(
+            f"Total de ventas para la compañía {self.company.id}: {total_company_sales}"
+        )
+
+        sales_query = Sale.objects.filter(company=self.company, date__gte=start_date)
+        recent_sales_count = sales_query.count()
+        logger.info(f"Ventas en los últimos {days_back} días: {recent_sales_count}")
+
+        if product_id:
+            sales_query = sales_query.filter(product_id=product_id)
+            product_sales_count = sales_query.count()
+            logger.info(f"Ventas para el producto {product_id}: {product_sales_count}")
+
     def train_model(self, product_id=None, days_back=90, time_unit="day"):
         logger.info(
             f"Iniciando entrenamiento del modelo para company_id={self.company.id}, product_id={product_id}"
@@ -93,57 +114,43 @@ class SalesPredictor:
             )
             return False
 
-        X = df[["day_of_week", "day_of_month", "month", "is_weekend"]]
-        y = df["quantity"]
+        X = df[FEATURES].to_numpy()
+        y = df["quantity"].to_numpy()
 
         X_scaled = self.scaler.fit_transform(X)
 
         self.model.fit(X_scaled, y)
+        self.forecast = ForecastModel.from_estimators(FEATURES, self.model, self.scaler)
+        fitted = self.model.predict(X_scaled)
+        self.metrics = {
+            "r2": float(self.model.score(X_scaled, y)),
+            "mae": float(np.mean(np.abs(fitted - y))),
+        }
+        self.samples = len(y)
         return True
 
-    def _get_model_path(self, product_id=None, time_unit="day"):
-        prefix = f"company_{self.company.id}"
-        if product_id:
-            prefix += f"_product_{product_id}"
-        return os.path.join(self.MODELS_DIR, f"{prefix}_{time_unit}_model.pkl")
-
     def load_model(self, product_id=None, time_unit="day"):
-        model_path = self._get_model_path(product_id, time_unit)
-        if os.path.exists(model_path):
-            try:
-                with open(model_path, "rb") as f:
-                    model_data = pickle.load(f)
-                    self.model = model_data["model"]
-                    self.scaler = model_data["scaler"]
-                    last_trained = model_data.get("last_trained")
-
-                    if (
-                        last_trained is None
-                        or (datetime.now() - last_trained).days >= 1
-                    ):
-                        return False
-                    return True
-            except Exception:
-                return False
-        return False
+        forecast = self.registry.get(self.company, product_id, time_unit)
+        if forecast is None or forecast.features != FEATURES:
+            return False
+        if timezone.now() - forecast.trained_at >= self.MAX_MODEL_AGE:
+            return False
+        self.forecast = forecast
+        return True
 
     def save_model(self, product_id=None, time_unit="day"):
-        if self.model is None or self.scaler is None:
+        if self.forecast is None:
             return False
 
-        model_path = self._get_model_path(product_id, time_unit)
-        model_data = {
-            "model": self.model,
-            "scaler": self.scaler,
-            "last_trained": datetime.now(),
-        }
-
-        try:
-            with open(model_path, "wb") as f:
-                pickle.dump(model_data, f)
-            return True
-        except Exception:
-            return False
+        self.registry.save(
+            self.company,
+            product_id,
+            time_unit,
+            self.forecast,
+            self.metrics,
+            self.samples,
+        )
+        return True
 
     def predict_future_sales(self, product_id=None, days_ahead=30, time_unit="day"):
         model_loaded = self.load_model(product_id, time_unit)
@@ -151,45 +158,29 @@ class SalesPredictor:
             if not self.train_model(product_id, days_ahead * 3, time_unit):
                 return []
             self.save_model(product_id, time_unit)
-        future_dates = [
-            datetime.now() + timedelta(days=i) for i in range(1, days_ahead + 1)
-        ]
 
-        future_features = []
-        for date in future_dates:
-            feature = [
-                date.weekday(),
-                date.day,
-                date.month,
-                1 if date.weekday() >= 5 else 0,
-            ]
-            future_features.append(feature)
-
-        future_features = np.array(future_features)
-        future_features_scaled = self.scaler.transform(future_features)
-
-        predictions = self.model.predict(future_features_scaled)
-
-        results = []
-        for i, date in enumerate(future_dates):
-            predicted_quantity = max(0, round(float(predictions[i]), 2))
-
-            result = {
-                "date": date.strftime("%Y-%m-%d"),
-                "predicted_quantity": predicted_quantity,
-            }
-
-            if product_id:
-                try:
-                    product = Product.objects.get(id=product_id)
-                    result["product_id"] = product_id
-                    result["product_name"] = product.name
-                    result["predicted_sales"] = round(
-                        predicted_quantity * float(product.price), 2
-                    )
-                except Product.DoesNotExist:
-                    pass
-
-            results.append(result)
+        product = None
+        if product_id:
+            product = (
+                Product.objects.filter(id=product_id).only("name", "price").first()
+            )
+
+        # Días siguientes a hoy como datetime64, sin construir fechas en Python
+        today = np.datetime64(datetime.now().date(), "D")
+        future_dates = today + np.arange(1, days_ahead + 1)
+
+        predictions = self.forecast.predict(build_features(future_dates))
+        predicted_quantities = np.maximum(0, np.round(predictions, 2))
+
+        results = [
+            {"date": str(date), "predicted_quantity": float(quantity)}
+            for date, quantity in zip(future_dates, predicted_quantities)
+        ]
+        if product:
+            predicted_sales = np.round(predicted_quantities * float(product.price), 2)
+            for result, sales in zip(results, predicted_sales):
+                result["product_id"] = product_id
+                result["product_name"] = product.name
+                result["predicted_sales"] = float(sales)
 
         return results
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from apps.metrics.serializers import TimedSerializerMixin
 
 
 class SalesPredictionSerializer(serializers.Serializer):
@@ -26,7 +27,7 @@ class SalesPredictionSerializer(serializers.Serializer):
     )
 
 
-class SalesPredictionResultSerializer(serializers.Serializer):
+class SalesPredictionResultSerializer(TimedSerializerMixin, serializers.Serializer):
     date = serializers.DateField(help_text="Fecha de la predicción.")
     predicted_quantity = serializers.FloatField(
         help_text="Cantidad predicha de ventas."
@@ -12,7 +12,8 @@ class SaleRepository:
 
     @staticmethod
     def get_by_id(id):
-        return Sale.objects.get(id=id)
+        # SaleSerializer muestra el nombre del producto y del vendedor
+        return Sale.objects.select_related("product", "sold_by").get(id=id)
 
     @staticmethod
     def update(sale):
@@ -28,3 +29,20 @@ class SaleRepository:
     @staticmethod
     def get_all_by_company(companies):
         return Sale.objects.filter(company__in=companies)
+
+    @staticmethod
+    def get_filtered_by_company(companies, **filters):
+        sales = Sale.objects.filter(company__in=companies).select_related(
+            "product", "sold_by"
+        )
+        if filters.get("date_from"):
+            sales = sales.filter(date__gte=filters["date_from"])
+        if filters.get("date_to"):
+            sales = sales.filter(date__lt=filters["date_to"])
+        if filters.get("product"):
+            sales = sales.filter(product_id=filters["product"])
+        if filters.get("customer"):
+            sales = sales.filter(customer=filters["customer"])
+        if filters.get("sold_by"):
+            sales = sales.filter(sold_by_id=filters["sold_by"])
+        return sales
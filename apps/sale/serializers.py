@@ -1,8 +1,12 @@
 from rest_framework import serializers
+from apps.metrics.serializers import TimedSerializerMixin
 from apps.sale.models import Sale
 
 
-class SaleSerializer(serializers.ModelSerializer):
+class SaleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    product_name = serializers.CharField(source="product.name", read_only=True)
+    sold_by_name = serializers.SerializerMethodField()
+
     class Meta:
         model = Sale
         fields = "__all__"
@@ -11,3 +15,8 @@ class SaleSerializer(serializers.ModelSerializer):
             "sold_by": {"required": False},
             "date": {"required": False},
         }
+
+    def get_sold_by_name(self, obj):
+        if obj.sold_by_id is None:
+            return None
+        return obj.sold_by.get_full_name()
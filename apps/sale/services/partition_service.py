@@ -0,0 +1,178 @@
+from datetime import datetime
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.sale.models import Sale
+
+
+def month_start(value):
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return timezone.make_aware(datetime(value.year, value.month, 1))
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return month_start(datetime(index // 12, index % 12 + 1, 1))
+
+
+class SalePartitionService:
+    """Particionado mensual de la tabla de ventas (solo PostgreSQL).
+
+    La tabla particionada mantiene el nombre, las columnas, los índices y las
+    claves foráneas de la original, así que el ORM no nota la diferencia. La
+    clave primaria pasa a ser (id, date) porque PostgreSQL exige que incluya
+    la columna de partición; el id sigue saliendo de una única secuencia.
+    """
+
+    MONTHS_AHEAD = 3
+
+    def __init__(self):
+        self.table = Sale._meta.db_table
+        self.default_partition = f"{self.table}_default"
+
+    def quote(self, name):
+        return connection.ops.quote_name(name)
+
+    def partition_name(self, month):
+        return f"{self.table}_y{month.year}m{month.month:02d}"
+
+    def is_supported(self):
+        return connection.vendor == "postgresql"
+
+    def is_partitioned(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)",
+                [self.table],
+            )
+            row = cursor.fetchone()
+        return bool(row) and row[0] == "p"
+
+    def get_partitions(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = to_regclass(%s) "
+                "ORDER BY child.relname",
+                [self.table],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def create_partition(self, month):
+        """Crea la partición del mes si no existe.
+
+        Las filas de ese mes que hubieran caído en la partición por defecto se
+        mueven a la nueva antes de adjuntarla; si no, PostgreSQL la rechazaría.
+        """
+        name = self.partition_name(month)
+        if name in self.get_partitions():
+            return False
+
+        start, end = month_start(month), add_months(month, 1)
+        table, partition = self.quote(self.table), self.quote(name)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE {partition} "
+                f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {self.quote(self.default_partition)} "
+                "WHERE date >= %s AND date < %s RETURNING *) "
+                f"INSERT INTO {partition} SELECT * FROM moved",
+                [start, end],
+            )
+            cursor.execute(
+                f"ALTER TABLE {table} ATTACH PARTITION {partition} "
+                "FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+        return True
+
+    def ensure_partitions(self, months_ahead=None):
+        # Del mes actual en adelante; pensado para ejecutarse periódicamente
+        if months_ahead is None:
+            months_ahead = self.MONTHS_AHEAD
+        current = month_start(timezone.now())
+        return [
+            self.partition_name(add_months(current, offset))
+            for offset in range(months_ahead + 1)
+            if self.create_partition(add_months(current, offset))
+        ]
+
+    def convert(self, months_ahead=None):
+        """Convierte la tabla existente en particionada, con sus datos.
+
+        Todo ocurre en una transacción con la tabla bloqueada: las escrituras
+        esperan hasta que termina y, si algo falla, no cambia nada.
+        """
+        if self.is_partitioned():
+            return False
+        if months_ahead is None:
+            months_ahead = self.MONTHS_AHEAD
+
+        table = self.quote(self.table)
+        old_table = self.quote(f"{self.table}_unpartitioned")
+        sequence = f"{self.table}_id_seq"
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+            # Las claves foráneas de Django son diferidas: sus comprobaciones
+            # pendientes sobre la tabla impedirían borrarla más abajo
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            # Definiciones leídas antes de renombrar: ya apuntan al nombre final
+            cursor.execute(
+                "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+                "WHERE indrelid = to_regclass(%s) AND NOT indisprimary",
+                [self.table],
+            )
+            indexes = [row[0] for row in cursor.fetchall()]
+            cursor.execute(
+                "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+                [self.table],
+            )
+            foreign_keys = cursor.fetchall()
+            cursor.execute(f"SELECT MIN(date) FROM {table}")
+            first_sale = cursor.fetchone()[0]
+
+            cursor.execute(f"ALTER TABLE {table} RENAME TO {old_table}")
+            cursor.execute(
+                f"CREATE TABLE {table} (LIKE {old_table} INCLUDING CONSTRAINTS) "
+                "PARTITION BY RANGE (date)"
+            )
+            cursor.execute(
+                f"CREATE TABLE {self.quote(self.default_partition)} "
+                f"PARTITION OF {table} DEFAULT"
+            )
+            month = month_start(first_sale or timezone.now())
+            last = add_months(timezone.now(), months_ahead)
+            while month <= last:
+                self.create_partition(month)
+                month = add_months(month, 1)
+
+            cursor.execute(f"INSERT INTO {table} SELECT * FROM {old_table}")
+            # Al borrar la tabla original desaparecen su secuencia y sus índices,
+            # que se recrean con los mismos nombres sobre la particionada
+            cursor.execute(f"DROP TABLE {old_table}")
+            cursor.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, date)")
+            for definition in indexes:
+                cursor.execute(definition)
+            for name, definition in foreign_keys:
+                cursor.execute(
+                    f"ALTER TABLE {table} ADD CONSTRAINT {self.quote(name)} "
+                    f"{definition}"
+                )
+
+            cursor.execute(f"CREATE SEQUENCE {self.quote(sequence)}")
+            cursor.execute(
+                f"ALTER TABLE {table} ALTER COLUMN id "
+                "SET DEFAULT nextval(%s::regclass)",
+                [sequence],
+            )
+            cursor.execute(f"ALTER SEQUENCE {self.quote(sequence)} OWNED BY {table}.id")
+            cursor.execute(
+                f"SELECT setval(%s, COALESCE(MAX(id), 0) + 1, false) FROM {table}",
+                [sequence],
+            )
+            cursor.execute(f"ANALYZE {table}")
+        return True
@@ -8,6 +8,9 @@ class SaleService:
     def get_all_by_company(self, companies):
         return self.repository.get_all_by_company(companies)
 
+    def get_filtered_by_company(self, companies, **filters):
+        return self.repository.get_filtered_by_company(companies, **filters)
+
     def get_all(self):
         return self.repository.get_all()
 
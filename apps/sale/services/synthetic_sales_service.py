@@ -0,0 +1,346 @@
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+import numpy as np
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from apps.analytics.services.rollup_service import RollupService
+from apps.inventory.models import InventoryMovement
+from apps.jobs import worker
+from apps.product.models import Product
+from apps.sale.models import Sale
+
+# Demanda relativa de lunes a domingo
+WEEKLY_PROFILE = np.array([0.85, 0.9, 0.95, 1.0, 1.15, 1.35, 0.8])
+CUSTOMER_PREFIX = "Cliente de prueba"
+SOLD_TABLE = "synthetic_sold_units"
+SALE_COLUMNS = [
+    "company_id",
+    "product_id",
+    "customer",
+    "quantity",
+    "unit_price",
+    "total_price",
+    "date",
+    "sold_by_id",
+]
+
+
+def _demand(rng, shares, start, days, mean_daily_sales):
+    # Ventas por producto y día: popularidad x semana x estación anual x tendencia
+    count = len(shares)
+    day_numbers = np.datetime64(start, "D").astype("int64") + np.arange(days)
+    weekdays = (day_numbers + 3) % 7
+    dates = day_numbers.astype("datetime64[D]")
+    day_of_year = (dates - dates.astype("datetime64[Y]")).astype("int64")
+
+    amplitude = rng.uniform(0.1, 0.5, count)
+    phase = rng.uniform(0, 365.25, count)
+    growth = rng.normal(0.1, 0.15, count)
+    seasonal = 1 + amplitude[:, None] * np.sin(
+        2 * np.pi * (day_of_year[None, :] - phase[:, None]) / 365.25
+    )
+    trend = np.clip(1 + growth[:, None] * np.arange(days)[None, :] / days, 0.1, None)
+    rate = (
+        mean_daily_sales
+        * shares[:, None]
+        * WEEKLY_PROFILE[weekdays][None, :]
+        * seasonal
+        * trend
+    )
+    return rng.poisson(rate), day_numbers
+
+
+MOVEMENT_COLUMNS = [
+    "company_id",
+    "product_id",
+    "kind",
+    "quantity",
+    "unit_value",
+    "source_type",
+    "source_id",
+    "performed_by_id",
+    "date",
+    "created_at",
+]
+
+
+def _copy_rows(model, columns, rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(",".join("" if value is None else str(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+def _reserve_ids(count):
+    # COPY no devuelve las claves: se toman antes de la secuencia de la tabla
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) "
+            "FROM generate_series(1, %s)",
+            [Sale._meta.db_table, count],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _movement_row(sale_id, row, created_at):
+    company_id, product_id, _, quantity, unit_price, _, date, sold_by_id = row
+    return (
+        company_id,
+        product_id,
+        InventoryMovement.SALE,
+        -quantity,
+        unit_price,
+        "sale",
+        sale_id,
+        sold_by_id,
+        date,
+        created_at,
+    )
+
+
+def _copy_sales(rows, created_at):
+    ids = _reserve_ids(len(rows))
+    _copy_rows(Sale, ["id", *SALE_COLUMNS], [(pk, *row) for pk, row in zip(ids, rows)])
+    _copy_rows(
+        InventoryMovement,
+        MOVEMENT_COLUMNS,
+        [_movement_row(pk, row, created_at) for pk, row in zip(ids, rows)],
+    )
+
+
+def _insert_sales(rows, created_at):
+    sales = Sale.objects.bulk_create(
+        [Sale(**dict(zip(SALE_COLUMNS, row))) for row in rows]
+    )
+    InventoryMovement.objects.bulk_create(
+        [
+            InventoryMovement(
+                **dict(zip(MOVEMENT_COLUMNS, _movement_row(sale.pk, row, created_at)))
+            )
+            for sale, row in zip(sales, rows)
+        ]
+    )
+
+
+def generate_chunk(task):
+    """Genera y escribe las ventas de un bloque de productos con sus
+    movimientos de inventario.
+
+    Cada movimiento apunta al id de su venta, así que solo se registran las
+    ventas generadas aunque la tienda siga vendiendo mientras tanto.
+
+    El generador aleatorio depende solo de la semilla y del número de bloque,
+    así que el resultado no cambia con el número de procesos.
+    """
+    rng = np.random.default_rng([task["seed"], task["chunk"]])
+    product_ids = np.array(task["product_ids"])
+    price_cents = np.array(task["price_cents"])
+    counts, day_numbers = _demand(
+        rng,
+        np.array(task["shares"]),
+        task["start"],
+        task["days"],
+        task["mean_daily_sales"],
+    )
+
+    sales = np.repeat(np.arange(counts.size), counts.ravel())
+    products = sales // task["days"]
+    days = sales % task["days"]
+    total = len(sales)
+    quantities = np.minimum(1 + rng.poisson(1.5, total), 10)
+    seconds = day_numbers[days] * 86400 + rng.integers(8 * 3600, 21 * 3600, total)
+    customers = rng.integers(1, 101, total)
+
+    use_copy = connection.vendor == "postgresql"
+    created_at = timezone.now()
+    if use_copy:
+        created_at = created_at.isoformat()
+    sold = {}
+    for start in range(0, total, task["batch_size"]):
+        batch = slice(start, start + task["batch_size"])
+        rows = []
+        for index, quantity, second, customer in zip(
+            products[batch].tolist(),
+            quantities[batch].tolist(),
+            seconds[batch].tolist(),
+            customers[batch].tolist(),
+        ):
+            product_id = int(product_ids[index])
+            cents = int(price_cents[index])
+            date = datetime.fromtimestamp(second, tz=dt_timezone.utc)
+            unit_price = Decimal(cents).scaleb(-2)
+            total_price = Decimal(cents * quantity).scaleb(-2)
+            rows.append(
+                (
+                    task["company_id"],
+                    product_id,
+                    f"{CUSTOMER_PREFIX} {customer}",
+                    quantity,
+                    unit_price,
+                    total_price,
+                    date.isoformat() if use_copy else date,
+                    task["user_id"],
+                )
+            )
+            sold[product_id] = sold.get(product_id, 0) + quantity
+        if use_copy:
+            _copy_sales(rows, created_at)
+        else:
+            _insert_sales(rows, created_at)
+    return total, sold
+
+
+def run_chunk(task):
+    # Punto de entrada en los procesos hijos: cada uno usa su propia conexión
+    try:
+        return generate_chunk(task)
+    finally:
+        connections.close_all()
+
+
+class SyntheticSalesGenerator:
+    CHUNK_PRODUCTS = 250
+    BATCH_SIZE = 10000
+
+    def __init__(self, seed=0, processes=None, batch_size=None, log=None):
+        self.seed = seed
+        self.processes = processes or os.cpu_count() or 1
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.log = log or (lambda message: None)
+
+    def _tasks(self, company, user, products, start, days, mean_daily_sales):
+        rng = np.random.default_rng(self.seed)
+        popularity = rng.lognormal(0, 1, len(products))
+        shares = popularity / popularity.sum()
+        for chunk, offset in enumerate(range(0, len(products), self.CHUNK_PRODUCTS)):
+            block = products[offset : offset + self.CHUNK_PRODUCTS]
+            yield {
+                "seed": self.seed,
+                "chunk": chunk,
+                "company_id": company.pk,
+                "user_id": user.pk,
+                "product_ids": [product_id for product_id, _ in block],
+                "price_cents": [int(price * 100) for _, price in block],
+                "shares": shares[offset : offset + self.CHUNK_PRODUCTS].tolist(),
+                "start": start.isoformat(),
+                "days": days,
+                "mean_daily_sales": mean_daily_sales,
+                "batch_size": self.batch_size,
+            }
+
+    def _run(self, tasks):
+        processes = self.processes
+        # SQLite no admite escrituras concurrentes desde varios procesos, y
+        # dentro de una transacción los hijos no verían los datos sin confirmar
+        if connection.vendor == "sqlite" or connection.in_atomic_block:
+            processes = 1
+        if processes == 1:
+            yield from map(generate_chunk, tasks)
+            return
+
+        # Los hijos abren sus propias conexiones; la del padre no se comparte
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=worker.setup,
+        ) as pool:
+            yield from pool.map(run_chunk, tasks)
+
+    def generate(self, company, user, days, mean_daily_sales):
+        """Genera ventas para los últimos `days` días y deja stock, movimientos
+        y resúmenes diarios coherentes con ellas."""
+        products = list(
+            Product.objects.filter(company=company)
+            .order_by("pk")
+            .values_list("pk", "price")
+        )
+        if not products:
+            return {"sales": 0, "restocked": 0}
+
+        start = timezone.now().date() - timedelta(days=days)
+        created = 0
+        sold = {}
+        tasks = list(
+            self._tasks(company, user, products, start, days, mean_daily_sales)
+        )
+        for index, (count, chunk_sold) in enumerate(self._run(tasks), start=1):
+            created += count
+            sold.update(chunk_sold)
+            self.log(f"Bloque {index}/{len(tasks)}: {created} ventas")
+
+        with transaction.atomic():
+            restocked = self._reconcile(company, start, sold)
+        RollupService().rebuild(company_ids=[company.pk])
+        return {"sales": created, "restocked": restocked}
+
+    def _reconcile(self, company, start, sold):
+        """Repone y descuenta el stock de las ventas generadas en sentencias
+        sobre todos los productos a la vez.
+
+        Las unidades vendidas por producto van a una tabla temporal; la
+        reposición previa al periodo cubre lo que falte para que ningún
+        producto quede en negativo.
+        """
+        quote = connection.ops.quote_name
+        product_table = quote(Product._meta.db_table)
+        movement_table = quote(InventoryMovement._meta.db_table)
+        greatest = "MAX" if connection.vendor == "sqlite" else "GREATEST"
+        restock_date = timezone.make_aware(
+            datetime.combine(start - timedelta(days=1), datetime.min.time())
+        )
+        units = list(sold.items())
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {SOLD_TABLE} "
+                "(product_id bigint PRIMARY KEY, units integer NOT NULL)"
+            )
+            try:
+                for offset in range(0, len(units), self.batch_size):
+                    batch = units[offset : offset + self.batch_size]
+                    cursor.execute(
+                        f"INSERT INTO {SOLD_TABLE} (product_id, units) VALUES "
+                        + ", ".join(["(%s, %s)"] * len(batch)),
+                        [value for row in batch for value in row],
+                    )
+                if connection.features.has_select_for_update:
+                    # Bloquea los productos antes de leer su stock: una venta
+                    # real entre la reposición y el descuento los descuadraría
+                    cursor.execute(
+                        f"SELECT p.id FROM {product_table} p JOIN {SOLD_TABLE} s "
+                        "ON s.product_id = p.id ORDER BY p.id FOR UPDATE OF p"
+                    )
+                cursor.execute(
+                    f"INSERT INTO {movement_table} (company_id, product_id, kind, "
+                    "quantity, unit_value, source_type, source_id, date, created_at) "
+                    "SELECT p.company_id, p.id, %s, s.units - p.stock, 0, %s, p.id, "
+                    f"%s, %s FROM {product_table} p JOIN {SOLD_TABLE} s "
+                    "ON s.product_id = p.id WHERE s.units > p.stock",
+                    [
+                        InventoryMovement.ADJUSTMENT,
+                        "product",
+                        connection.ops.adapt_datetimefield_value(restock_date),
+                        connection.ops.adapt_datetimefield_value(timezone.now()),
+                    ],
+                )
+                restocked = cursor.rowcount
+                cursor.execute(
+                    f"UPDATE {product_table} SET stock = "
+                    f"{greatest}(stock, s.units) - s.units FROM {SOLD_TABLE} s "
+                    f"WHERE s.product_id = {product_table}.id"
+                )
+            finally:
+                cursor.execute(f"DROP TABLE {SOLD_TABLE}")
+        return restocked
@@ -1,3 +1,489 @@
+import base64
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
+import numpy as np
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.analytics.models import DailySalesRollup
+from apps.company.testing import create_company, create_owner
+from apps.inventory.models import InventoryMovement
+from apps.jobs.models import Job
+from apps.jobs.services.job_service import JobService
+from apps.product.models import Product
+from apps.sale.models import Sale, SalesForecastModel
+from apps.sale.prediction import model_registry
+from apps.sale.prediction.batch_trainer import SalesBatchTrainer
+from apps.sale.prediction.sales_predictor import SalesPredictor, build_features
+from apps.sale.services.partition_service import (
+    SalePartitionService,
+    add_months,
+    month_start,
+)
+from apps.sale.services.synthetic_sales_service import SyntheticSalesGenerator
 
-# Create your tests here.
+
+class SaleListTests(TestCase):
+    url = "/api/sales/"
+
+    def setUp(self):
+        self.user = create_owner(("view_sales", Sale))
+        self.company = create_company(self.user)
+        self.products = [
+            Product.objects.create(
+                company=self.company,
+                name=f"Producto {index}",
+                description="Descripción",
+                price=Decimal("10.00"),
+                stock=100,
+            )
+            for index in range(2)
+        ]
+        self.now = timezone.now()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_sales(self, count, days_ago=0, customer="Cliente"):
+        for index in range(count):
+            Sale.objects.create(
+                company=self.company,
+                product=self.products[index % 2],
+                customer=customer,
+                quantity=1,
+                unit_price=Decimal("10.00"),
+                total_price=Decimal("0"),
+                date=self.now - timedelta(days=days_ago),
+                sold_by=self.user,
+            )
+
+    def fetch_all(self, params):
+        ids = []
+        pages = 0
+        while True:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(sale["id"] for sale in response.data["results"])
+            pages += 1
+            if not response.data["next_cursor"]:
+                return ids, pages
+            params = {**params, "cursor": response.data["next_cursor"]}
+
+    def test_cursor_walks_every_sale_once_newest_first(self):
+        self.create_sales(7, days_ago=2)
+        self.create_sales(6)
+
+        ids, pages = self.fetch_all({"page_size": 4})
+
+        expected = list(
+            Sale.objects.order_by("-date", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 4)
+
+    def test_cursor_with_a_malformed_id_is_rejected(self):
+        for pk in ([1], {"id": 1}, None):
+            payload = json.dumps([self.now.isoformat(), pk]).encode()
+            cursor = base64.urlsafe_b64encode(payload).decode()
+            response = self.client.get(self.url, {"cursor": cursor})
+            with self.subTest(pk=pk):
+                self.assertEqual(response.status_code, 400)
+
+    def test_filters_narrow_the_listing(self):
+        self.create_sales(4, days_ago=10)
+        self.create_sales(3, customer="Ana")
+        since = (self.now - timedelta(days=1)).date().isoformat()
+
+        ids, _ = self.fetch_all({"date_from": since})
+        self.assertEqual(len(ids), 3)
+
+        ids, _ = self.fetch_all({"customer": "Ana", "product": self.products[0].id})
+        self.assertEqual(len(ids), 2)
+
+        response = self.client.get(self.url, {"date_to": "ayer"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_page_size_bounds_the_query_count(self):
+        self.create_sales(3)
+        cache.clear()
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url)
+
+        self.create_sales(30)
+        cache.clear()
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertEqual(response.data["results"][0]["product_name"], "Producto 1")
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+
+class SaleStockTests(TestCase):
+    url = "/api/sales/"
+
+    def setUp(self):
+        self.user = create_owner(("create_sale", Sale), ("edit_sale", Sale))
+        self.company = create_company(self.user)
+        self.product = Product.objects.create(
+            company=self.company,
+            name="Producto",
+            description="Descripción",
+            price=Decimal("10.00"),
+            stock=5,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def sell(self, quantity):
+        return self.client.post(
+            self.url,
+            {
+                "product": self.product.pk,
+                "customer": "Cliente",
+                "quantity": quantity,
+                "unit_price": "10.00",
+                "total_price": "0",
+            },
+            format="json",
+        )
+
+    def sale_movements(self):
+        return InventoryMovement.objects.filter(kind=InventoryMovement.SALE)
+
+    def test_sale_decrements_stock_with_one_conditional_update(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.sell(5)
+
+        self.assertEqual(response.status_code, 201)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 0)
+        stock_updates = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith('UPDATE "product_product"')
+        ]
+        self.assertEqual(len(stock_updates), 1)
+        self.assertIn('"stock" >=', stock_updates[0])
+
+    def test_sale_above_stock_is_rejected_without_side_effects(self):
+        response = self.sell(6)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["error"],
+            "Stock insuficiente para vender 6 unidades del producto",
+        )
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 5)
+        self.assertFalse(Sale.objects.exists())
+        self.assertFalse(self.sale_movements().exists())
+
+    def test_update_checks_stock_net_of_the_previous_quantity(self):
+        sale_id = self.sell(3).data["id"]
+        url = f"{self.url}{sale_id}/"
+        data = {
+            "product": self.product.pk,
+            "customer": "Cliente",
+            "unit_price": "10.00",
+            "total_price": "0",
+            "date": timezone.now().isoformat(),
+        }
+
+        response = self.client.put(url, {**data, "quantity": 6}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 2)
+
+        response = self.client.put(url, {**data, "quantity": 5}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 0)
+
+
+class SyntheticSalesTests(TestCase):
+    def setUp(self):
+        self.user = create_owner()
+        self.company = create_company(self.user)
+        for index in range(6):
+            Product.objects.create(
+                company=self.company,
+                name=f"Producto {index}",
+                description="Descripción",
+                price=Decimal("2.50"),
+                stock=20,
+            )
+
+    def generate(self, seed=7):
+        generator = SyntheticSalesGenerator(seed=seed, batch_size=50)
+        generator.CHUNK_PRODUCTS = 4
+        return generator.generate(self.company, self.user, 60, mean_daily_sales=8)
+
+    def sales(self):
+        return list(
+            Sale.objects.order_by("pk").values_list(
+                "product_id", "quantity", "total_price", "date"
+            )
+        )
+
+    def test_same_seed_generates_the_same_sales(self):
+        result = self.generate()
+        first = self.sales()
+        self.assertEqual(result["sales"], len(first))
+        self.assertGreater(len(first), 200)
+
+        Sale.objects.all().delete()
+        self.generate()
+        self.assertEqual(self.sales(), first)
+
+    def test_stock_movements_and_rollups_are_reconciled(self):
+        result = self.generate()
+
+        self.assertGreater(result["restocked"], 0)
+        for product in Product.objects.all():
+            ledger = InventoryMovement.objects.filter(product=product).aggregate(
+                total=Sum("quantity")
+            )["total"]
+            self.assertEqual(product.stock, ledger)
+            self.assertGreaterEqual(product.stock, 0)
+        self.assertEqual(
+            InventoryMovement.objects.filter(kind=InventoryMovement.SALE).count(),
+            result["sales"],
+        )
+        self.assertEqual(
+            DailySalesRollup.objects.aggregate(total=Sum("units"))["total"],
+            Sale.objects.aggregate(total=Sum("quantity"))["total"],
+        )
+        sale = Sale.objects.first()
+        self.assertEqual(sale.total_price, sale.quantity * Decimal("2.50"))
+        self.assertLess(sale.date, timezone.now())
+
+    def test_concurrent_real_sales_are_not_reconciled_twice(self):
+        product = Product.objects.first()
+        run = SyntheticSalesGenerator._run
+
+        def run_with_a_real_sale(generator, tasks):
+            yield from run(generator, tasks)
+            # Una venta real con el mismo formato de cliente durante la generación
+            Sale.objects.create(
+                company=self.company,
+                product=product,
+                customer="Cliente de prueba 1",
+                quantity=1,
+                unit_price=Decimal("2.50"),
+                total_price=Decimal("2.50"),
+                date=timezone.now(),
+                sold_by=self.user,
+            )
+
+        with mock.patch.object(SyntheticSalesGenerator, "_run", run_with_a_real_sale):
+            result = self.generate()
+
+        self.assertEqual(
+            InventoryMovement.objects.filter(kind=InventoryMovement.SALE).count(),
+            result["sales"] + 1,
+        )
+        for product in Product.objects.all():
+            ledger = InventoryMovement.objects.filter(product=product).aggregate(
+                total=Sum("quantity")
+            )["total"]
+            self.assertEqual(product.stock, ledger)
+
+
+class SalesPredictorTests(TestCase):
+    def setUp(self):
+        self.user = create_owner()
+        self.company = create_company(self.user)
+        self.product = Product.objects.create(
+            company=self.company,
+            name="Producto",
+            description="Descripción",
+            price=Decimal("2.50"),
+            stock=20,
+        )
+        SyntheticSalesGenerator(seed=3).generate(
+            self.company, self.user, 120, mean_daily_sales=6
+        )
+        model_registry.cache.clear()
+        self.predictor = SalesPredictor(self.company)
+
+    def test_features_match_the_calendar(self):
+        # 2026-10-17 es sábado
+        features = build_features([date(2026, 10, 16), date(2026, 10, 17)])
+        self.assertEqual(features.tolist(), [[4, 16, 10, 0], [5, 17, 10, 1]])
+
+    def test_prediction_trains_once_and_loads_the_product_once(self):
+        predictions = self.predictor.predict_future_sales(
+            self.product.id, days_ahead=14
+        )
+
+        self.assertEqual(len(predictions), 14)
+        first = date.today() + timedelta(days=1)
+        self.assertEqual(predictions[0]["date"], first.isoformat())
+        for prediction in predictions:
+            self.assertGreaterEqual(prediction["predicted_quantity"], 0)
+            self.assertEqual(prediction["product_name"], "Producto")
+            self.assertAlmostEqual(
+                prediction["predicted_sales"],
+                prediction["predicted_quantity"] * 2.5,
+                places=1,
+            )
+
+        # El modelo registrado se reutiliza: solo se consultan su versión y el
+        # producto, sin volver a leer las ventas
+        with self.assertNumQueries(2):
+            again = SalesPredictor(self.company).predict_future_sales(
+                self.product.id, days_ahead=14
+            )
+        self.assertEqual(again, predictions)
+
+    def test_registry_shares_models_across_processes_and_versions_them(self):
+        predictions = self.predictor.predict_future_sales(days_ahead=7)
+        record = SalesForecastModel.objects.get(company=self.company, product=None)
+        self.assertEqual(record.version, 1)
+        self.assertEqual(record.samples, 21)
+        self.assertIn("mae", record.metrics)
+
+        # Otro nodo, con la LRU vacía, predice lo mismo a partir de la base
+        model_registry.cache.clear()
+        self.assertEqual(
+            SalesPredictor(self.company).predict_future_sales(days_ahead=7),
+            predictions,
+        )
+
+        # Reentrenar crea una versión nueva y descarta la anterior de la LRU
+        self.assertTrue(self.predictor.train_model(days_back=30))
+        self.predictor.save_model()
+        record.refresh_from_db()
+        self.assertEqual(record.version, 2)
+        self.assertEqual(record.samples, 30)
+        self.assertEqual(
+            list(model_registry.cache._models), [(record.pk, 2, record.trained_at)]
+        )
+
+
+class BatchTrainingTests(TestCase):
+    def setUp(self):
+        self.user = create_owner(("view_sales", Sale))
+        self.company = create_company(self.user)
+        self.products = [
+            Product.objects.create(
+                company=self.company,
+                name=f"Producto {index}",
+                description="Descripción",
+                price=Decimal("4.00"),
+                stock=20,
+            )
+            for index in range(5)
+        ]
+        SyntheticSalesGenerator(seed=5).generate(
+            self.company, self.user, 120, mean_daily_sales=10
+        )
+        model_registry.cache.clear()
+
+    def test_batch_models_match_the_per_product_models(self):
+        # Una consulta agrupada para todas las series; el resto es la escritura
+        with self.assertNumQueries(5):
+            result = SalesBatchTrainer(processes=1).train(self.company, days_back=60)
+
+        self.assertEqual(result["products"], 5)
+        self.assertEqual(result["trained"] + result["skipped"], 5)
+        self.assertEqual(result["created"], result["trained"])
+        self.assertGreater(result["models_per_second"], 0)
+
+        future = build_features(np.datetime64("2026-11-01") + np.arange(14))
+        registry = model_registry.ModelRegistry()
+        for record in SalesForecastModel.objects.filter(company=self.company):
+            predictor = SalesPredictor(self.company)
+            self.assertTrue(predictor.train_model(record.product_id, days_back=60))
+            self.assertEqual(record.samples, predictor.samples)
+            np.testing.assert_allclose(
+                registry.get(self.company, record.product_id).predict(future),
+                predictor.forecast.predict(future),
+            )
+
+        # Reentrenar actualiza los mismos registros con una versión nueva
+        result = SalesBatchTrainer(processes=1).train(self.company, days_back=60)
+        self.assertEqual(result["updated"], result["trained"])
+        self.assertEqual(
+            set(SalesForecastModel.objects.values_list("version", flat=True)), {2}
+        )
+
+    def test_command_and_job_train_every_product(self):
+        output = StringIO()
+        call_command("train_all_models", "--processes", "1", stdout=output)
+        self.assertIn("modelos/s", output.getvalue())
+        self.assertEqual(SalesForecastModel.objects.count(), 5)
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.post(
+            "/api/sales/train-all-models/", {"time_unit": "week"}, format="json"
+        )
+        self.assertEqual(response.status_code, 202)
+
+        job = JobService().execute(response.data["job"]["id"])
+        job.refresh_from_db()
+        self.assertEqual(job.kind, Job.TRAIN_ALL_SALES_MODELS)
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result["trained"], 5)
+        self.assertEqual(SalesForecastModel.objects.filter(time_unit="week").count(), 5)
+
+
+@skipUnless(connection.vendor == "postgresql", "Particionado declarativo de PostgreSQL")
+class SalePartitionTests(TestCase):
+    def setUp(self):
+        self.user = create_owner()
+        self.company = create_company(self.user)
+        for index in range(4):
+            Product.objects.create(
+                company=self.company,
+                name=f"Producto {index}",
+                description="Descripción",
+                price=Decimal("2.50"),
+                stock=20,
+            )
+        self.service = SalePartitionService()
+
+    def generate(self, seed):
+        return SyntheticSalesGenerator(seed=seed).generate(
+            self.company, self.user, 60, mean_daily_sales=8
+        )["sales"]
+
+    def test_conversion_keeps_the_sales_and_prunes_by_date(self):
+        created = self.generate(seed=7)
+        before = list(Sale.objects.order_by("pk").values_list("pk", "date"))
+
+        self.assertTrue(self.service.convert(months_ahead=2))
+        self.assertTrue(self.service.is_partitioned())
+        self.assertFalse(self.service.convert())
+        self.assertEqual(
+            list(Sale.objects.order_by("pk").values_list("pk", "date")), before
+        )
+
+        current = month_start(timezone.now())
+        partitions = self.service.get_partitions()
+        self.assertIn(self.service.default_partition, partitions)
+        for offset in range(-1, 3):
+            self.assertIn(
+                self.service.partition_name(add_months(current, offset)), partitions
+            )
+        self.assertEqual(self.service.ensure_partitions(months_ahead=2), [])
+
+        # Las ventas nuevas siguen la secuencia de ids de la tabla original
+        created += self.generate(seed=8)
+        self.assertEqual(Sale.objects.count(), created)
+        self.assertGreater(
+            Sale.objects.order_by("pk").last().pk, before[-1][0] if before else 0
+        )
+
+        plan = Sale.objects.filter(company=self.company, date__gte=current).explain()
+        self.assertIn(self.service.partition_name(current), plan)
+        self.assertNotIn(self.service.partition_name(add_months(current, -1)), plan)
@@ -1,18 +1,30 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from apps.sale.services.sale_service import SaleService
+from apps.company.mixins import CompanyMembershipMixin
+from apps.analytics.decorators import (
+    cache_analytics_response,
+    etag_from_data_version,
+)
 from apps.company.services.company_service import CompanyService
 from apps.users.decorators import custom_permission_required
+from apps.metrics.decorators import query_budget
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import action
 from django.db.models import Sum, Avg
-from django.db.models.functions import ExtractMonth
 from apps.sale.serializers import SaleSerializer
 from apps.product.models import Product
 from apps.sale.models import Sale
-from apps.purchase.models import Purchase
-from datetime import datetime
+from apps.analytics.services.rollup_service import RollupService
+from apps.inventory.services.inventory_service import InsufficientStockError
+from datetime import datetime, time, timedelta
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from apps.sale.pagination import DateKeysetPagination
+from apps.jobs.models import Job
+from apps.jobs.responses import job_accepted, wants_background
+from apps.jobs.services.job_service import JobService
 
 from apps.sale.prediction.sales_predictor import SalesPredictor
 from apps.sale.prediction.serializers import (
@@ -21,27 +33,69 @@ from apps.sale.prediction.serializers import (
 )
 
 
-class SalesViewSet(viewsets.ViewSet):
+class SalesViewSet(CompanyMembershipMixin, viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.service = SaleService()
         self.company_service = CompanyService()
+        self.rollup_service = RollupService()
+        self.job_service = JobService()
+
+    def _get_list_filters(self, request):
+        params = request.query_params
+        filters = {}
+
+        for name in ("date_from", "date_to"):
+            value = params.get(name)
+            if not value:
+                continue
+            parsed = parse_datetime(value)
+            if parsed is None:
+                day = parse_date(value)
+                if day is None:
+                    raise ValueError(f"Fecha inválida en {name}")
+                parsed = datetime.combine(day, time.min)
+                if name == "date_to":
+                    parsed += timedelta(days=1)
+            if timezone.is_naive(parsed):
+                parsed = timezone.make_aware(parsed)
+            filters[name] = parsed
+
+        for name in ("product", "sold_by"):
+            value = params.get(name)
+            if not value:
+                continue
+            try:
+                filters[name] = int(value)
+            except ValueError:
+                raise ValueError(f"El parámetro {name} debe ser numérico")
+
+        if params.get("customer"):
+            filters["customer"] = params["customer"]
+        return filters
 
     @custom_permission_required("view_sales")
+    @query_budget(4)
+    @etag_from_data_version("sale-list")
     def list(self, request):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
-            sales = self.service.get_all_by_company(companies)
-            return Response(
-                SaleSerializer(sales, many=True).data,
-                status=status.HTTP_200_OK,
+            try:
+                filters = self._get_list_filters(request)
+                sales = self.service.get_filtered_by_company(company_ids, **filters)
+                paginator = DateKeysetPagination()
+                page = paginator.paginate_queryset(sales, request, view=self)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return paginator.get_paginated_response(
+                SaleSerializer(page, many=True).data
             )
         except Exception as e:
             return Response(
@@ -50,10 +104,11 @@ class SalesViewSet(viewsets.ViewSet):
             )
 
     @custom_permission_required("view_sales")
+    @query_budget(4)
     def retrieve(self, request, pk=None):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_404_NOT_FOUND,
@@ -64,7 +119,7 @@ class SalesViewSet(viewsets.ViewSet):
                     {"error": "Venta no encontrada"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
-            if sale.company not in companies:
+            if sale.company_id not in company_ids:
                 return Response(
                     {"error": "No tienes permiso para ver esta venta"},
                     status=status.HTTP_403_FORBIDDEN,
@@ -80,13 +135,13 @@ class SalesViewSet(viewsets.ViewSet):
     @custom_permission_required("create_sale")
     def create(self, request):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
-            company = companies[0]
+            company = self.company_service.get_primary_company(company_ids)
 
             product_id = request.data.get("product")
             product = Product.objects.filter(id=product_id, company=company).first()
@@ -96,8 +151,6 @@ class SalesViewSet(viewsets.ViewSet):
                     status=status.HTTP_404_NOT_FOUND,
                 )
 
-            from django.utils import timezone
-
             serializer = SaleSerializer(data=request.data)
             if serializer.is_valid():
                 sale = serializer.save(
@@ -105,6 +158,8 @@ class SalesViewSet(viewsets.ViewSet):
                 )
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except InsufficientStockError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response(
                 {"error": str(e)},
@@ -114,8 +169,8 @@ class SalesViewSet(viewsets.ViewSet):
     @custom_permission_required("edit_sale")
     def update(self, request, pk=None):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_404_NOT_FOUND,
@@ -126,7 +181,7 @@ class SalesViewSet(viewsets.ViewSet):
                     {"error": "Venta no encontrada"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
-            if sale.company not in companies:
+            if sale.company_id not in company_ids:
                 return Response(
                     {"error": "No tienes permiso para actualizar esta venta"},
                     status=status.HTTP_403_FORBIDDEN,
@@ -136,6 +191,8 @@ class SalesViewSet(viewsets.ViewSet):
                 updated_sale = serializer.save(company=sale.company)
                 return Response(serializer.data)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except InsufficientStockError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response(
                 {"error": str(e)},
@@ -145,8 +202,8 @@ class SalesViewSet(viewsets.ViewSet):
     @custom_permission_required("delete_sale")
     def destroy(self, request, pk=None):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_404_NOT_FOUND,
@@ -157,7 +214,7 @@ class SalesViewSet(viewsets.ViewSet):
                     {"error": "Venta no encontrada"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
-            if sale.company not in companies:
+            if sale.company_id not in company_ids:
                 return Response(
                     {"error": "No tienes permiso para eliminar esta venta"},
                     status=status.HTTP_403_FORBIDDEN,
@@ -172,16 +229,19 @@ class SalesViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=["get"])
     @custom_permission_required("view_sales")
+    @query_budget(5)
+    @etag_from_data_version("sale-statistics")
+    @cache_analytics_response("sale-statistics")
     def statistics(self, request):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
 
-            sales = Sale.objects.filter(company__in=companies)
+            sales = Sale.objects.filter(company__in=company_ids)
 
             total_sales = sales.aggregate(total=Sum("total_price"))
 
@@ -204,8 +264,8 @@ class SalesViewSet(viewsets.ViewSet):
     @custom_permission_required("view_sales")
     def train_sales_model(self, request):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_404_NOT_FOUND,
@@ -221,7 +281,7 @@ class SalesViewSet(viewsets.ViewSet):
 
             if product_id:
                 product = Product.objects.filter(
-                    id=product_id, company__in=companies
+                    id=product_id, company__in=company_ids
                 ).first()
                 if not product:
                     return Response(
@@ -229,7 +289,22 @@ class SalesViewSet(viewsets.ViewSet):
                         status=status.HTTP_404_NOT_FOUND,
                     )
 
-            predictor = SalesPredictor(companies[0])
+            if wants_background(request):
+                job = self.job_service.enqueue(
+                    Job.TRAIN_SALES_MODEL,
+                    self.company_service.get_primary_company(company_ids),
+                    request.user,
+                    {
+                        "product_id": product_id,
+                        "days_history": days_history,
+                        "time_unit": time_unit,
+                    },
+                )
+                return job_accepted(request, job)
+
+            predictor = SalesPredictor(
+                self.company_service.get_primary_company(company_ids)
+            )
 
             success = predictor.train_model(
                 product_id=product_id, days_back=days_history, time_unit=time_unit
@@ -257,12 +332,45 @@ class SalesViewSet(viewsets.ViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    @action(detail=False, methods=["post"], url_path="train-all-models")
+    @custom_permission_required("view_sales")
+    def train_all_models(self, request):
+        # Siempre en segundo plano: entrena un modelo por producto
+        try:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
+                return Response(
+                    {"error": "El usuario no tiene compañías asignadas"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+            serializer = SalesPredictionSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+            job = self.job_service.enqueue(
+                Job.TRAIN_ALL_SALES_MODELS,
+                self.company_service.get_primary_company(company_ids),
+                request.user,
+                {
+                    "days_history": serializer.validated_data["days_history"],
+                    "time_unit": serializer.validated_data["time_unit"],
+                },
+            )
+            return job_accepted(request, job)
+
+        except Exception as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
     @action(detail=False, methods=["post"], url_path="predict")
     @custom_permission_required("view_sales")
     def predict_sales(self, request):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_404_NOT_FOUND,
@@ -279,7 +387,7 @@ class SalesViewSet(viewsets.ViewSet):
 
             if product_id:
                 product = Product.objects.filter(
-                    id=product_id, company__in=companies
+                    id=product_id, company__in=company_ids
                 ).first()
                 if not product:
                     return Response(
@@ -287,7 +395,9 @@ class SalesViewSet(viewsets.ViewSet):
                         status=status.HTTP_404_NOT_FOUND,
                     )
 
-            predictor = SalesPredictor(companies[0])
+            predictor = SalesPredictor(
+                self.company_service.get_primary_company(company_ids)
+            )
             predictions = predictor.predict_future_sales(
                 product_id=product_id, days_ahead=days_ahead, time_unit=time_unit
             )
@@ -303,10 +413,13 @@ class SalesViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=["get"], url_path="top-products")
     @custom_permission_required("view_sales")
+    @query_budget(4)
+    @etag_from_data_version("sale-top-products")
+    @cache_analytics_response("sale-top-products")
     def top_products(self, request):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_404_NOT_FOUND,
@@ -321,29 +434,14 @@ class SalesViewSet(viewsets.ViewSet):
                 limit = 10
 
             period = request.query_params.get("period", None)
-            sales_query = Sale.objects.filter(company__in=companies)
-
+            since = None
             if period == "month":
-                from datetime import datetime, timedelta
-
-                last_month = datetime.now() - timedelta(days=30)
-                sales_query = sales_query.filter(date__gte=last_month)
+                since = datetime.now() - timedelta(days=30)
             elif period == "year":
-                from datetime import datetime, timedelta
-
-                last_year = datetime.now() - timedelta(days=365)
-                sales_query = sales_query.filter(date__gte=last_year)
+                since = datetime.now() - timedelta(days=365)
 
-            from django.db.models import Count, F
-
-            top_products = (
-                sales_query.values("product", "product__name", "product__price")
-                .annotate(
-                    total_quantity=Sum("quantity"),
-                    total_sales=Sum("total_price"),
-                    count=Count("id"),
-                )
-                .order_by("-total_quantity")[:limit]
+            top_products = self.rollup_service.get_top_products(
+                company_ids, since=since, limit=limit
             )
 
             result = []
@@ -368,10 +466,13 @@ class SalesViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=["get"], url_path="monthly-chart")
     @custom_permission_required("view_sales")
+    @query_budget(5)
+    @etag_from_data_version("sale-monthly-chart")
+    @cache_analytics_response("sale-monthly-chart")
     def monthly_chart(self, request):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_404_NOT_FOUND,
@@ -400,29 +501,17 @@ class SalesViewSet(viewsets.ViewSet):
                 12: "Dic",
             }
 
-            sales = Sale.objects.filter(company__in=companies, date__year=year)
-
-            purchases = Purchase.objects.filter(company__in=companies, date__year=year)
-
-            sales_by_month = (
-                sales.annotate(month=ExtractMonth("date"))
-                .values("month")
-                .annotate(total=Sum("total_price"))
-                .order_by("month")
-            )
-
-            purchases_by_month = (
-                purchases.annotate(month=ExtractMonth("date"))
-                .values("month")
-                .annotate(total=Sum("total_cost"))
-                .order_by("month")
-            )
-
             sales_dict = {
-                item["month"]: float(item["total"]) for item in sales_by_month
+                month: float(total)
+                for month, total in self.rollup_service.get_monthly_sales(
+                    company_ids, year
+                ).items()
             }
             purchases_dict = {
-                item["month"]: float(item["total"]) for item in purchases_by_month
+                month: float(total)
+                for month, total in self.rollup_service.get_monthly_purchases(
+                    company_ids, year
+                ).items()
             }
 
             for month in range(1, 13):
@@ -1,5 +1,6 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
+from apps.company.mixins import CompanyMembershipMixin
 from apps.company.services.company_service import CompanyService
 from apps.users.decorators import custom_permission_required
 from rest_framework.response import Response
@@ -8,7 +9,7 @@ from apps.supplier.services.supplier_service import SupplierService
 from apps.supplier.serializers import SupplierSerializer
 
 
-class SupplierViewSet(viewsets.ModelViewSet):
+class SupplierViewSet(CompanyMembershipMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = SupplierSerializer
 
@@ -20,16 +21,16 @@ class SupplierViewSet(viewsets.ModelViewSet):
     # Temporalmente eliminamos la comprobación de permisos
     def list(self, request):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
             all_suppliers = []
-            for company in companies:
-                suppliers = self.service.get_all_suppliers_by_company(company)
+            for company_id in sorted(company_ids):
+                suppliers = self.service.get_all_suppliers_by_company(company_id)
                 all_suppliers.extend(suppliers)
 
             serializer = SupplierSerializer(all_suppliers, many=True)
@@ -42,8 +43,8 @@ class SupplierViewSet(viewsets.ModelViewSet):
     # Temporalmente eliminamos la comprobación de permisos
     def retrieve(self, request, pk=None):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_400_BAD_REQUEST,
@@ -56,7 +57,7 @@ class SupplierViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_404_NOT_FOUND,
                 )
 
-            if supplier.company not in companies:
+            if supplier.company_id not in company_ids:
                 return Response(
                     {"error": "No tienes permiso para ver este producto"},
                     status=status.HTTP_403_FORBIDDEN,
@@ -70,8 +71,8 @@ class SupplierViewSet(viewsets.ModelViewSet):
     # Temporalmente eliminamos la comprobación de permisos
     def update(self, request, pk=None):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_400_BAD_REQUEST,
@@ -84,7 +85,7 @@ class SupplierViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_404_NOT_FOUND,
                 )
 
-            if supplier.company not in companies:
+            if supplier.company_id not in company_ids:
                 return Response(
                     {"error": "No tienes permiso para actualizar este proveedor"},
                     status=status.HTTP_403_FORBIDDEN,
@@ -101,15 +102,15 @@ class SupplierViewSet(viewsets.ModelViewSet):
     # Temporalmente eliminamos la comprobación de permisos
     def create(self, request):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
             # Asignar la primera compañía del usuario al proveedor
-            company = companies[0]
+            company = self.company_service.get_primary_company(company_ids)
 
             serializer = self.get_serializer(data=request.data)
             if serializer.is_valid():
@@ -123,8 +124,8 @@ class SupplierViewSet(viewsets.ModelViewSet):
     # Temporalmente eliminamos la comprobación de permisos
     def destroy(self, request, pk=None):
         try:
-            companies = self.company_service.get_all_by_user(request.user)
-            if not companies:
+            company_ids = self.get_company_ids(request)
+            if not company_ids:
                 return Response(
                     {"error": "El usuario no tiene compañías asignadas"},
                     status=status.HTTP_400_BAD_REQUEST,
@@ -137,7 +138,7 @@ class SupplierViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_404_NOT_FOUND,
                 )
 
-            if supplier.company not in companies:
+            if supplier.company_id not in company_ids:
                 return Response(
                     {"error": "No tienes permiso para eliminar este proveedor"},
                     status=status.HTTP_403_FORBIDDEN,
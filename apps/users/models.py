@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser, Permission
 from django.contrib.auth.base_user import BaseUserManager
 from django.db import models
+from apps.users.services.permission_service import PermissionService
 
 
 class CustomUserManager(BaseUserManager):
@@ -71,16 +72,8 @@ class CustomUser(AbstractUser):
     objects = CustomUserManager()
 
     def has_custom_permission(self, permission_name):
-        # Verificar si el usuario tiene el permiso directamente
-        if self.custom_permissions.filter(codename=permission_name).exists():
-            return True
-
-        # Si no tiene el permiso directamente y no tiene rol, no tiene el permiso
-        if not self.role:
-            return False
-
-        # Verificar si el rol tiene el permiso
-        return self.role.has_permission(permission_name)
+        # Permisos directos y los del rol, leídos una vez y servidos desde caché
+        return PermissionService().has_permission(self, permission_name)
 
     def __str__(self):
         return self.email
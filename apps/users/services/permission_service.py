@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db.models import Q
+
+
+class PermissionService:
+    VERSION_KEY = "user_permissions:version"
+
+    def _version(self):
+        version = cache.get(self.VERSION_KEY)
+        if version is None:
+            version = 1
+            cache.add(self.VERSION_KEY, version, timeout=None)
+        return version
+
+    def _key(self, user_id, role_id):
+        # El rol forma parte de la clave: cambiarlo no requiere invalidar nada
+        return f"user_permissions:{user_id}:{role_id}:{self._version()}"
+
+    def get_codenames(self, user):
+        key = self._key(user.pk, user.role_id)
+        codenames = cache.get(key)
+        if codenames is None:
+            condition = Q(custom_user_permissions=user.pk)
+            if user.role_id:
+                condition |= Q(role=user.role_id)
+            codenames = frozenset(
+                Permission.objects.filter(condition).values_list("codename", flat=True)
+            )
+            cache.set(key, codenames, settings.PERMISSION_CACHE_TIMEOUT)
+        return codenames
+
+    def has_permission(self, user, permission_name):
+        return permission_name in self.get_codenames(user)
+
+    def invalidate_user(self, user):
+        cache.delete(self._key(user.pk, user.role_id))
+
+    def invalidate_all(self):
+        # Cambiar la versión deja huérfanas todas las entradas anteriores
+        try:
+            cache.incr(self.VERSION_KEY)
+        except ValueError:
+            cache.set(self.VERSION_KEY, self._version() + 1, timeout=None)
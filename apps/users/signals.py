@@ -1,6 +1,7 @@
-from django.db.models.signals import post_migrate
+from django.db.models.signals import m2m_changed, post_migrate, post_save
 from django.dispatch import receiver
-from .models import Role
+from apps.users.services.permission_service import PermissionService
+from .models import CustomUser, Role
 
 
 @receiver(post_migrate)
@@ -15,3 +16,27 @@ def create_default_roles(sender, **kwargs):
         Role.objects.get_or_create(
             name=Role.EMPLOYEE,
         )
+
+
+@receiver(m2m_changed, sender=CustomUser.custom_permissions.through)
+def invalidate_user_permissions(sender, instance, action, reverse, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if reverse:
+        # Cambios hechos desde el permiso pueden afectar a varios usuarios
+        PermissionService().invalidate_all()
+    else:
+        PermissionService().invalidate_user(instance)
+
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+def invalidate_role_permissions(sender, action, **kwargs):
+    if action.startswith("post_"):
+        PermissionService().invalidate_all()
+
+
+@receiver(post_save, sender=CustomUser)
+def forget_reused_user_id(sender, instance, created, **kwargs):
+    # Un id reutilizado (p. ej. tras un rollback) no debe heredar permisos en caché
+    if created:
+        PermissionService().invalidate_user(instance)
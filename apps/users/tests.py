@@ -1,3 +1,71 @@
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.test import TestCase
+from apps.company.services.company_service import CompanyService
+from apps.company.testing import create_company, create_owner
+from apps.users.models import CustomUser, Role
 
-# Create your tests here.
+
+class PermissionCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        content_type = ContentType.objects.get_for_model(CustomUser)
+        self.view, self.edit = [
+            Permission.objects.create(
+                codename=codename, name=codename, content_type=content_type
+            )
+            for codename in ("view_things", "edit_things")
+        ]
+        self.role = Role.objects.create(name=Role.EMPLOYEE)
+        self.user = CustomUser.objects.create_user(email="employee@example.com")
+
+    def fresh_user(self):
+        # Como en cada petición, el usuario se vuelve a cargar desde la base
+        return CustomUser.objects.get(pk=self.user.pk)
+
+    def test_permissions_are_served_from_cache_after_the_first_check(self):
+        self.user.custom_permissions.add(self.view)
+        self.assertTrue(self.fresh_user().has_custom_permission("view_things"))
+
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_custom_permission("view_things"))
+            self.assertFalse(user.has_custom_permission("edit_things"))
+
+    def test_user_permission_changes_invalidate_the_cache(self):
+        self.assertFalse(self.fresh_user().has_custom_permission("view_things"))
+
+        self.user.custom_permissions.add(self.view)
+        self.assertTrue(self.fresh_user().has_custom_permission("view_things"))
+
+        self.view.custom_user_permissions.remove(self.user)
+        self.assertFalse(self.fresh_user().has_custom_permission("view_things"))
+
+    def test_role_permissions_and_role_changes_are_picked_up(self):
+        self.assertFalse(self.fresh_user().has_custom_permission("edit_things"))
+
+        self.user.role = self.role
+        self.user.save()
+        self.role.permissions.add(self.edit)
+        self.assertTrue(self.fresh_user().has_custom_permission("edit_things"))
+
+        self.role.permissions.clear()
+        self.assertFalse(self.fresh_user().has_custom_permission("edit_things"))
+
+    def test_update_employee_permissions_replaces_the_cached_set(self):
+        owner = create_owner()
+        company = create_company(owner)
+        self.user.company = company
+        self.user.save()
+        self.user.custom_permissions.add(self.view)
+        self.assertTrue(self.fresh_user().has_custom_permission("view_things"))
+
+        result = CompanyService().update_employee_permissions(
+            self.user.email, company, ["edit_things", "unknown"]
+        )
+
+        self.assertTrue(result)
+        user = self.fresh_user()
+        self.assertFalse(user.has_custom_permission("view_things"))
+        self.assertTrue(user.has_custom_permission("edit_things"))
@@ -35,9 +35,17 @@ INSTALLED_APPS = [
     "apps.payments",
     "apps.purchase",
     "apps.sale",
+    "apps.analytics",
+    "apps.inventory",
+    "apps.exports",
+    "apps.jobs",
+    "apps.metrics",
+    "apps.benchmarks",
 ]
 
 MIDDLEWARE = [
+    # Primero, para que la latencia medida incluya el resto de middlewares
+    "apps.metrics.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -115,6 +123,65 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "users.CustomUser"
 
+# Por defecto caché en memoria de cada proceso. Con varios procesos (gunicorn,
+# run_workers) hace falta un backend compartido (Redis o Memcached, p. ej.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache y
+# CACHE_LOCATION=redis://localhost:6379) para que las invalidaciones lleguen a
+# todos; sin él, los datos de seguridad solo se guardan unos segundos
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "aiventory"),
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "5000"))},
+    }
+}
+
+# Con una caché por proceso, una invalidación solo llega al proceso que la hizo
+CACHE_IS_SHARED = CACHES["default"]["BACKEND"] not in (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+# Segundos que se conservan en caché las respuestas de analítica; acota también
+# lo que tarda en verse un cambio hecho desde otro proceso con caché local
+ANALYTICS_CACHE_TIMEOUT = 300
+
+# Segundos que se conservan en caché los permisos efectivos de cada usuario. Es
+# también lo que tarda un permiso revocado en dejar de valer en los demás procesos
+# si la caché no es compartida, por eso entonces el valor por defecto es mínimo
+PERMISSION_CACHE_TIMEOUT = int(
+    os.getenv("PERMISSION_CACHE_TIMEOUT", "300" if CACHE_IS_SHARED else "5")
+)
+
+# Segundos que se conservan en caché las compañías a las que pertenece cada
+# usuario; igual que con los permisos, sin caché compartida se acota a segundos
+COMPANY_CACHE_TIMEOUT = int(
+    os.getenv("COMPANY_CACHE_TIMEOUT", "300" if CACHE_IS_SHARED else "5")
+)
+
+# Si se define, /metrics exige la cabecera "Authorization: Bearer <token>";
+# sin token, /metrics solo responde con DEBUG activo
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Con DEBUG, una acción que supera su @query_budget lanza QueryBudgetExceeded;
+# en producción solo se cuenta en aiventory_query_budget_exceeded_total
+QUERY_BUDGETS_ENFORCED = DEBUG
+
+# Registra los conteos de ventas que explican por qué un modelo no se entrena;
+# cuestan tres COUNT por entrenamiento, así que están desactivados por defecto
+SALES_PREDICTOR_DIAGNOSTICS = (
+    os.getenv("SALES_PREDICTOR_DIAGNOSTICS", "False") == "True"
+)
+
+# Modelos de predicción reconstruidos que cada proceso conserva en memoria
+SALES_MODEL_CACHE_SIZE = 1000
+
+# Segundos sin latido tras los que un trabajo en ejecución vuelve a la cola;
+# run_workers late varias veces dentro de este plazo mientras sigue vivo
+JOB_LEASE_TIMEOUT = int(os.getenv("JOB_LEASE_TIMEOUT", "300"))
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
 ]
@@ -17,6 +17,10 @@ urlpatterns = [
     path("api/payments/", include("apps.payments.urls")),
     path("api/sales/", include("apps.sale.urls")),
     path("api/purchases/", include("apps.purchase.urls")),
+    path("api/exports/", include("apps.exports.urls")),
+    path("api/jobs/", include("apps.jobs.urls")),
+    # Métricas en formato Prometheus
+    path("metrics", include("apps.metrics.urls")),
 ]
 
 # Servir archivos media en desarrollo